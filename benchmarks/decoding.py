@@ -0,0 +1,64 @@
+"""
+Measure the cost of turning a full helix/videos page into models.
+
+Compares decoding with the standard library or orjson followed by building every
+model from its dict, with validating the raw body straight into a page model.
+
+Usage: python benchmarks/decoding.py [runs]
+"""
+import json
+import sys
+import time
+
+from tystream.decoding import get_decoder
+from tystream.models.twitch import TwitchVODData, TwitchVODPage
+
+
+def page(size: int = 100) -> bytes:
+    vods = [{
+        "id": str(2_000_000_000 + number),
+        "stream_id": str(40_000_000_000 + number),
+        "user_id": "141981764",
+        "user_login": "twitchdev",
+        "user_name": "TwitchDev",
+        "title": f"Past broadcast number {number}",
+        "description": "A VOD of the decoding benchmark, with a description of typical length.",
+        "created_at": "2024-03-10T15:00:00Z",
+        "published_at": "2024-03-10T15:00:00Z",
+        "url": f"https://www.twitch.tv/videos/{2_000_000_000 + number}",
+        "thumbnail_url": "https://static-cdn.jtvnw.net/cf_vods/d2nvs31859zcd8/twitchdev/thumb/thumb0-%{width}x%{height}.jpg",
+        "viewable": "public",
+        "view_count": number,
+        "language": "en",
+        "type": "archive",
+        "duration": "3h8m33s",
+        "muted_segments": None,
+    } for number in range(size)]
+    return json.dumps({"data": vods, "pagination": {"cursor": "eyJiIjpudWxsLCJhIjp7Ik9mZnNldCI6MX19"}}).encode()
+
+
+def measure(function, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        function()
+    return (time.perf_counter() - start) / runs
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    body = page()
+    scenarios = {"json + models": lambda: [TwitchVODData(**vod) for vod in get_decoder("json")(body)["data"]]}
+    try:
+        orjson = get_decoder("orjson")
+        scenarios["orjson + models"] = lambda: [TwitchVODData(**vod) for vod in orjson(body)["data"]]
+    except ImportError:
+        pass
+    scenarios["raw page model"] = lambda: TwitchVODPage.model_validate_json(body).data
+
+    print(f"{len(body) / 1024:.0f} KiB page of 100 VODs, {runs} runs")
+    for name, function in scenarios.items():
+        print(f"{name:>16}: {measure(function, runs) * 1000:6.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Measure the cold start cost of importing tystream.
+
+Usage: python benchmarks/import_time.py [runs]
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    "import tystream": "import tystream",
+    "AsyncTwitch": "from tystream import AsyncTwitch",
+    "AsyncYoutube": "from tystream import AsyncYoutube",
+    "SyncTwitch": "from tystream import SyncTwitch",
+    "yt_dlp": "import yt_dlp",
+}
+
+
+def measure(code: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = measure("pass", runs)
+    print(f"interpreter startup: {baseline * 1000:.1f} ms (median of {runs})")
+    for name, code in SCENARIOS.items():
+        try:
+            elapsed = measure(code, runs) - baseline
+        except subprocess.CalledProcessError:
+            print(f"{name:>16}: unavailable")
+            continue
+        print(f"{name:>16}: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Measure the memory a Twitch client holds per tracked channel.
+
+Every channel is checked once with AsyncTwitch.check_stream_live against a transport
+that synthesizes Helix responses, so no network or cassette memory is involved.
+The growth of the resident set size is divided by the number of channels, once with
+the compact user and stream caches and once with plain dicts in their place.
+
+Usage: python benchmarks/memory.py [channels] [live_ratio]
+"""
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit, parse_qs
+
+from tystream.async_api.transport import AsyncTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.transport import TransportResponse
+
+BATCH = 1000
+
+
+def rss() -> int:
+    """
+    The resident set size of this process in bytes.
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class HelixTransport(AsyncTransport):
+    """
+    Answer helix/users and helix/streams requests for ``channel<N>``, every ``1 / live_ratio``-th channel is live.
+    """
+
+    def __init__(self, live_ratio: float) -> None:
+        self.every = max(1, round(1 / live_ratio)) if live_ratio else 0
+
+    @staticmethod
+    def user(login: str) -> dict:
+        number = int(login[len("channel"):])
+        return {
+            "id": str(100_000_000 + number),
+            "login": login,
+            "display_name": login.capitalize(),
+            "type": "",
+            "broadcaster_type": "affiliate",
+            "description": "A channel tracked by the memory benchmark, with a description of typical length.",
+            "profile_image_url": f"https://static-cdn.jtvnw.net/jtv_user_pictures/{login}-profile_image-300x300.png",
+            "offline_image_url": f"https://static-cdn.jtvnw.net/jtv_user_pictures/{login}-channel_offline_image.png",
+            "view_count": 0,
+            "created_at": "2016-12-14T20:32:28Z",
+        }
+
+    async def request(self, method, url, headers=None, params=None, data=None, timeout=10) -> TransportResponse:
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        if parts.path.endswith("/users"):
+            payload = {"data": [self.user(login) for login in query["login"]]}
+        else:
+            login = query["user_login"][0]
+            number = int(login[len("channel"):])
+            live = self.every and number % self.every == 0
+            payload = {"data": [{
+                "id": str(40_000_000_000 + number),
+                "user_id": str(100_000_000 + number),
+                "user_login": login,
+                "user_name": login.capitalize(),
+                "game_id": "509670",
+                "game_name": "Science & Technology",
+                "type": "live",
+                "title": f"Stream number {number} of the memory benchmark",
+                "viewer_count": number % 5000,
+                "started_at": "2024-03-10T15:00:00Z",
+                "language": "en",
+                "thumbnail_url": f"https://static-cdn.jtvnw.net/previews-ttv/live_user_{login}-{{width}}x{{height}}.jpg",
+                "tags": ["English"],
+                "is_mature": False,
+            }] if live else []}
+        return TransportResponse(200, {}, json.dumps(payload).encode("utf-8"), url)
+
+
+async def track(channels: int, live_ratio: float, layout: str) -> dict:
+    twitch = AsyncTwitch("client_id", "client_secret", cache_ttl=3600, transport=HelixTransport(live_ratio))
+    twitch._token_cache = {"token": "token", "expires_at": time.time() + 3600}
+    if layout == "dict":
+        twitch._stream_cache = twitch._caches["stream"] = {}
+        twitch._user_cache = twitch._caches["user"] = {}
+
+    gc.collect()
+    before = rss()
+    start = time.perf_counter()
+    for offset in range(0, channels, BATCH):
+        await asyncio.gather(*(twitch.check_stream_live(f"channel{number}")
+                               for number in range(offset, min(offset + BATCH, channels))))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    return {"bytes": rss() - before, "seconds": elapsed}
+
+
+def main() -> None:
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    live_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+    if len(sys.argv) > 3:
+        print(json.dumps(asyncio.run(track(channels, live_ratio, sys.argv[3]))))
+        return
+
+    print(f"{channels} channels, {live_ratio:.0%} live")
+    for layout in ("dict", "compact"):
+        output = subprocess.run([sys.executable, __file__, str(channels), str(live_ratio), layout],
+                                check=True, capture_output=True, text=True).stdout
+        result = json.loads(output)
+        print(f"{layout:>8}: {result['bytes'] / channels:7.0f} B/channel "
+              f"({result['bytes'] / 2 ** 20:.1f} MiB, {result['seconds']:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
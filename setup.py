@@ -24,7 +24,13 @@ setup(name='tystream',
           "yt-dlp>=2025.2.19",
           "pydantic>=2.10.6"
       ],
+      extras_require={
+          'fast': ["orjson>=3.9"]
+      },
       packages=find_packages(),
+      entry_points={
+          'console_scripts': ['tystream=tystream.cli:main']
+      },
       keywords=['Twitch', 'Youtube', 'stream', 'stream Notification', 'Notification'],
       license='GNU',
       classifiers=[
@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+import unittest
+
+from tystream.transport import Cassette, TransportResponse
+
+TWITCH_USER = {
+    "id": "141981764",
+    "login": "twitchdev",
+    "display_name": "TwitchDev",
+    "type": "",
+    "broadcaster_type": "partner",
+    "description": "Supporting third-party developers building Twitch integrations.",
+    "profile_image_url": "https://static-cdn.jtvnw.net/jtv_user_pictures/twitchdev-profile_image.png",
+    "offline_image_url": "",
+    "view_count": 5980557,
+    "created_at": "2016-12-14T20:32:28Z",
+}
+
+TWITCH_STREAM = {
+    "id": "40952121085",
+    "user_id": "141981764",
+    "user_login": "twitchdev",
+    "user_name": "TwitchDev",
+    "game_id": "509670",
+    "game_name": "Science & Technology",
+    "type": "live",
+    "title": "Building integrations",
+    "viewer_count": 1024,
+    "started_at": "2024-03-10T15:00:00Z",
+    "language": "en",
+    "thumbnail_url": "https://static-cdn.jtvnw.net/previews-ttv/live_user_twitchdev-{width}x{height}.jpg",
+    "tags": ["English"],
+    "is_mature": False,
+}
+
+TWITCH_VOD = {
+    "id": "335921245",
+    "stream_id": "40952121085",
+    "user_id": "141981764",
+    "user_login": "twitchdev",
+    "user_name": "TwitchDev",
+    "title": "Twitch Developers 101",
+    "description": "",
+    "created_at": "2024-03-09T15:00:00Z",
+    "published_at": "2024-03-09T15:00:00Z",
+    "url": "https://www.twitch.tv/videos/335921245",
+    "thumbnail_url": "https://static-cdn.jtvnw.net/cf_vods/twitchdev/thumb-%{width}x%{height}.jpg",
+    "viewable": "public",
+    "view_count": 1863062,
+    "language": "en",
+    "type": "archive",
+    "duration": "3m21s",
+    "muted_segments": None,
+}
+
+YOUTUBE_CHANNEL_ID = "UC_x5XG1OV2P6uZZ5FSM9Ttw"
+
+YOUTUBE_VIDEO = {
+    "id": "jfKfPfyJRdk",
+    "snippet": {
+        "publishedAt": "2024-03-10T15:00:00Z",
+        "channelId": YOUTUBE_CHANNEL_ID,
+        "title": "Live coding",
+        "description": "Building things live.",
+        "thumbnails": {
+            "default": {"url": "https://i.ytimg.com/vi/jfKfPfyJRdk/default_live.jpg", "width": 120, "height": 90},
+            "medium": {"url": "https://i.ytimg.com/vi/jfKfPfyJRdk/mqdefault_live.jpg", "width": 320, "height": 180},
+            "high": {"url": "https://i.ytimg.com/vi/jfKfPfyJRdk/hqdefault_live.jpg", "width": 480, "height": 360},
+        },
+        "channelTitle": "Google for Developers",
+        "categoryId": "28",
+        "tags": ["live"],
+    },
+    "liveStreamingDetails": {
+        "actualStartTime": "2024-03-10T15:00:00Z",
+        "concurrentViewers": 2048,
+        "activeLiveChatId": "Cg0KC2pmS2ZQZnlKUmRr",
+    },
+}
+
+TOKEN = {"access_token": "token", "expires_in": 5011271, "token_type": "bearer"}
+
+
+def response(payload, status=200, headers=None) -> TransportResponse:
+    return TransportResponse(status, headers or {"Content-Type": "application/json"}, json.dumps(payload).encode())
+
+
+def twitch_cassette(live: bool = True) -> Cassette:
+    """
+    A cassette answering the requests made by a Twitch live check of ``twitchdev``.
+    """
+    cassette = Cassette()
+    cassette.add(cassette.key("POST", "https://id.twitch.tv/oauth2/token"), response(TOKEN))
+    cassette.add(cassette.key("GET", "https://id.twitch.tv/oauth2/validate"), response({}))
+    cassette.add(cassette.key("GET", "https://api.twitch.tv/helix/users?login=twitchdev"),
+                 response({"data": [TWITCH_USER]}))
+    cassette.add(cassette.key("GET", "https://api.twitch.tv/helix/streams?user_login=twitchdev"),
+                 response({"data": [TWITCH_STREAM] if live else []}))
+    return cassette
+
+
+YOUTUBE_BASE_URL = "https://www.googleapis.com/youtube/v3"
+YOUTUBE_VALIDATE_URL = f"{YOUTUBE_BASE_URL}/search?part=snippet&q=YouTube+Data+API&type=video"
+YOUTUBE_CHANNELS_URL = f"{YOUTUBE_BASE_URL}/channels?part=snippet&forHandle=googledevs"
+YOUTUBE_SEARCH_URL = (f"{YOUTUBE_BASE_URL}/search?part=snippet&channelId={YOUTUBE_CHANNEL_ID}"
+                      f"&eventType=live&type=video")
+YOUTUBE_VIDEOS_URL = f"{YOUTUBE_BASE_URL}/videos?part=id,snippet,liveStreamingDetails&id={YOUTUBE_VIDEO['id']}"
+
+
+def youtube_cassette(live: bool = True) -> Cassette:
+    """
+    A cassette answering the requests made by a YouTube API live check of ``googledevs``.
+    """
+    cassette = Cassette()
+    cassette.add(cassette.key("GET", YOUTUBE_VALIDATE_URL), response({"items": []}))
+    cassette.add(cassette.key("GET", YOUTUBE_CHANNELS_URL), response({"items": [{"id": YOUTUBE_CHANNEL_ID}]}))
+    cassette.add(cassette.key("GET", YOUTUBE_SEARCH_URL),
+                 response({"items": [{"id": {"videoId": YOUTUBE_VIDEO["id"]}}] if live else []}))
+    cassette.add(cassette.key("GET", YOUTUBE_VIDEOS_URL), response({"items": [YOUTUBE_VIDEO]}))
+    return cassette
+
+
+class TemporaryDirectoryMixin(unittest.TestCase):
+    """
+    Run each test inside a temporary directory, the oauth token cache and log files are written to the cwd.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+        super().tearDown()
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tests.fixtures import TemporaryDirectoryMixin, TWITCH_USER, TWITCH_STREAM
+from tystream.assets import AssetCache, asset_urls
+from tystream.changes import StreamOnline
+from tystream.metrics import MetricsRegistry
+from tystream.models.twitch import TwitchStreamData, TwitchUserData
+
+
+class ImageServer:
+    """
+    Serve ``/<name>.png`` as ``name`` repeated 100 times, with an ETag, and count the requests.
+    """
+
+    def __init__(self) -> None:
+        self.requests = []
+        app = web.Application()
+        app.router.add_get("/{name}.png", self.handle)
+        self.server = TestServer(app)
+
+    def url(self, name: str) -> str:
+        return str(self.server.make_url(f"/{name}.png"))
+
+    async def handle(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        self.requests.append((name, request.headers.get("If-None-Match")))
+        await asyncio.sleep(0.01)
+        if name == "missing":
+            return web.Response(status=404)
+        etag = f'"{name.split("-")[0]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=name.split("-")[0].encode() * 100, content_type="image/png", headers={"ETag": etag})
+
+
+class TestAssetCache(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.images = ImageServer()
+        await self.images.server.start_server()
+        self.metrics = MetricsRegistry()
+        self.assets = AssetCache("assets", max_bytes=1000, metrics=self.metrics)
+
+    async def asyncTearDown(self) -> None:
+        await self.assets.close()
+        await self.images.server.close()
+
+    async def test_concurrent_requests_share_a_download(self):
+        paths = await asyncio.gather(*(self.assets.get(self.images.url("avatar")) for _ in range(10)))
+        self.assertEqual(len(set(paths)), 1)
+        self.assertEqual(self.images.requests, [("avatar", None)])
+        self.assertEqual(await self.assets.read(self.images.url("avatar")), b"avatar" * 100)
+        self.assertEqual(self.images.requests, [("avatar", None)])
+        self.assertEqual(self.metrics.get("asset_requests_total", outcome="hit"), 1)
+
+    async def test_same_content_is_stored_once(self):
+        first = await self.assets.get(self.images.url("avatar-300x300"))
+        second = await self.assets.get(self.images.url("avatar-600x600"))
+        self.assertEqual(first, second)
+        self.assertEqual(self.assets.entries, 2)
+        self.assertEqual(self.assets.size, 600)
+
+    async def test_stale_entries_are_revalidated(self):
+        self.assets.max_age = 0
+        path = await self.assets.get(self.images.url("avatar"))
+        self.assertEqual(await self.assets.get(self.images.url("avatar")), path)
+        self.assertEqual(self.images.requests, [("avatar", None), ("avatar", '"avatar"')])
+        self.assertEqual(self.metrics.get("asset_requests_total", outcome="revalidated"), 1)
+
+    async def test_failed_downloads(self):
+        self.assertIsNone(await self.assets.get(self.images.url("missing")))
+        self.assertIsNone(self.assets.cached(self.images.url("missing")))
+        self.assertEqual(self.metrics.get("asset_requests_total", outcome="failed"), 1)
+
+    async def test_least_recently_used_are_evicted(self):
+        for name in ("img1", "img2", "img1"):
+            await self.assets.get(self.images.url(name))
+        self.assertEqual(self.assets.size, 800)
+
+        await self.assets.get(self.images.url("img3"))
+        self.assertEqual(self.assets.size, 800)
+        self.assertIsNone(self.assets.cached(self.images.url("img2")))
+        self.assertIsNotNone(self.assets.cached(self.images.url("img1")))
+        self.assertEqual(len([name for _, _, names in os.walk(self.assets.directory)
+                              for name in names if name != "index.sqlite"]), 2)
+
+    async def test_size_is_tracked_without_rescanning(self):
+        with mock.patch.object(AssetCache, "_stored_size") as stored_size:
+            for name in ("img1", "img2", "img1", "avatar-300x300", "avatar-600x600", "img3", "img4"):
+                await self.assets.get(self.images.url(name))
+            os.remove(self.assets.cached(self.images.url("img4")))
+            self.assertIsNone(self.assets.cached(self.images.url("img4")))
+            stored_size.assert_not_called()
+
+        self.assertLessEqual(self.assets.size, 1000)
+        with self.assets._connect() as connection:
+            self.assertEqual(self.assets.size, AssetCache._stored_size(connection))
+
+    async def test_index_survives_restarts(self):
+        path = await self.assets.get(self.images.url("avatar"))
+        reopened = AssetCache(self.assets.directory, transport=self.assets.transport)
+        self.assertEqual(reopened.cached(self.images.url("avatar")), path)
+        self.assertEqual(reopened.size, 600)
+
+        os.remove(path)
+        self.assertIsNone(reopened.cached(self.images.url("avatar")))
+        self.assertEqual(reopened.size, 0)
+
+    async def test_schedule_prefetches_in_background(self):
+        task = self.assets.schedule(self.images.url("thumb"), self.images.url("icon"))
+        paths = await task
+        self.assertEqual(set(paths), {self.images.url("thumb"), self.images.url("icon")})
+        self.assertTrue(all(os.path.exists(path) for path in paths.values()))
+
+
+class TestAssetUrls(unittest.TestCase):
+    def test_twitch_stream(self):
+        stream = TwitchStreamData(**TWITCH_STREAM, user=TwitchUserData(**TWITCH_USER))
+        urls = asset_urls(StreamOnline("twitch", "twitchdev", None, str(stream.id), stream, 0.0))
+        self.assertEqual(urls[0], str(stream.thumbnail_url))
+        self.assertIn(str(stream.user.profile_image_url), urls)
+
+    def test_nothing(self):
+        self.assertEqual(asset_urls(False), [])
+        self.assertEqual(asset_urls(StreamOnline("twitch", "twitchdev", None, None, False, 0.0)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
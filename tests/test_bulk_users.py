@@ -0,0 +1,150 @@
+import asyncio
+import random
+import unittest
+from urllib.parse import urlencode
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.exceptions import NoResultException
+from tystream.models.twitch import TwitchStreamData
+from tystream.retry import RetryPolicy
+from tystream.sync_api.transport import SyncReplayTransport
+from tystream.sync_api.twitch import SyncTwitch
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette, response, TWITCH_USER, TWITCH_STREAM
+
+CHANNELS = ("twitchdev", "alpha", "beta")
+
+
+class CountingTransport(AsyncReplayTransport):
+    def __init__(self, cassette, jitter: float = 0.0) -> None:
+        super().__init__(cassette)
+        self.jitter = jitter
+        self.paths = []
+
+    async def request(self, method, url, headers=None, params=None, data=None, timeout=10):
+        self.paths.append(url.split("/helix/")[-1])
+        await asyncio.sleep(random.uniform(0, self.jitter))
+        return await super().request(method, url, headers=headers, params=params, data=data, timeout=timeout)
+
+    def count(self, endpoint: str) -> int:
+        return len([path for path in self.paths if path.startswith(endpoint)])
+
+
+def user(login: str) -> dict:
+    return {**TWITCH_USER, "id": str(abs(hash(login)) % 10 ** 8), "login": login, "display_name": login}
+
+
+def stream(login: str) -> dict:
+    return {**TWITCH_STREAM, "user_login": login, "user_name": login}
+
+
+def streams_url(channels, *query) -> str:
+    query = [*(("user_login", channel) for channel in channels), *query]
+    return f"https://api.twitch.tv/helix/streams?{urlencode(query)}"
+
+
+def bulk_cassette(live=CHANNELS):
+    cassette = twitch_cassette()
+    for channel in CHANNELS:
+        cassette.add(cassette.key("GET", f"https://api.twitch.tv/helix/streams?user_login={channel}"),
+                     response({"data": [stream(channel)] if channel in live else []}))
+    cassette.add(cassette.key("GET", streams_url(CHANNELS)),
+                 response({"data": [stream(channel) for channel in live]}))
+    query = "&".join(f"login={channel}" for channel in live)
+    cassette.add(cassette.key("GET", f"https://api.twitch.tv/helix/users?{query}"),
+                 response({"data": [user(channel) for channel in live if channel != "beta"]}))
+    return cassette
+
+
+def sweep_cassette(channels, live):
+    """
+    Answer a sweep of ``channels`` in batches of 100, failing the first attempt of every batch.
+    """
+    cassette = twitch_cassette()
+    for start in range(0, len(channels), 100):
+        batch = channels[start:start + 100]
+        key = cassette.key("GET", streams_url(batch, ("first", 100)))
+        cassette.add(key, response({}, status=503))
+        cassette.add(key, response({"data": [stream(channel) for channel in batch if channel in live]}))
+    query = urlencode([("login", channel) for channel in live])
+    cassette.add(cassette.key("GET", f"https://api.twitch.tv/helix/users?{query}"),
+                 response({"data": [user(channel) for channel in live]}))
+    return cassette
+
+
+class TestStreamsFirst(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_offline_channel_costs_one_request(self):
+        transport = CountingTransport(twitch_cassette(live=False))
+        async with AsyncTwitch("client_id", "client_secret", transport=transport) as twitch:
+            self.assertFalse(await twitch.check_stream_live("twitchdev"))
+        self.assertEqual([path for path in transport.paths if not path.startswith("https://")],
+                         ["streams?user_login=twitchdev"])
+
+    async def test_users_of_live_channels_are_fetched_in_bulk(self):
+        transport = CountingTransport(bulk_cassette(live=("twitchdev", "alpha")))
+        async with AsyncTwitch("client_id", "client_secret", transport=transport) as twitch:
+            await twitch._renew_token()
+            results = await twitch.check_streams_live(CHANNELS)
+
+            self.assertEqual(results["twitchdev"].user.login, "twitchdev")
+            self.assertEqual(results["alpha"].user.login, "alpha")
+            self.assertIs(results["beta"], False)
+            self.assertEqual(len([path for path in transport.paths if path.startswith("users")]), 1)
+            self.assertNotIn("user", twitch._stream_cache["alpha"])
+
+            # cached streams take their user from the user cache
+            cached = await twitch.check_stream_live("alpha")
+            self.assertEqual(cached.user.login, "alpha")
+            self.assertEqual(len([path for path in transport.paths if path.startswith("users")]), 1)
+
+    async def test_sweep_request_count_under_jitter_and_retries(self):
+        channels = [f"channel{number}" for number in range(250)]
+        live = channels[::25]
+        transport = CountingTransport(sweep_cassette(channels, live), jitter=0.02)
+        async with AsyncTwitch("client_id", "client_secret", transport=transport,
+                               retry_policy=RetryPolicy(base_delay=0.01)) as twitch:
+            await twitch._renew_token()
+            results = await twitch.check_streams_live(channels)
+
+        self.assertTrue(results.complete)
+        self.assertEqual([channel for channel in channels if results[channel]], live)
+        self.assertEqual(results[live[-1]].user.login, live[-1])
+        self.assertEqual(transport.count("streams"), 6)
+        self.assertEqual(transport.count("users"), 1)
+
+    async def test_unknown_users(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(bulk_cassette())) as twitch:
+            users = await twitch.get_users(["TwitchDev", "alpha", "beta"])
+            self.assertEqual(set(users), {"twitchdev", "alpha"})
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(bulk_cassette())) as twitch:
+            results = await asyncio.gather(*(twitch.get_user(channel) for channel in CHANNELS), return_exceptions=True)
+            self.assertEqual(results[1].login, "alpha")
+            self.assertIsInstance(results[2], NoResultException)
+
+    async def test_cancelled_lookup_is_shared_safely(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette())) as twitch:
+            await twitch._renew_token()
+            first = asyncio.ensure_future(twitch.get_user("twitchdev"))
+            second = asyncio.ensure_future(twitch.get_user("twitchdev"))
+            await asyncio.sleep(0)
+            first.cancel()
+            self.assertEqual((await second).login, "twitchdev")
+
+    async def test_stale_result_without_user(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette())) as twitch:
+            twitch._stream_cache["twitchdev"] = {"data": TWITCH_STREAM, "timestamp": 0.0}
+            stale = twitch._stale_result("twitchdev")
+        self.assertIsInstance(stale, TwitchStreamData)
+        self.assertIsNone(stale.user)
+
+
+class TestSyncBulkUsers(TemporaryDirectoryMixin):
+    def test_get_users(self):
+        with SyncTwitch("client_id", "client_secret", transport=SyncReplayTransport(bulk_cassette())) as twitch:
+            self.assertEqual(set(twitch.get_users(CHANNELS)), {"twitchdev", "alpha"})
+
+
+if __name__ == "__main__":
+    unittest.main()
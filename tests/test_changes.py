@@ -0,0 +1,107 @@
+import unittest
+
+from tystream.changes import (ChangeDetector, Fingerprint, StreamOnline, StreamOffline, TitleChanged,
+                              CategoryChanged, ViewersThresholdCrossed)
+from tystream.metrics import MetricsRegistry
+from tystream.models.status import UnknownStream
+from tystream.models.twitch import TwitchStreamData, TwitchUserData
+from tystream.models.youtube import YoutubeStreamDataAPI, YoutubeStreamDataYTDLP, LiveStreamingDetails
+
+from tests.fixtures import TWITCH_STREAM, TWITCH_USER, YOUTUBE_VIDEO
+
+
+def twitch_stream(**changes) -> TwitchStreamData:
+    return TwitchStreamData(**{**TWITCH_STREAM, **changes}, user=TwitchUserData(**TWITCH_USER))
+
+
+class TestChangeDetector(unittest.TestCase):
+    def test_first_observation(self):
+        self.assertEqual(ChangeDetector().observe("twitchdev", twitch_stream()), [])
+
+        events = ChangeDetector(emit_initial=True).observe("twitchdev", twitch_stream())
+        self.assertEqual([type(event) for event in events], [StreamOnline])
+
+    def test_field_changes(self):
+        metrics = MetricsRegistry()
+        detector = ChangeDetector(viewer_thresholds=(2000, 10_000), metrics=metrics)
+        detector.observe("twitchdev", twitch_stream())
+
+        self.assertEqual(detector.observe("TwitchDev", twitch_stream(viewer_count=1500)), [])
+
+        events = detector.observe("twitchdev", twitch_stream(title="New title", game_name="Just Chatting",
+                                                             viewer_count=12_000))
+        self.assertEqual([type(event) for event in events],
+                         [TitleChanged, CategoryChanged, ViewersThresholdCrossed, ViewersThresholdCrossed])
+        self.assertEqual(events[0].new, "New title")
+        self.assertEqual((events[1].old, events[1].new), ("Science & Technology", "Just Chatting"))
+        self.assertEqual([(event.threshold, event.rising) for event in events[2:]], [(2000, True), (10_000, True)])
+
+        events = detector.observe("twitchdev", twitch_stream(title="New title", game_name="Just Chatting",
+                                                             viewer_count=9_000))
+        self.assertEqual([(event.threshold, event.rising) for event in events], [(10_000, False)])
+        self.assertEqual(metrics.get("changes_total", kind="viewers"), 3)
+
+    def test_online_offline(self):
+        detector = ChangeDetector(watch=("online", "offline"))
+        detector.observe("twitchdev", False, platform="twitch")
+
+        events = detector.observe("twitchdev", twitch_stream())
+        self.assertIsInstance(events[0], StreamOnline)
+
+        self.assertEqual(detector.observe("twitchdev", UnknownStream("error"), platform="twitch"), [])
+        self.assertTrue(detector.get("twitch", "twitchdev").live)
+
+        events = detector.observe("twitchdev", twitch_stream(id="1", title="Restarted"))
+        self.assertEqual([(type(event), event.old, event.new) for event in events],
+                         [(StreamOnline, TWITCH_STREAM["id"], "1")])
+
+        events = detector.observe("twitchdev", False, platform="twitch")
+        self.assertEqual([(type(event), event.old) for event in events], [(StreamOffline, "1")])
+
+    def test_youtube(self):
+        detector = ChangeDetector()
+        snippet = YOUTUBE_VIDEO["snippet"]
+        video = YoutubeStreamDataAPI(id=YOUTUBE_VIDEO["id"], LiveDetails=LiveStreamingDetails(
+            **YOUTUBE_VIDEO["liveStreamingDetails"]), **snippet)
+        detector.observe("googledevs", video)
+        bigger = video.model_copy(update={"LiveDetails": LiveStreamingDetails(
+            **{**YOUTUBE_VIDEO["liveStreamingDetails"], "concurrentViewers": 20_000})})
+        events = detector.observe("googledevs", bigger)
+        self.assertEqual([(event.platform, type(event)) for event in events], [("youtube", ViewersThresholdCrossed)])
+
+    def test_youtube_api_and_yt_dlp(self):
+        detector = ChangeDetector(watch=("online", "offline", "title"))
+        snippet = YOUTUBE_VIDEO["snippet"]
+        video = YoutubeStreamDataAPI(id=YOUTUBE_VIDEO["id"], LiveDetails=LiveStreamingDetails(
+            **YOUTUBE_VIDEO["liveStreamingDetails"]), **snippet)
+        ytdlp = {
+            "fulltitle": snippet["title"], "timestamp": 1710082800, "channel": snippet["channelTitle"],
+            "concurrent_view_count": 2048, "thumbnail": snippet["thumbnails"]["high"]["url"],
+            "description": snippet["description"], "channel_url": "https://www.youtube.com/@googledevs",
+            "webpage_url": f"https://www.youtube.com/watch?v={YOUTUBE_VIDEO['id']}"
+        }
+
+        detector.observe("googledevs", False, platform="youtube")
+        events = detector.observe("googledevs", video)
+        self.assertEqual([type(event) for event in events], [StreamOnline])
+        self.assertEqual(detector.observe("googledevs", YoutubeStreamDataYTDLP(**ytdlp)), [])
+        self.assertEqual(detector.observe("googledevs", YoutubeStreamDataYTDLP(**ytdlp, id=YOUTUBE_VIDEO["id"])), [])
+        self.assertEqual(detector.observe("googledevs", video), [])
+
+    def test_snapshot(self):
+        detector = ChangeDetector()
+        detector.observe("twitchdev", twitch_stream())
+        restored = ChangeDetector()
+        restored.restore(detector.snapshot())
+        self.assertEqual(restored.get("twitch", "twitchdev"), Fingerprint.from_result(twitch_stream()))
+        self.assertEqual(restored.observe("twitchdev", twitch_stream()), [])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ChangeDetector(watch=("tags",))
+        with self.assertRaises(ValueError):
+            ChangeDetector().observe("twitchdev", False)
+
+
+if __name__ == "__main__":
+    unittest.main()
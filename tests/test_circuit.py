@@ -0,0 +1,183 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport, AsyncTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.async_api.youtube import AsyncYoutube
+from tystream.circuit import CircuitBreaker, CircuitBreakerRegistry
+from tystream.exceptions import HTTPException, TransportException, OauthException
+from tystream.metrics import MetricsRegistry
+from tystream.models.status import UnknownStream
+from tystream.models.youtube import YoutubeStreamDataAPI
+from tystream.retry import NO_RETRY
+from tystream.sync_api.transport import SyncReplayTransport
+from tystream.sync_api.youtube import SyncYoutube
+
+from tests.fixtures import (TemporaryDirectoryMixin, youtube_cassette, response, YOUTUBE_CHANNELS_URL,
+                            YOUTUBE_VALIDATE_URL)
+
+
+def failing_cassette():
+    cassette = youtube_cassette()
+    cassette._entries[cassette.key("GET", YOUTUBE_CHANNELS_URL)] = [response({}, status=503)]
+    return cassette
+
+
+def validation_cassette(status, error):
+    cassette = youtube_cassette(live=False)
+    cassette._entries[cassette.key("GET", YOUTUBE_VALIDATE_URL)] = [
+        response({"error": {"errors": [{"reason": error}]}}, status=status)
+    ]
+    return cassette
+
+
+class CountingTransport(AsyncReplayTransport):
+    def __init__(self, cassette) -> None:
+        super().__init__(cassette)
+        self.urls = []
+
+    async def request(self, method, url, headers=None, params=None, data=None, timeout=10):
+        self.urls.append(self.cassette.key(method, url, params))
+        return await super().request(method, url, headers=headers, params=params, data=data, timeout=timeout)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_transitions(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_released_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.release()
+        self.assertTrue(breaker.allow())
+
+    def test_registry(self):
+        registry = CircuitBreakerRegistry(failure_threshold=1)
+        registry.get("api.twitch.tv", "/helix/streams").record_failure()
+        self.assertTrue(registry.is_open("api.twitch.tv"))
+        self.assertTrue(registry.is_open("api.twitch.tv", "/helix/streams"))
+        self.assertFalse(registry.is_open("api.twitch.tv", "/helix/users"))
+        self.assertFalse(registry.is_open("www.googleapis.com"))
+
+    def test_is_failure(self):
+        self.assertTrue(CircuitBreakerRegistry.is_failure(TransportException("reset")))
+        self.assertTrue(CircuitBreakerRegistry.is_failure(HTTPException(503)))
+        self.assertTrue(CircuitBreakerRegistry.is_failure(HTTPException(403, "quotaExceeded")))
+        self.assertFalse(CircuitBreakerRegistry.is_failure(HTTPException(403, "forbidden")))
+        self.assertFalse(CircuitBreakerRegistry.is_failure(HTTPException(404)))
+
+    def test_unknown_stream_is_falsy(self):
+        self.assertFalse(UnknownStream("timeout"))
+        self.assertEqual(UnknownStream("timeout"), UnknownStream("timeout"))
+        self.assertNotEqual(UnknownStream("timeout"), UnknownStream("error"))
+
+
+class TestAsyncFailover(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_live(self):
+        async with AsyncYoutube("key", transport=AsyncReplayTransport(youtube_cassette())) as youtube:
+            self.assertIsInstance(await youtube.check_stream_live("googledevs"), YoutubeStreamDataAPI)
+
+    async def test_fallback_to_yt_dlp(self):
+        metrics = MetricsRegistry()
+        breakers = CircuitBreakerRegistry(failure_threshold=1)
+        async with AsyncYoutube("key", transport=AsyncReplayTransport(failing_cassette()), metrics=metrics,
+                                retry_policy=NO_RETRY, circuit_breakers=breakers) as youtube:
+            with mock.patch.object(youtube, "_extract_info", return_value=None) as extract:
+                self.assertEqual(await youtube.check_stream_live("googledevs"), UnknownStream("error"))
+                extract.assert_not_called()
+
+                self.assertIs(await youtube.check_stream_live("googledevs"), False)
+                extract.assert_called_once_with("googledevs")
+
+        self.assertEqual(metrics.get("ytdlp_fallbacks_total"), 1)
+        self.assertEqual(metrics.get("circuit_rejections_total", endpoint="/youtube/v3/channels"), 1)
+
+    async def test_cancelled_probe_releases_its_slot(self):
+        class HangingTransport(AsyncTransport):
+            async def request(self, method, url, headers=None, params=None, data=None, timeout=10):
+                await asyncio.Event().wait()
+
+        breakers = CircuitBreakerRegistry(failure_threshold=1, recovery_timeout=0)
+        breaker = breakers.get("api.twitch.tv", "/helix/streams")
+        breaker.record_failure()
+        async with AsyncTwitch("client_id", "client_secret", transport=HangingTransport(),
+                               circuit_breakers=breakers) as twitch:
+            probe = asyncio.ensure_future(twitch._make_request("https://api.twitch.tv/helix/streams"))
+            await asyncio.sleep(0.01)
+            self.assertFalse(breaker.allow())
+            probe.cancel()
+            await asyncio.gather(probe, return_exceptions=True)
+
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+
+    async def test_fallback_disabled(self):
+        breakers = CircuitBreakerRegistry(failure_threshold=1)
+        async with AsyncYoutube("key", transport=AsyncReplayTransport(failing_cassette()), retry_policy=NO_RETRY,
+                                circuit_breakers=breakers, ytdlp_fallback=False) as youtube:
+            await youtube.check_stream_live("googledevs")
+            self.assertEqual(await youtube.check_stream_live("googledevs"), UnknownStream("circuit_open"))
+
+    async def test_unhealthy_validation_is_not_repeated(self):
+        breakers = CircuitBreakerRegistry(failure_threshold=1)
+        transport = CountingTransport(validation_cassette(403, "quotaExceeded"))
+        async with AsyncYoutube("key", transport=transport, retry_policy=NO_RETRY,
+                                circuit_breakers=breakers) as youtube:
+            with mock.patch.object(youtube, "_extract_info", return_value=None):
+                self.assertEqual(await youtube.check_stream_live("googledevs"), UnknownStream("error"))
+                self.assertTrue(breakers.is_open(AsyncYoutube.API_HOST, "/youtube/v3/search"))
+                for _ in range(6):
+                    self.assertIsNot(await youtube.check_stream_live("googledevs"), None)
+
+        validations = [url for url in transport.urls if url == transport.cassette.key("GET", YOUTUBE_VALIDATE_URL)]
+        self.assertEqual(len(validations), 1)
+
+    async def test_rejected_key(self):
+        transport = CountingTransport(validation_cassette(400, "keyInvalid"))
+        async with AsyncYoutube("key", transport=transport, retry_policy=NO_RETRY) as youtube:
+            for _ in range(3):
+                with self.assertRaises(OauthException):
+                    await youtube.check_stream_live("googledevs")
+            self.assertEqual(len(transport.urls), 1)
+
+            youtube.oauth.api_key = "other"
+            with self.assertRaises(OauthException):
+                await youtube.check_stream_live("googledevs")
+            self.assertEqual(len(transport.urls), 2)
+
+
+class TestSyncFailover(TemporaryDirectoryMixin):
+    def test_fallback_to_yt_dlp(self):
+        breakers = CircuitBreakerRegistry(failure_threshold=1)
+        with SyncYoutube("key", transport=SyncReplayTransport(failing_cassette()), retry_policy=NO_RETRY,
+                         circuit_breakers=breakers) as youtube:
+            with mock.patch.object(youtube.client, "_extract_info", side_effect=RuntimeError("blocked")):
+                self.assertEqual(youtube.check_stream_live("googledevs"), UnknownStream("error"))
+                self.assertEqual(youtube.check_stream_live("googledevs"), UnknownStream("error"))
+                self.assertTrue(breakers.is_open(SyncYoutube.API_HOST))
+
+
+if __name__ == "__main__":
+    unittest.main()
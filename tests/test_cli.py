@@ -0,0 +1,95 @@
+import io
+import json
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.async_api.youtube import AsyncYoutube
+from tystream.changes import ChangeDetector
+from tystream.cli import NDJSONWriter, read_watchlist, watch, main, build_parser, _create_clients
+from tystream.transport import Cassette
+
+from tests.fixtures import TemporaryDirectoryMixin, TWITCH_STREAM, twitch_cassette, response
+
+
+class TestWatchlist(unittest.TestCase):
+    def test_read_watchlist(self):
+        lines = ["twitchdev", "  # comment", "", "youtube:@googledevs  # trailing", "TWITCH: shroud", "twitchdev"]
+        self.assertEqual(read_watchlist(lines), {"twitch": ["twitchdev", "shroud"], "youtube": ["@googledevs"]})
+        self.assertEqual(read_watchlist(["googledevs"], "youtube"), {"youtube": ["googledevs"]})
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            read_watchlist(["kick:someone"])
+
+
+class TestNDJSONWriter(unittest.TestCase):
+    def test_buffered_writes(self):
+        stream = io.BytesIO()
+        writer = NDJSONWriter(stream, buffer_size=64)
+        writer.write({"event": "online"})
+        self.assertEqual(stream.getvalue(), b"")
+        writer.flush()
+        self.assertEqual(stream.getvalue(), b'{"event":"online"}\n')
+
+
+class TestWatch(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_once(self):
+        stream = io.BytesIO()
+        cassette = twitch_cassette()
+        cassette.add(cassette.key("GET", "https://api.twitch.tv/helix/streams?user_login=twitchdev&user_login=unknown"),
+                     response({"data": [TWITCH_STREAM]}))
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(cassette)) as twitch:
+            await watch({"twitch": ["twitchdev", "unknown"]}, {"twitch": twitch}, NDJSONWriter(stream),
+                        ChangeDetector(emit_initial=True), once=True)
+
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["event"], "online")
+        self.assertEqual(events[0]["channel"], "twitchdev")
+        self.assertEqual(events[0]["new"], str(TWITCH_STREAM["id"]))
+
+    async def test_sweeps_in_the_background(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette())) as twitch:
+            with mock.patch.object(twitch, "check_streams_live", wraps=twitch.check_streams_live) as sweep:
+                await watch({"twitch": ["twitchdev"]}, {"twitch": twitch}, NDJSONWriter(io.BytesIO()),
+                            concurrency=10, once=True, deadline=5)
+        sweep.assert_called_once_with(["twitchdev"], 5, 10, "background")
+
+    async def test_youtube_without_api_key(self):
+        stream = io.BytesIO()
+        async with AsyncYoutube(None, transport=AsyncReplayTransport(Cassette())) as youtube:
+            with mock.patch.object(youtube, "_extract_info", return_value=None) as extract:
+                await watch({"youtube": ["googledevs"]}, {"youtube": youtube}, NDJSONWriter(stream),
+                            ChangeDetector(watch=("online", "offline")), once=True)
+        extract.assert_called_once_with("googledevs")
+        self.assertEqual(stream.getvalue(), b"")
+
+
+class TestMain(TemporaryDirectoryMixin):
+    def test_missing_credentials(self):
+        with open("channels.txt", "w", encoding="utf-8") as file:
+            file.write("twitchdev\n")
+        with redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit) as exit_:
+            main(["watch", "channels.txt", "--twitch-client-id", "", "--twitch-client-secret", ""])
+        self.assertEqual(exit_.exception.code, 2)
+        self.assertIn("--twitch-client-id", stderr.getvalue())
+
+    def test_youtube_without_api_key(self):
+        parser = build_parser()
+        args = parser.parse_args(["watch", "--youtube-api-key", ""])
+        clients = _create_clients(args, ["youtube"], parser)
+        self.assertIsNone(clients["youtube"].oauth.api_key)
+
+    def test_unknown_event_kind(self):
+        with open("channels.txt", "w", encoding="utf-8") as file:
+            file.write("twitchdev\n")
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main(["watch", "channels.txt", "--events", "online,raid"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.youtube import AsyncYoutube
+from tystream.metrics import MetricsRegistry
+from tystream.sync_api.transport import SyncReplayTransport
+from tystream.sync_api.youtube import SyncYoutube
+from tystream.transport import TransportResponse
+
+from tests.fixtures import (TemporaryDirectoryMixin, youtube_cassette, response, YOUTUBE_VIDEO,
+                            YOUTUBE_CHANNELS_URL, YOUTUBE_VIDEOS_URL)
+
+NOT_MODIFIED = TransportResponse(304, {"ETag": '"v1"'}, b"")
+
+
+def etag_cassette():
+    """
+    The channel and video requests answer with an ETag first and 304 afterwards.
+    """
+    cassette = youtube_cassette()
+    for url, payload in ((YOUTUBE_CHANNELS_URL, {"items": [{"id": YOUTUBE_VIDEO["snippet"]["channelId"]}]}),
+                         (YOUTUBE_VIDEOS_URL, {"items": [YOUTUBE_VIDEO]})):
+        cassette._entries[cassette.key("GET", url)] = [response(payload, headers={"ETag": '"v1"'}), NOT_MODIFIED]
+    return cassette
+
+
+class TestAsyncConditionalRequests(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_not_modified_reuses_body(self):
+        class Transport(AsyncReplayTransport):
+            sent = []
+
+            async def request(self, method, url, headers=None, params=None, data=None, timeout=10):
+                if "/videos" in url:
+                    self.sent.append(dict(headers or {}))
+                return await super().request(method, url, headers, params, data, timeout)
+
+        metrics = MetricsRegistry()
+        async with AsyncYoutube("key", cache_ttl=0, transport=Transport(etag_cassette()), metrics=metrics) as youtube:
+            first = await youtube.check_stream_live("googledevs")
+            second = await youtube.check_stream_live("googledevs")
+
+        self.assertEqual(first, second)
+        self.assertNotIn("If-None-Match", Transport.sent[0])
+        self.assertEqual(Transport.sent[1]["If-None-Match"], '"v1"')
+        self.assertEqual(metrics.get("not_modified_total", endpoint="/youtube/v3/videos"), 1)
+        self.assertEqual(metrics.get("not_modified_total", endpoint="/youtube/v3/channels"), 1)
+
+    async def test_clear_cache_drops_validators(self):
+        async with AsyncYoutube("key", transport=AsyncReplayTransport(etag_cassette())) as youtube:
+            await youtube.check_stream_live("googledevs")
+            self.assertEqual(len(youtube._etag_cache), 2)
+            await youtube.clear_cache()
+            self.assertEqual(youtube._etag_cache, {})
+
+
+class TestSyncConditionalRequests(TemporaryDirectoryMixin):
+    def test_not_modified_reuses_body(self):
+        metrics = MetricsRegistry()
+        with SyncYoutube("key", cache_ttl=0, transport=SyncReplayTransport(etag_cassette()), metrics=metrics) as youtube:
+            self.assertEqual(youtube.check_stream_live("googledevs"), youtube.check_stream_live("googledevs"))
+        self.assertEqual(metrics.get("not_modified_total", endpoint="/youtube/v3/channels"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import asyncio
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncTransport, AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.async_api.youtube import AsyncYoutube
+from tystream.metrics import MetricsRegistry
+from tystream.models.status import UnknownStream
+from tystream.models.twitch import TwitchStreamData
+from tystream.models.youtube import YoutubeStreamDataAPI
+from tystream.sync_api.transport import SyncReplayTransport
+from tystream.sync_api.twitch import SyncTwitch
+
+from tests.fixtures import (TemporaryDirectoryMixin, twitch_cassette, youtube_cassette, response, TWITCH_USER,
+                            TWITCH_STREAM, YOUTUBE_VIDEO, YOUTUBE_VIDEOS_URL)
+
+
+class SlowTransport(AsyncTransport):
+    """
+    Replay a cassette, delaying requests whose url contains one of ``slow``.
+    """
+
+    def __init__(self, cassette, slow=(), delay: float = 5.0) -> None:
+        self.transport = AsyncReplayTransport(cassette)
+        self.slow = tuple(slow)
+        self.delay = delay
+
+    async def request(self, method, url, headers=None, params=None, data=None, timeout=10):
+        if any(part in url or part in str(params) for part in self.slow):
+            await asyncio.sleep(self.delay)
+        return await self.transport.request(method, url, headers=headers, params=params, data=data, timeout=timeout)
+
+
+def batch_cassette():
+    cassette = twitch_cassette()
+    cassette.add(cassette.key("GET", "https://api.twitch.tv/helix/users?login=slowpoke"),
+                 response({"data": [{**TWITCH_USER, "id": "2", "login": "slowpoke"}]}))
+    cassette.add(cassette.key("GET", "https://api.twitch.tv/helix/streams?user_login=slowpoke"), response({"data": []}))
+    cassette.add(cassette.key("GET", "https://api.twitch.tv/helix/streams?user_login=nobody"), response({}, status=400))
+    cassette.add(cassette.key("GET", "https://api.twitch.tv/helix/streams?user_login=twitchdev&user_login=slowpoke"),
+                 response({"data": [TWITCH_STREAM]}))
+    return cassette
+
+
+class TestTwitchDeadline(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_stragglers_are_unknown(self):
+        metrics = MetricsRegistry()
+        async with AsyncTwitch("client_id", "client_secret", metrics=metrics,
+                               transport=SlowTransport(batch_cassette(), ["slowpoke"])) as twitch:
+            await twitch.check_stream_live("twitchdev")
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            results = await twitch.check_streams_live(["slowpoke", "twitchdev"], deadline=0.2)
+            elapsed = loop.time() - start
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual(list(results), ["slowpoke", "twitchdev"])
+        self.assertIsInstance(results["twitchdev"], TwitchStreamData)
+        self.assertEqual(results["slowpoke"], UnknownStream("timeout"))
+        self.assertEqual(results.timed_out, {"slowpoke"})
+        self.assertFalse(results.complete)
+        self.assertEqual(metrics.get("checks_timed_out_total", outcome="unknown"), 1)
+
+    async def test_failed_checks_are_unknown(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(batch_cassette())) as twitch:
+            results = await twitch.check_streams_live(["nobody"])
+        self.assertEqual(results["nobody"], UnknownStream("error"))
+        self.assertTrue(results.complete)
+
+    async def test_stragglers_use_stale_entries(self):
+        async with AsyncTwitch("client_id", "client_secret", cache_ttl=60,
+                               transport=SlowTransport(batch_cassette(), ["slowpoke"], delay=0.05)) as twitch:
+            self.assertTrue((await twitch.check_streams_live(["slowpoke"])).complete)
+            twitch.cache_ttl = 0
+            twitch.transport.delay = 5
+            results = await twitch.check_streams_live(["slowpoke"], deadline=0.1)
+
+        self.assertIs(results["slowpoke"], False)
+        self.assertEqual(results.stale, {"slowpoke"})
+
+    async def test_without_deadline(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(batch_cassette())) as twitch:
+            results = await twitch.check_streams_live(["twitchdev", "slowpoke", "TwitchDev"])
+        self.assertEqual(set(results), {"twitchdev", "slowpoke", "TwitchDev"})
+        self.assertTrue(results.complete)
+        self.assertIs(results["slowpoke"], False)
+
+
+class TestYoutubeDeadline(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_stale_stream_is_rebuilt_from_the_etag_cache(self):
+        cassette = youtube_cassette()
+        cassette._entries[cassette.key("GET", YOUTUBE_VIDEOS_URL)] = [
+            response({"items": [YOUTUBE_VIDEO]}, headers={"ETag": '"v1"'})
+        ]
+        transport = SlowTransport(cassette, ["search"], delay=0)
+        async with AsyncYoutube("key", ytdlp_fallback=False, transport=transport) as youtube:
+            fresh = await youtube.check_stream_live("googledevs")
+            youtube.cache_ttl = 0
+            transport.delay = 5
+            results = await youtube.check_streams_live(["googledevs"], deadline=0.1)
+
+        self.assertIsInstance(results["googledevs"], YoutubeStreamDataAPI)
+        self.assertEqual(results["googledevs"].id, fresh.id)
+        self.assertEqual(results.stale, {"googledevs"})
+
+
+class TestSyncDeadline(TemporaryDirectoryMixin):
+    def test_batch(self):
+        with SyncTwitch("client_id", "client_secret", transport=SyncReplayTransport(batch_cassette())) as twitch:
+            results = twitch.check_streams_live(iter(["twitchdev", "slowpoke"]), deadline=5)
+        self.assertIsInstance(results["twitchdev"], TwitchStreamData)
+        self.assertIs(results["slowpoke"], False)
+
+
+if __name__ == "__main__":
+    unittest.main()
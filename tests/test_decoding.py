@@ -0,0 +1,61 @@
+import json
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.decoding import get_decoder, stdlib_decoder
+from tystream.models.twitch import TwitchVODPage
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette, response, TWITCH_VOD
+
+VIDEOS_URL = "https://api.twitch.tv/helix/videos?user_id=141981764&type=archive&first=1"
+
+
+class TestGetDecoder(unittest.TestCase):
+    def test_names(self):
+        self.assertIs(get_decoder("json"), stdlib_decoder)
+        self.assertEqual(get_decoder("auto")(b'{"data": [1]}'), {"data": [1]})
+        self.assertIs(get_decoder(json.loads), json.loads)
+        with self.assertRaises(ValueError):
+            get_decoder("yaml")
+
+    def test_orjson(self):
+        try:
+            import orjson
+        except ImportError:
+            with self.assertRaises(ImportError):
+                get_decoder("orjson")
+            self.assertIs(get_decoder(), stdlib_decoder)
+        else:
+            self.assertIs(get_decoder("orjson"), orjson.loads)
+            self.assertIs(get_decoder(), orjson.loads)
+
+
+class TestClientDecoder(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_responses_use_the_decoder(self):
+        decoded = []
+
+        def decoder(body: bytes):
+            decoded.append(len(body))
+            return json.loads(body)
+
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette()),
+                               decoder=decoder) as twitch:
+            await twitch.check_stream_live("twitchdev")
+        # helix/users and helix/streams, the oauth token is not a platform response
+        self.assertEqual(len(decoded), 2)
+
+    async def test_raw_body_is_validated_into_the_model(self):
+        cassette = twitch_cassette()
+        cassette.add(cassette.key("GET", VIDEOS_URL), response({"data": [TWITCH_VOD], "pagination": {}}))
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(cassette)) as twitch:
+            body = await twitch._make_request(VIDEOS_URL, raw=True)
+            page = twitch._build_model_json(TwitchVODPage, body)
+        self.assertIsInstance(body, bytes)
+        self.assertEqual(page.data[0].id, TWITCH_VOD["id"])
+        self.assertEqual(page.pagination, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
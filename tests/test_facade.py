@@ -0,0 +1,57 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from tystream.models.twitch import TwitchStreamData
+from tystream.models.youtube import YoutubeStreamDataAPI
+from tystream.sync_api.loop import EventLoopThread
+from tystream.sync_api.transport import SyncReplayTransport
+from tystream.sync_api.twitch import SyncTwitch
+from tystream.sync_api.youtube import SyncYoutube
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette, youtube_cassette
+
+
+class TestEventLoopThread(unittest.TestCase):
+    def setUp(self) -> None:
+        self.loop = EventLoopThread(name="tystream-test-loop")
+
+    def tearDown(self) -> None:
+        self.loop.stop()
+
+    def test_iterate(self):
+        async def count():
+            for number in range(3):
+                yield number
+        self.assertEqual(list(self.loop.iterate(count())), [0, 1, 2])
+
+    def test_call_from_loop_thread_raises(self):
+        async def nested():
+            return self.loop.run(noop())
+
+        async def noop():
+            return None
+
+        with self.assertRaises(RuntimeError):
+            self.loop.run(nested())
+
+    def test_stop(self):
+        self.loop.stop()
+        self.assertFalse(self.loop.running)
+
+
+class TestSyncFacade(TemporaryDirectoryMixin):
+    def test_threads_share_the_async_client(self):
+        with SyncTwitch("client_id", "client_secret", transport=SyncReplayTransport(twitch_cassette())) as twitch:
+            with ThreadPoolExecutor(4) as executor:
+                results = list(executor.map(twitch.check_stream_live, ["twitchdev"] * 8))
+            self.assertTrue(all(isinstance(result, TwitchStreamData) for result in results))
+            self.assertIn("twitchdev", twitch.client._stream_cache)
+            self.assertEqual(twitch.cache_ttl, 300)
+
+    def test_youtube_api_path(self):
+        with SyncYoutube("key", transport=SyncReplayTransport(youtube_cassette())) as youtube:
+            self.assertIsInstance(youtube.check_stream_live("googledevs"), YoutubeStreamDataAPI)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.metrics import MetricsRegistry
+from tystream.models.twitch import TwitchStreamData, TwitchUserData
+from tystream.sync_api.transport import SyncReplayTransport
+from tystream.sync_api.twitch import SyncTwitch
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette, response, TWITCH_STREAM, TWITCH_USER
+
+GAMES = [
+    {"id": "509670", "name": "Science & Technology", "igdb_id": "",
+     "box_art_url": "https://static-cdn.jtvnw.net/ttv-boxart/509670-{width}x{height}.jpg"},
+    {"id": "509658", "name": "Just Chatting", "igdb_id": "1234",
+     "box_art_url": "https://static-cdn.jtvnw.net/ttv-boxart/509658-{width}x{height}.jpg"},
+]
+GAMES_URL = "https://api.twitch.tv/helix/games?id=509670&id=509658"
+
+
+def streams():
+    user = TwitchUserData(**TWITCH_USER)
+    return [
+        TwitchStreamData(**TWITCH_STREAM, user=user),
+        TwitchStreamData(**{**TWITCH_STREAM, "id": "1", "game_id": "509658", "game_name": "Just Chatting"}, user=user),
+        TwitchStreamData(**{**TWITCH_STREAM, "id": "2"}, user=user),
+        False,
+    ]
+
+
+def games_cassette():
+    cassette = twitch_cassette()
+    cassette.add(cassette.key("GET", GAMES_URL), response({"data": GAMES}))
+    return cassette
+
+
+class TestAsyncGames(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_batch_and_cache(self):
+        metrics = MetricsRegistry()
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(games_cassette()),
+                               metrics=metrics) as twitch:
+            games = await twitch.get_stream_games(streams())
+            self.assertEqual(set(games), {"509670", "509658"})
+            self.assertIsNone(games["509670"].igdb_id)
+            self.assertEqual(games["509658"].box_art(52, 72),
+                             "https://static-cdn.jtvnw.net/ttv-boxart/509658-52x72.jpg")
+
+            self.assertEqual(set(await twitch.get_games([509670, "509658"])), {"509670", "509658"})
+            self.assertEqual(len(twitch.snapshot()["caches"]["game"]), 2)
+
+        self.assertEqual(metrics.get("requests_total", endpoint="/helix/games", status="200"), 1)
+
+    async def test_chunks_of_100(self):
+        requested = []
+
+        class Transport(AsyncReplayTransport):
+            async def request(self, method, url, headers=None, params=None, data=None, timeout=10):
+                if "/helix/games" in url:
+                    requested.append(url.count("id="))
+                    return response({"data": []})
+                return await super().request(method, url, headers, params, data, timeout)
+
+        async with AsyncTwitch("client_id", "client_secret", transport=Transport(twitch_cassette())) as twitch:
+            self.assertEqual(await twitch.get_games(range(1, 251)), {})
+        self.assertEqual(requested, [100, 100, 50])
+
+
+class TestSyncGames(TemporaryDirectoryMixin):
+    def test_batch(self):
+        with SyncTwitch("client_id", "client_secret", transport=SyncReplayTransport(games_cassette())) as twitch:
+            self.assertEqual(twitch.get_stream_games(streams())["509670"].name, "Science & Technology")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+import unittest
+
+import tystream
+
+HEAVY_MODULES = ("yt_dlp", "requests", "aiohttp", "pydantic", "colorlog")
+
+
+def loaded_modules(code: str) -> list:
+    """
+    Run ``code`` in a fresh interpreter and return the heavy modules it loaded.
+    """
+    script = f"import sys\n{code}\nimport json\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_loads_nothing_heavy(self):
+        self.assertEqual(loaded_modules("import tystream"), [])
+
+    def test_async_twitch_does_not_load_sync_or_yt_dlp(self):
+        loaded = loaded_modules("import tystream\ntystream.AsyncTwitch")
+        self.assertNotIn("yt_dlp", loaded)
+        self.assertNotIn("requests", loaded)
+        self.assertNotIn("colorlog", loaded)
+
+    def test_async_youtube_does_not_load_yt_dlp(self):
+        self.assertNotIn("yt_dlp", loaded_modules("from tystream import AsyncYoutube"))
+
+    def test_public_names_resolve(self):
+        for name in tystream.__all__:
+            self.assertIsNotNone(getattr(tystream, name))
+
+    def test_baseline_names(self):
+        from tystream import YDL_OPTS
+        from tystream.async_api.youtube import YDL_OPTS as async_opts
+        self.assertIs(YDL_OPTS, async_opts)
+        self.assertNotIn("yt_dlp", loaded_modules("from tystream import YDL_OPTS"))
+
+
+if __name__ == "__main__":
+    unittest.main()
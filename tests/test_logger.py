@@ -0,0 +1,49 @@
+import logging
+import logging.handlers
+import os
+import unittest
+
+from tystream.logger import setup_logging, close_log_handlers
+
+from tests.fixtures import TemporaryDirectoryMixin
+
+
+class TestSetupLogging(TemporaryDirectoryMixin):
+    def tearDown(self) -> None:
+        close_log_handlers()
+        super().tearDown()
+
+    def test_idempotent(self):
+        root = logging.getLogger()
+        before = list(root.handlers)
+
+        setup_logging()
+        setup_logging()
+
+        added = [handler for handler in root.handlers if handler not in before]
+        self.assertEqual(len(added), 1)
+        self.assertIsInstance(added[0], logging.handlers.QueueHandler)
+
+        close_log_handlers()
+        self.assertEqual(root.handlers, before)
+
+    def test_file_is_appended(self):
+        with open("stream.log", "w", encoding="utf-8") as f:
+            f.write("previous run\n")
+
+        setup_logging(use_queue=False)
+        logging.getLogger("tystream.test").error("%s is live!", "twitchdev")
+        close_log_handlers()
+
+        with open("stream.log", encoding="utf-8") as f:
+            content = f.read()
+        self.assertTrue(content.startswith("previous run"))
+        self.assertIn("twitchdev is live!", content)
+
+    def test_console_only(self):
+        setup_logging(filename=None)
+        self.assertFalse(os.path.exists("stream.log"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.metrics import MetricsRegistry, DISABLED_METRICS
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_render(self):
+        metrics = MetricsRegistry(buckets=(0.1, 1.0))
+        metrics.inc("requests_total", endpoint="/helix/streams", status="200")
+        metrics.inc("requests_total", endpoint="/helix/streams", status="200")
+        metrics.set("cache_entries", 3, cache="user")
+        metrics.observe("request_duration_seconds", 0.5, endpoint="/helix/streams")
+
+        text = metrics.render()
+        self.assertIn("# TYPE tystream_requests_total counter", text)
+        self.assertIn('tystream_requests_total{endpoint="/helix/streams",status="200"} 2.0', text)
+        self.assertIn('tystream_cache_entries{cache="user"} 3', text)
+        self.assertIn('tystream_request_duration_seconds_bucket{endpoint="/helix/streams",le="0.1"} 0', text)
+        self.assertIn('tystream_request_duration_seconds_bucket{endpoint="/helix/streams",le="1.0"} 1', text)
+        self.assertIn('tystream_request_duration_seconds_count{endpoint="/helix/streams"} 1', text)
+
+    def test_callback(self):
+        events = []
+        metrics = MetricsRegistry()
+        metrics.add_callback(lambda *args: events.append(args))
+        metrics.inc("token_refreshes_total", platform="twitch")
+        self.assertEqual(events, [("counter", "token_refreshes_total", 1.0, {"platform": "twitch"})])
+
+    def test_disabled(self):
+        DISABLED_METRICS.inc("requests_total")
+        with DISABLED_METRICS.timer("request_duration_seconds"):
+            pass
+        self.assertEqual(DISABLED_METRICS.render(), "\n")
+
+
+class TestPlatformMetrics(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_check_stream_live(self):
+        metrics = MetricsRegistry()
+        transport = AsyncReplayTransport(twitch_cassette())
+        async with AsyncTwitch("client_id", "client_secret", transport=transport, metrics=metrics) as twitch:
+            await twitch.check_stream_live("twitchdev")
+            await twitch.check_stream_live("twitchdev")
+
+        self.assertEqual(metrics.get("requests_total", endpoint="/helix/streams", status="200"), 1)
+        self.assertEqual(metrics.get("request_duration_seconds", endpoint="/helix/users"), 1)
+        self.assertEqual(metrics.get("cache_hits_total", cache="stream"), 1)
+        self.assertEqual(metrics.get("cache_entries", cache="user"), 1)
+        self.assertGreaterEqual(metrics.get("token_refreshes_total", platform="twitch"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
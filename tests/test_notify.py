@@ -0,0 +1,161 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tystream.changes import StreamOnline, TitleChanged
+from tystream.metrics import MetricsRegistry
+from tystream.notify import DeliveryPipeline, WebhookSink, DiscordWebhookSink, SlackWebhookSink
+from tystream.retry import RetryPolicy
+
+
+class WebhookServer:
+    """
+    A local stand-in for Discord/Slack webhooks.
+
+    ``/ok`` answers 204, ``/limited`` answers 429 to the first POST, ``/exhausted`` reports an
+    exhausted rate limit after the first POST, ``/flaky`` answers 500 to the first POST of every
+    idempotency key and ``/slow`` takes 50ms, tracking the POSTs in flight.
+    """
+
+    def __init__(self) -> None:
+        self.posts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.limited = 0
+        self.failed = set()
+        app = web.Application()
+        app.router.add_post("/{name}", self.handle)
+        self.server = TestServer(app)
+
+    def url(self, name: str) -> str:
+        return str(self.server.make_url(f"/{name}"))
+
+    async def handle(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        key = request.headers.get("Idempotency-Key")
+        body = await request.json()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if name == "limited" and not self.limited:
+                self.limited += 1
+                return web.json_response({"retry_after": 0.2}, status=429, headers={"Retry-After": "0.2"})
+            if name == "flaky" and key not in self.failed:
+                self.failed.add(key)
+                return web.Response(status=500)
+            if name == "slow":
+                await asyncio.sleep(0.05)
+            self.posts.append((name, key, body, time.monotonic()))
+            remaining = "0" if name == "exhausted" else "4"
+            return web.Response(status=204, headers={"X-RateLimit-Remaining": remaining,
+                                                     "X-RateLimit-Reset-After": "0.2"})
+        finally:
+            self.in_flight -= 1
+
+
+def online(channel: str = "twitchdev", stream_id: str = "1") -> StreamOnline:
+    return StreamOnline("twitch", channel, None, stream_id, False, time.time())
+
+
+class TestDeliveryPipeline(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.webhooks = WebhookServer()
+        await self.webhooks.server.start_server()
+        self.retry_policy = RetryPolicy(max_attempts=3, base_delay=0.01, jitter=False)
+
+    async def asyncTearDown(self) -> None:
+        await self.webhooks.server.close()
+
+    async def test_fan_out(self):
+        sinks = [DiscordWebhookSink(self.webhooks.url("ok"), name="discord"),
+                 SlackWebhookSink(self.webhooks.url("ok"), name="slack"),
+                 WebhookSink(self.webhooks.url("ok"), name="titles", kinds=("title",))]
+        async with DeliveryPipeline(sinks, retry_policy=self.retry_policy) as pipeline:
+            await pipeline.submit(online())
+
+        bodies = sorted(json.dumps(body) for _, _, body, _ in self.webhooks.posts)
+        self.assertEqual(bodies, [json.dumps({"content": "**twitchdev** is live on Twitch: None\nNone"}),
+                                  json.dumps({"text": "*twitchdev* is live on Twitch: None\nNone"})])
+
+    async def test_retry_keeps_idempotency_key(self):
+        metrics = MetricsRegistry()
+        async with DeliveryPipeline([WebhookSink(self.webhooks.url("flaky"), name="flaky")],
+                                   retry_policy=self.retry_policy, metrics=metrics) as pipeline:
+            self.assertEqual(await pipeline.deliver(online()), {"flaky": True})
+
+        self.assertEqual(len(self.webhooks.posts), 1)
+        self.assertIn(self.webhooks.posts[0][1], self.webhooks.failed)
+        self.assertEqual(metrics.get("delivery_retries_total", sink="flaky"), 1)
+
+    async def test_duplicates_are_posted_once(self):
+        metrics = MetricsRegistry()
+        async with DeliveryPipeline([WebhookSink(self.webhooks.url("slow"), name="slow")],
+                                   retry_policy=self.retry_policy, metrics=metrics) as pipeline:
+            for _ in range(3):
+                await pipeline.submit(online())
+            await pipeline.join()
+            await pipeline.submit(online())
+
+        self.assertEqual(len(self.webhooks.posts), 1)
+        self.assertEqual(metrics.get("deliveries_total", sink="slow", outcome="duplicate"), 3)
+
+    async def test_per_sink_concurrency(self):
+        sink = WebhookSink(self.webhooks.url("slow"), concurrency=2)
+        async with DeliveryPipeline([sink], retry_policy=self.retry_policy) as pipeline:
+            for number in range(8):
+                await pipeline.submit(online(f"channel{number}"))
+
+        self.assertEqual(len(self.webhooks.posts), 8)
+        self.assertEqual(self.webhooks.max_in_flight, 2)
+
+    async def test_too_many_requests_pauses_the_sink(self):
+        metrics = MetricsRegistry()
+        start = time.monotonic()
+        async with DeliveryPipeline([WebhookSink(self.webhooks.url("limited"), name="limited", concurrency=1)],
+                                   retry_policy=self.retry_policy, metrics=metrics) as pipeline:
+            for number in range(3):
+                await pipeline.submit(online(f"channel{number}"))
+
+        self.assertEqual(len(self.webhooks.posts), 3)
+        self.assertGreaterEqual(self.webhooks.posts[0][3] - start, 0.2)
+        self.assertEqual(metrics.get("delivery_retries_total", sink="limited"), 1)
+
+    async def test_exhausted_rate_limit_pauses_the_sink(self):
+        async with DeliveryPipeline([WebhookSink(self.webhooks.url("exhausted"), concurrency=1)],
+                                   retry_policy=self.retry_policy) as pipeline:
+            for number in range(3):
+                await pipeline.submit(online(f"channel{number}"))
+
+        posted = [posted for _, _, _, posted in self.webhooks.posts]
+        self.assertEqual(len(posted), 3)
+        self.assertTrue(all(later - earlier >= 0.2 for earlier, later in zip(posted, posted[1:])))
+
+    async def test_backpressure(self):
+        metrics = MetricsRegistry()
+        pipeline = DeliveryPipeline([WebhookSink(self.webhooks.url("ok"))], queue_size=1, metrics=metrics)
+        self.assertTrue(pipeline.submit_nowait(online("a")))
+        self.assertFalse(pipeline.submit_nowait(online("b")))
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(pipeline.submit(online("c")), 0.05)
+        self.assertEqual(metrics.get("notifications_dropped_total"), 1)
+
+        pipeline.start()
+        await pipeline.close()
+        self.assertEqual([body["channel"] for _, _, body, _ in self.webhooks.posts], ["a"])
+
+    def test_idempotency_keys(self):
+        sink = WebhookSink("https://example.com/hook")
+        self.assertEqual(sink.idempotency_key(online()), sink.idempotency_key(online("TwitchDev")))
+        self.assertNotEqual(sink.idempotency_key(online()), sink.idempotency_key(online(stream_id="2")))
+        first = TitleChanged("twitch", "twitchdev", None, "a", False, 1.0)
+        again = TitleChanged("twitch", "twitchdev", None, "a", False, 2.0)
+        self.assertNotEqual(sink.idempotency_key(first), sink.idempotency_key(again))
+
+
+if __name__ == "__main__":
+    unittest.main()
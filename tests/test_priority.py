@@ -0,0 +1,147 @@
+import asyncio
+import time
+import unittest
+from urllib.parse import urlencode
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.priority import PriorityLimiter, request_priority, current_priority
+from tystream.sync_api.twitch import SyncTwitch
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette, response
+
+
+class TestPriorityLimiter(IsolatedAsyncioTestCase):
+    async def grant_order(self, limiter: PriorityLimiter, waiters):
+        order = []
+
+        async def wait(name: str, priority: str):
+            async with limiter.slot(priority):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await limiter.acquire()
+        tasks = [asyncio.ensure_future(wait(name, priority)) for name, priority in waiters]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    async def test_interactive_first(self):
+        order = await self.grant_order(PriorityLimiter(1), [
+            ("b1", "background"), ("b2", "background"), ("i1", "interactive"), ("i2", "interactive")
+        ])
+        self.assertEqual(order, ["i1", "i2", "b1", "b2"])
+
+    async def test_background_is_not_starved(self):
+        order = await self.grant_order(PriorityLimiter(1, background_every=2), [
+            ("b1", "background"), ("b2", "background"),
+            ("i1", "interactive"), ("i2", "interactive"), ("i3", "interactive"), ("i4", "interactive")
+        ])
+        self.assertEqual(order, ["i1", "b1", "i2", "b2", "i3", "i4"])
+
+    async def test_cancelled_waiters_free_their_place(self):
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire("background"))
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.waiting("background"), 1)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release()
+        self.assertEqual((limiter.in_flight, limiter.waiting()), (0, 0))
+        await asyncio.wait_for(limiter.acquire(), 1)
+
+    async def test_cancelled_before_the_next_grant(self):
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire("background"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        limiter.release()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual((limiter.in_flight, limiter.waiting()), (0, 0))
+
+    async def test_rate(self):
+        limiter = PriorityLimiter(10, rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(3):
+            async with limiter.slot():
+                pass
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_request_priority(self):
+        self.assertEqual(current_priority(), "interactive")
+        with request_priority("background"):
+            self.assertEqual(current_priority(), "background")
+        self.assertEqual(current_priority(), "interactive")
+        with self.assertRaises(ValueError):
+            with request_priority("urgent"):
+                pass
+
+
+class RecordingTransport(AsyncReplayTransport):
+    def __init__(self, cassette, delay: float = 0.0) -> None:
+        super().__init__(cassette)
+        self.delay = delay
+        self.requests = []
+
+    async def request(self, method, url, headers=None, params=None, data=None, timeout=10):
+        if "helix" in url:
+            self.requests.append((url.rsplit("=", 1)[-1], current_priority()))
+            await asyncio.sleep(self.delay)
+        return await super().request(method, url, headers=headers, params=params, data=data, timeout=timeout)
+
+
+def sweep_cassette(channels):
+    cassette = twitch_cassette(live=False)
+    for start in range(0, len(channels), 100):
+        query = urlencode([*(("user_login", channel) for channel in channels[start:start + 100]), ("first", 100)])
+        cassette.add(cassette.key("GET", f"https://api.twitch.tv/helix/streams?{query}"), response({"data": []}))
+    return cassette
+
+
+class TestClientPriority(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_interactive_check_skips_the_sweep(self):
+        channels = [f"channel{number}" for number in range(700)]
+        transport = RecordingTransport(sweep_cassette(channels), delay=0.01)
+        async with AsyncTwitch("client_id", "client_secret", transport=transport,
+                               limiter=PriorityLimiter(2)) as twitch:
+            await twitch._renew_token()
+            sweep = asyncio.ensure_future(twitch.check_streams_live(channels, priority="background"))
+            await asyncio.sleep(0.015)
+            self.assertFalse(await twitch.check_stream_live("twitchdev"))
+            self.assertFalse(sweep.done())
+            results = await sweep
+
+        self.assertTrue(results.complete)
+        self.assertFalse(any(results.values()))
+        self.assertEqual(len(transport.requests), 8)
+        position = transport.requests.index(("twitchdev", "interactive"))
+        self.assertLessEqual(position, 4)
+        self.assertEqual({priority for channel, priority in transport.requests if channel != "twitchdev"},
+                         {"background"})
+
+    async def test_deadline_cancels_queued_checks(self):
+        channels = [f"channel{number}" for number in range(300)]
+        transport = RecordingTransport(sweep_cassette(channels), delay=0.05)
+        limiter = PriorityLimiter(1)
+        async with AsyncTwitch("client_id", "client_secret", transport=transport, limiter=limiter) as twitch:
+            await twitch._renew_token()
+            results = await twitch.check_streams_live(channels, deadline=0.08, priority="background")
+
+        self.assertFalse(results.complete)
+        self.assertEqual((limiter.in_flight, limiter.waiting()), (0, 0))
+
+    def test_sync_calls_carry_the_priority(self):
+        transport = RecordingTransport(twitch_cassette(live=False))
+        with SyncTwitch("client_id", "client_secret", transport=transport) as twitch:
+            with request_priority("background"):
+                twitch.check_stream_live("twitchdev")
+        self.assertEqual(transport.requests, [("twitchdev", "background")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import time
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncTransport, AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.exceptions import HTTPException, TransportException
+from tystream.metrics import MetricsRegistry
+from tystream.retry import RetryPolicy
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette, response, TWITCH_USER
+
+USERS_URL = "https://api.twitch.tv/helix/users?login=twitchdev"
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_classification(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable(TransportException("reset")))
+        self.assertTrue(policy.is_retryable(HTTPException(503)))
+        self.assertTrue(policy.is_retryable(HTTPException(429)))
+        self.assertFalse(policy.is_retryable(HTTPException(404)))
+        self.assertFalse(policy.is_retryable(ValueError()))
+
+    def test_backoff(self):
+        policy = RetryPolicy(base_delay=1, max_delay=3, jitter=False)
+        self.assertEqual([policy.backoff(i) for i in (1, 2, 3, 4)], [1, 2, 3, 3])
+        self.assertEqual(policy.backoff(1, HTTPException(429, headers={"retry-after": "7"})), 7)
+        reset = str(int(time.time()) + 10)
+        self.assertAlmostEqual(policy.backoff(1, HTTPException(429, headers={"Ratelimit-Reset": reset})), 10, delta=1.5)
+
+    def test_hedge_after(self):
+        policy = RetryPolicy(hedge=True, hedge_min_samples=10)
+        for i in range(10):
+            policy.record("/helix/streams", i / 10, True)
+        self.assertEqual(policy.hedge_after("/helix/streams"), 0.9)
+        self.assertIsNone(policy.hedge_after("/helix/users"))
+
+        for _ in range(5):
+            policy.record("/helix/streams", None, False)
+        self.assertIsNone(policy.hedge_after("/helix/streams"))
+
+
+class TestPlatformRetry(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_transient_error_is_retried(self):
+        cassette = twitch_cassette()
+        cassette._entries[cassette.key("GET", USERS_URL)].insert(0, response({}, status=503))
+        metrics = MetricsRegistry()
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(cassette),
+                               metrics=metrics, retry_policy=RetryPolicy(base_delay=0)) as twitch:
+            user = await twitch.get_user("twitchdev")
+
+        self.assertEqual(user.login, "twitchdev")
+        self.assertEqual(metrics.get("retries_total", endpoint="/helix/users"), 1)
+
+    async def test_budget(self):
+        cassette = twitch_cassette()
+        cassette._entries[cassette.key("GET", USERS_URL)] = [response({}, status=429, headers={"Retry-After": "60"})]
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(cassette),
+                               retry_policy=RetryPolicy(total_timeout=5)) as twitch:
+            start = time.monotonic()
+            with self.assertRaises(HTTPException):
+                await twitch.get_user("twitchdev")
+            self.assertLess(time.monotonic() - start, 1)
+
+    async def test_hedged_request(self):
+        class SlowFirstTransport(AsyncTransport):
+            calls = 0
+
+            async def request(self, method, url, headers=None, params=None, data=None, timeout=10):
+                SlowFirstTransport.calls += 1
+                if SlowFirstTransport.calls == 1:
+                    await asyncio.sleep(5)
+                return response({"data": [TWITCH_USER]})
+
+        metrics = MetricsRegistry()
+        async with AsyncTwitch("client_id", "client_secret", transport=SlowFirstTransport(), metrics=metrics,
+                               retry_policy=RetryPolicy(hedge=True, hedge_delay=0.05)) as twitch:
+            start = time.monotonic()
+            await twitch._make_request(USERS_URL)
+            self.assertLess(time.monotonic() - start, 1)
+
+        self.assertEqual(metrics.get("hedges_total", endpoint="/helix/users"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from datetime import datetime, timezone
+
+from tystream.models.status import UnknownStream
+from tystream.scheduling import AdaptiveScheduler, LiveHistogram, hour_of_week, WEEK
+
+# a Monday, 00:00 UTC
+MONDAY = datetime(2024, 3, 4, tzinfo=timezone.utc).timestamp()
+HOUR = 3600
+
+
+def is_live(at: float) -> bool:
+    """A channel that streams on Monday and Thursday from 20:00 to 22:00 UTC."""
+    offset = (at - MONDAY) % WEEK
+    return any(day * 24 * HOUR + 20 * HOUR <= offset < day * 24 * HOUR + 22 * HOUR for day in (0, 3))
+
+
+def simulate(scheduler: AdaptiveScheduler, start: float, weeks: int):
+    """Run the scheduler against ``is_live``, returns the checks made and the detection delays of starts."""
+    scheduler.add("channel", at=start)
+    checks, delays = 0, []
+    now, end = start, start + weeks * WEEK
+    while now < end:
+        if scheduler.due(now):
+            checks += 1
+            live = is_live(now)
+            if live and scheduler._live.get("channel") is False:
+                offset = (now - MONDAY) % (24 * HOUR)
+                delays.append(offset - 20 * HOUR)
+            scheduler.record("channel", live, at=now)
+        now = scheduler.next_due()
+    return checks, delays
+
+
+class TestLiveHistogram(unittest.TestCase):
+    def test_hour_of_week(self):
+        self.assertEqual(hour_of_week(MONDAY), 0)
+        self.assertEqual(hour_of_week(MONDAY + 3 * 24 * HOUR + 20 * HOUR), 92)
+
+    def test_counts_once_per_week(self):
+        histogram = LiveHistogram()
+        for minute in range(0, 60, 5):
+            histogram.record(MONDAY + 20 * HOUR + minute * 60, True, minute == 0)
+        self.assertEqual((histogram.weeks[20], histogram.live[20], histogram.starts[20]), (1, 1, 1))
+        self.assertEqual(histogram.activity(20), 1.0)
+        self.assertEqual(histogram.activity(21), 0.0)
+
+
+class TestAdaptiveScheduler(unittest.TestCase):
+    def test_intervals_follow_schedule(self):
+        scheduler = AdaptiveScheduler(min_interval=60, max_interval=1800)
+        simulate(scheduler, MONDAY, weeks=2)
+
+        self.assertEqual(scheduler.interval("channel", MONDAY + 2 * WEEK + 19 * HOUR + 30 * 60), 60)
+        self.assertEqual(scheduler.interval("channel", MONDAY + 2 * WEEK + 2 * 24 * HOUR + 4 * HOUR), 1800)
+
+    def test_fewer_checks_without_detection_loss(self):
+        fixed_checks = 2 * WEEK // 60
+        scheduler = AdaptiveScheduler(min_interval=60, max_interval=1800)
+        simulate(scheduler, MONDAY, weeks=2)
+        checks, delays = simulate(scheduler, MONDAY + 2 * WEEK, weeks=2)
+
+        self.assertLess(checks * 4, fixed_checks)
+        self.assertTrue(delays)
+        self.assertTrue(all(delay <= 60 for delay in delays))
+
+    def test_unknown_result_is_retried(self):
+        scheduler = AdaptiveScheduler(min_interval=30, max_interval=600)
+        scheduler.add("channel", at=0)
+        self.assertEqual(scheduler.due(0), ["channel"])
+        self.assertEqual(scheduler.record("channel", UnknownStream("error"), at=0), 30)
+        self.assertIsNone(scheduler.histogram("channel"))
+        self.assertEqual(scheduler.next_due(), 30)
+
+    def test_remove(self):
+        scheduler = AdaptiveScheduler()
+        scheduler.add("Channel", at=0)
+        scheduler.remove("channel")
+        self.assertEqual(scheduler.due(10), [])
+        self.assertIsNone(scheduler.next_due())
+
+    def test_changing_watchlist_stays_bounded(self):
+        scheduler = AdaptiveScheduler(min_interval=60)
+        for number in range(1000):
+            channel = f"channel{number}"
+            scheduler.add(channel, at=number)
+            scheduler.record(channel, number % 2 == 0, at=number)
+            scheduler.remove(channel)
+
+        self.assertEqual(len(scheduler), 0)
+        self.assertIsNone(scheduler.histogram("channel0"))
+        self.assertEqual((scheduler._histograms, scheduler._live), ({}, {}))
+        self.assertLessEqual(len(scheduler._heap), 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tystream.async_api.oauth import TwitchOauth
+from tystream.async_api.transport import AiohttpTransport, SessionRegistry
+from tystream.async_api.twitch import AsyncTwitch
+
+from tests.fixtures import TemporaryDirectoryMixin
+
+
+class TestSessionRegistry(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.peers = []
+
+        async def handle(request: web.Request) -> web.Response:
+            self.peers.append(request.transport.get_extra_info("peername")[1])
+            return web.json_response({"ok": True})
+
+        app = web.Application()
+        app.router.add_get("/", handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.registry = SessionRegistry(host_groups={"127.0.0.1": "local"}, limit_per_host=5)
+
+    async def asyncTearDown(self) -> None:
+        await self.registry.close()
+        await self.server.close()
+
+    async def test_transports_share_warm_connections(self):
+        first, second = AiohttpTransport(registry=self.registry), AiohttpTransport(registry=self.registry)
+        url = str(self.server.make_url("/"))
+        self.assertEqual((await first.request("GET", url)).json(), {"ok": True})
+        await second.request("GET", url)
+
+        self.assertEqual(len(set(self.peers)), 1)
+        self.assertIs(first._session_for(url), second._session_for(url))
+        self.assertEqual(self.registry.references("local"), 2)
+
+        session = first._session_for(url)
+        await first.close()
+        self.assertFalse(session.closed)
+        await second.close()
+        self.assertTrue(session.closed)
+        self.assertEqual(self.registry.references("local"), 0)
+
+    async def test_host_groups_and_connector_settings(self):
+        self.registry.configure("youtube", limit_per_host=50, keepalive_timeout=60)
+        transport = AiohttpTransport(registry=self.registry)
+        twitch = transport._session_for("https://api.twitch.tv/helix/users")
+        self.assertIs(transport._session_for("https://id.twitch.tv/oauth2/token"), twitch)
+        youtube = transport._session_for("https://www.googleapis.com/youtube/v3/search")
+        self.assertIsNot(youtube, twitch)
+        self.assertEqual(twitch.connector.limit_per_host, 5)
+        self.assertEqual(youtube.connector.limit_per_host, 50)
+        self.assertEqual(self.registry.group("https://example.com"), "default")
+        await transport.close()
+
+    async def test_closed_transport_reopens(self):
+        transport = AiohttpTransport(registry=self.registry)
+        url = str(self.server.make_url("/"))
+        for _ in range(2):
+            self.assertEqual((await transport.request("GET", url)).json(), {"ok": True})
+            await transport.close()
+            self.assertTrue(transport.closed)
+            self.assertEqual(self.registry.references("local"), 0)
+
+    async def test_client_and_oauth_share_a_session(self):
+        twitch = AsyncTwitch("client_id", "client_secret", transport=AiohttpTransport(registry=self.registry))
+        oauth = TwitchOauth("client_id", "client_secret", twitch.transport)
+        self.assertIs(oauth.transport._session_for("https://id.twitch.tv/oauth2/token"),
+                      twitch.transport._session_for("https://api.twitch.tv/helix/streams"))
+        await twitch.close()
+        self.assertEqual(self.registry.references("twitch"), 0)
+
+    def test_shared_registry(self):
+        self.assertIs(SessionRegistry.shared(), SessionRegistry.shared())
+        self.assertIs(AiohttpTransport().registry, SessionRegistry.shared())
+
+
+class TestEventLoops(unittest.TestCase):
+    def test_new_loop_releases_the_old_session(self):
+        registry = SessionRegistry()
+        transport = AiohttpTransport(registry=registry)
+        url = "https://api.twitch.tv/helix/streams"
+
+        async def session():
+            return transport._session_for(url), registry.references("twitch")
+
+        first, references = asyncio.run(session())
+        self.assertEqual(references, 1)
+        second, references = asyncio.run(session())
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(references, 1)
+        asyncio.run(transport.close())
+        self.assertTrue(second.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from tystream.sharding import HashRing, ShardCoordinator, SQLiteLeaseBackend, MemoryLeaseBackend
+
+from tests.fixtures import TemporaryDirectoryMixin
+
+CHANNELS = [f"channel{i}" for i in range(1000)]
+
+
+class TestHashRing(unittest.TestCase):
+    def test_balance_and_movement(self):
+        ring = HashRing(["a", "b", "c"])
+        before = {channel: ring.owner(channel) for channel in CHANNELS}
+        for node in "abc":
+            self.assertGreater(list(before.values()).count(node), 200)
+
+        ring.add("d")
+        after = {channel: ring.owner(channel) for channel in CHANNELS}
+        moved = [channel for channel in CHANNELS if before[channel] != after[channel]]
+        self.assertTrue(all(after[channel] == "d" for channel in moved))
+        self.assertLess(len(moved), 400)
+
+        ring.remove("d")
+        self.assertEqual({channel: ring.owner(channel) for channel in CHANNELS}, before)
+
+    def test_empty(self):
+        self.assertIsNone(HashRing().owner("twitchdev"))
+
+
+class TestShardCoordinator(TemporaryDirectoryMixin):
+    def _workers(self, backend, *names):
+        workers = [ShardCoordinator(name, backend) for name in names]
+        for worker in workers:
+            worker.set_watchlist(CHANNELS)
+        return workers
+
+    def test_rebalance_without_overlap(self):
+        backend = SQLiteLeaseBackend("leases.db")
+        a, b = self._workers(backend, "a", "b")
+
+        self.assertEqual(len(a.refresh()), len(CHANNELS))
+
+        # b joins: until a hands its channels off, b may not poll them
+        b_first = b.refresh()
+        self.assertEqual(b_first, set())
+        a.refresh()
+        b.refresh()
+        self.assertFalse(a.owned & b.owned)
+        self.assertEqual(len(a.owned | b.owned), len(CHANNELS))
+        self.assertGreater(len(b.owned), 300)
+
+        # a leaves: b takes over everything on its next refresh
+        a.stop()
+        self.assertEqual(a.shard(CHANNELS), [])
+        b.refresh()
+        self.assertEqual(len(b.owned), len(CHANNELS))
+
+    def test_memory_backend(self):
+        backend = MemoryLeaseBackend()
+        a, b = self._workers(backend, "a", "b")
+        for worker in (a, b, a, b):
+            worker.refresh()
+        self.assertEqual(sorted(a.shard(CHANNELS) + b.shard(CHANNELS)), sorted(CHANNELS))
+        self.assertNotEqual(a.owns("CHANNEL1"), b.owns("channel1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
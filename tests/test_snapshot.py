@@ -0,0 +1,126 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.async_api.youtube import AsyncYoutube
+from tystream.changes import ChangeDetector
+from tystream.metrics import MetricsRegistry
+from tystream.snapshot import Snapshotter, SnapshotStore
+from tystream.sync_api.transport import SyncReplayTransport
+from tystream.sync_api.twitch import SyncTwitch
+from tystream.transport import Cassette
+
+from tests.fixtures import (TemporaryDirectoryMixin, twitch_cassette, youtube_cassette, response, YOUTUBE_VIDEO,
+                            YOUTUBE_VIDEOS_URL)
+
+
+class TestSnapshotStore(TemporaryDirectoryMixin):
+    def test_save_and_load(self):
+        store = SnapshotStore("state.db")
+        self.assertIsNone(store.load("worker"))
+        store.save("worker", {"a": 1})
+        store.save("worker", {"a": 2})
+        self.assertEqual(SnapshotStore("state.db").load("worker"), {"a": 2})
+        self.assertIsNotNone(store.saved_at("worker"))
+        store.delete("worker")
+        self.assertIsNone(store.load("worker"))
+
+
+class TestAsyncWarmStart(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_restart_without_requests(self):
+        detector = ChangeDetector()
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette())) as twitch:
+            detector.observe("twitchdev", await twitch.check_stream_live("twitchdev"))
+            Snapshotter("state.db", {"twitch": twitch}, detector).save()
+
+        metrics = MetricsRegistry()
+        restarted = ChangeDetector()
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(Cassette()),
+                               metrics=metrics) as twitch:
+            self.assertTrue(Snapshotter("state.db", {"twitch": twitch}, restarted).restore())
+            live = await twitch.check_stream_live("twitchdev")
+            self.assertEqual(live.user.login, "twitchdev")
+            self.assertEqual(await twitch._get_headers(), {"Client-ID": "client_id", "Authorization": "Bearer token"})
+
+        self.assertEqual(restarted.observe("twitchdev", live), [])
+        self.assertIsNone(metrics.get("requests_total", endpoint="/helix/streams", status="200"))
+        self.assertIsNone(metrics.get("token_refreshes_total", platform="twitch"))
+
+    async def test_api_key_is_not_written(self):
+        cassette = youtube_cassette()
+        cassette._entries[cassette.key("GET", YOUTUBE_VIDEOS_URL)] = [
+            response({"items": [YOUTUBE_VIDEO]}, headers={"Content-Type": "application/json", "ETag": '"videos"'})
+        ]
+        async with AsyncYoutube("SECRET_API_KEY", transport=AsyncReplayTransport(cassette)) as youtube:
+            self.assertTrue(await youtube.check_stream_live("googledevs"))
+            state = youtube.snapshot()
+            Snapshotter("state.db", {"youtube": youtube}).save()
+            self.assertIsNotNone(youtube._stale_result("googledevs"))
+
+        self.assertTrue(state["caches"]["etag"])
+        self.assertNotIn("SECRET_API_KEY", json.dumps(state))
+        with open("state.db", "rb") as file:
+            self.assertNotIn(b"SECRET_API_KEY", file.read())
+
+    async def test_expired_entries_are_skipped(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette())) as twitch:
+            await twitch.check_stream_live("twitchdev")
+            state = twitch.snapshot()
+
+        for entries in state["caches"].values():
+            for entry in entries.values():
+                entry["timestamp"] = time.time() - 3600
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(Cassette())) as twitch:
+            self.assertEqual(twitch.restore(state), 0)
+
+    async def test_threaded_snapshots_of_an_async_client(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette())) as twitch:
+            await twitch.check_stream_live("twitchdev")
+            for number in range(20000):
+                twitch._stream_cache[f"idle{number}"] = {"timestamp": time.time(), "data": None}
+            snapshotter = Snapshotter("state.db", {"twitch": twitch}, interval=0.01)
+            snapshotter.start()
+            self.assertIs(snapshotter.loop, asyncio.get_running_loop())
+            done = False
+
+            async def churn():
+                number = 0
+                while not done:
+                    for offset in range(200):
+                        twitch._stream_cache[f"channel{number + offset}"] = {"timestamp": time.time(), "data": None}
+                    await asyncio.sleep(0)
+                    for offset in range(200):
+                        del twitch._stream_cache[f"channel{number + offset}"]
+                    number += 200
+                    await asyncio.sleep(0)
+
+            writer = asyncio.ensure_future(churn())
+            try:
+                for _ in range(20):
+                    state = await asyncio.to_thread(snapshotter.collect)
+                    self.assertIn("twitchdev", state["clients"]["twitch"]["caches"]["stream"])
+            finally:
+                done = True
+                await writer
+                snapshotter.stop()
+
+        self.assertIn("twitchdev", snapshotter.store.load("default")["clients"]["twitch"]["caches"]["stream"])
+
+class TestSyncWarmStart(TemporaryDirectoryMixin):
+    def test_periodic_snapshots(self):
+        with SyncTwitch("client_id", "client_secret", transport=SyncReplayTransport(twitch_cassette())) as twitch:
+            twitch.check_stream_live("twitchdev")
+            snapshotter = Snapshotter("state.db", {"twitch": twitch}, interval=0.01)
+            snapshotter.start()
+            time.sleep(0.05)
+            snapshotter.stop(save=False)
+
+        self.assertIn("twitchdev", snapshotter.store.load("default")["clients"]["twitch"]["caches"]["stream"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.state import ChannelCache
+
+from tests.fixtures import TemporaryDirectoryMixin, TWITCH_USER, twitch_cassette
+
+
+class TestChannelCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = ChannelCache(fields=AsyncTwitch.USER_FIELDS, numeric=("id",))
+
+    def test_offline_entry_is_a_timestamp(self):
+        self.cache["twitchdev"] = {"data": None, "user": object(), "timestamp": 10}
+        self.assertEqual(self.cache._entries["twitchdev"], 10.0)
+        self.assertEqual(self.cache["twitchdev"], {"data": None, "timestamp": 10.0})
+
+    def test_payload_round_trip(self):
+        self.cache["twitchdev"] = {"data": dict(TWITCH_USER), "timestamp": 10.0}
+        row = self.cache._entries["twitchdev"]
+        self.assertIsInstance(row, tuple)
+        self.assertEqual(row[1], int(TWITCH_USER["id"]))
+        self.assertIs(row[2], next(iter(self.cache)))
+        self.assertEqual(self.cache["twitchdev"], {"data": TWITCH_USER, "timestamp": 10.0})
+
+    def test_other_entries_are_kept(self):
+        entries = {
+            "extra": {"data": {**TWITCH_USER, "email": "dev@example.com"}, "timestamp": 1.0},
+            "padded": {"data": {**TWITCH_USER, "id": "007"}, "timestamp": 1.0},
+        }
+        for key, entry in entries.items():
+            self.cache[key] = entry
+        self.assertEqual(dict(self.cache), entries)
+        self.assertIsInstance(self.cache._entries["extra"], dict)
+
+    def test_mapping(self):
+        self.cache["a"] = {"data": None, "timestamp": 1.0}
+        self.cache["b"] = {"data": dict(TWITCH_USER), "timestamp": 1.0}
+        self.assertEqual((len(self.cache), self.cache.live), (2, 1))
+        self.assertIsNone(self.cache.get("c"))
+        self.assertIsNone(self.cache.pop("c", None))
+        del self.cache["a"]
+        self.assertNotIn("a", self.cache)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestCompactClientCaches(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_offline_channel_keeps_no_payload(self):
+        async with AsyncTwitch("client_id", "client_secret",
+                               transport=AsyncReplayTransport(twitch_cassette(live=False))) as twitch:
+            self.assertFalse(await twitch.check_stream_live("twitchdev"))
+            self.assertIsInstance(twitch._stream_cache._entries["twitchdev"], float)
+            self.assertFalse(await twitch.check_stream_live("twitchdev"))
+            # the user of an offline channel is never looked up
+            self.assertEqual(len(twitch._user_cache), 0)
+
+            state = twitch.snapshot()
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette())) as twitch:
+            self.assertEqual(twitch.restore(state), 1)
+            self.assertFalse(await twitch.check_stream_live("twitchdev"))
+            self.assertEqual((await twitch.get_user("twitchdev")).id, TWITCH_USER["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
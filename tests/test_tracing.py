@@ -0,0 +1,54 @@
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.tracing import Tracer, InMemoryExporter, DISABLED_TRACER
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette
+
+
+class TestTracer(unittest.TestCase):
+    def test_parent_and_error(self):
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporter)
+        with self.assertRaises(ValueError):
+            with tracer.span("parent") as parent:
+                with tracer.span("child", endpoint="/helix/streams") as child:
+                    raise ValueError()
+
+        child_span, parent_span = exporter.spans
+        self.assertIs(child_span.parent, parent)
+        self.assertEqual(child_span.trace_id, parent_span.trace_id)
+        self.assertEqual(child_span.attributes["endpoint"], "/helix/streams")
+        self.assertIsInstance(parent_span.error, ValueError)
+        self.assertIsNotNone(parent_span.duration)
+        self.assertIsNone(tracer.current_span())
+
+    def test_disabled(self):
+        with DISABLED_TRACER.span("noop") as span:
+            span.set_attribute("ignored", True)
+        self.assertIsNone(DISABLED_TRACER.current_span())
+
+
+class TestPlatformTracing(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_check_stream_live(self):
+        exporter = InMemoryExporter()
+        transport = AsyncReplayTransport(twitch_cassette())
+        async with AsyncTwitch("client_id", "client_secret", transport=transport, tracer=Tracer(exporter)) as twitch:
+            await twitch.check_stream_live("twitchdev")
+
+        root = exporter.spans[-1]
+        self.assertEqual(root.name, "twitch.check_stream_live")
+        self.assertEqual(root.attributes["channel"], "twitchdev")
+
+        names = {span.name for span in exporter.spans if span.trace_id == root.trace_id}
+        self.assertTrue({"oauth.renew", "twitch.get_user", "http.request", "cache.lookup", "model.build"} <= names)
+
+        streams = next(span for span in exporter.spans if span.attributes.get("endpoint") == "/helix/streams")
+        self.assertEqual(streams.attributes["status"], 200)
+        self.assertGreater(streams.attributes["bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
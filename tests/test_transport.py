@@ -0,0 +1,118 @@
+import os
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncTransport, AsyncReplayTransport, AsyncRecordingTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.exceptions import HTTPException, TransportException
+from tystream.models.twitch import TwitchStreamData, TwitchVODData
+from tystream.sync_api.transport import SyncReplayTransport, SyncRecordingTransport
+from tystream.sync_api.twitch import SyncTwitch
+from tystream.transport import Cassette, request_key
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette, response, TWITCH_USER, TWITCH_VOD, TOKEN
+
+
+class TestRequestKey(unittest.TestCase):
+    def test_query_and_params_are_merged(self):
+        self.assertEqual(
+            request_key("get", "https://example.com/a?b=2", {"a": 1}),
+            request_key("GET", "https://example.com/a", {"b": 2, "a": "1"})
+        )
+
+    def test_ignored_params(self):
+        self.assertEqual(
+            request_key("GET", "https://example.com/a", {"key": "secret", "id": 1}, ("key",)),
+            "GET https://example.com/a?id=1"
+        )
+
+
+class TestCassette(TemporaryDirectoryMixin):
+    def test_save_and_load(self):
+        cassette = Cassette("cassette.json")
+        cassette.add("GET https://example.com", response({"data": 1}))
+        cassette.add("GET https://example.com", response({"data": 2}))
+        cassette.save()
+
+        loaded = Cassette("cassette.json")
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.get("GET https://example.com").json(), {"data": 1})
+        self.assertEqual(loaded.get("GET https://example.com").json(), {"data": 2})
+        self.assertEqual(loaded.get("GET https://example.com").json(), {"data": 2})
+        self.assertIsNone(loaded.get("GET https://example.org"))
+
+
+class TestAsyncReplay(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_live(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette())) as twitch:
+            live = await twitch.check_stream_live("twitchdev")
+            self.assertIsInstance(live, TwitchStreamData)
+            self.assertEqual(live.user.login, "twitchdev")
+
+    async def test_offline(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(twitch_cassette(False))) as twitch:
+            self.assertFalse(await twitch.check_stream_live("twitchdev"))
+
+    async def test_status_error(self):
+        cassette = twitch_cassette()
+        cassette.add(cassette.key("GET", "https://api.twitch.tv/helix/users?login=nobody"), response({}, status=404))
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(cassette)) as twitch:
+            with self.assertRaises(HTTPException) as ctx:
+                await twitch.get_user("nobody")
+            self.assertEqual(ctx.exception.status, 404)
+
+    async def test_unrecorded_request(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(Cassette())) as twitch:
+            with self.assertRaises(TransportException):
+                await twitch.get_user("twitchdev")
+
+    async def test_recording(self):
+        class StaticTransport(AsyncTransport):
+            async def request(self, method, url, headers=None, params=None, data=None, timeout=10):
+                return response({"data": [TWITCH_USER]})
+
+        recorder = AsyncRecordingTransport(Cassette("recorded.json"), StaticTransport())
+        await recorder.request("GET", "https://api.twitch.tv/helix/users", params={"login": "twitchdev"})
+        await recorder.close()
+
+        self.assertTrue(os.path.exists("recorded.json"))
+        replay = AsyncReplayTransport("recorded.json")
+        result = await replay.request("GET", "https://api.twitch.tv/helix/users?login=twitchdev")
+        self.assertEqual(result.json()["data"][0]["id"], TWITCH_USER["id"])
+
+    async def test_recorded_tokens_are_redacted(self):
+        cassette = twitch_cassette()
+        cassette._entries[cassette.key("POST", "https://id.twitch.tv/oauth2/token")] = [
+            response({**TOKEN, "access_token": "live-secret-token"})
+        ]
+        recorder = AsyncRecordingTransport(Cassette("recorded.json"), AsyncReplayTransport(cassette))
+        async with AsyncTwitch("client_id", "client_secret", transport=recorder) as twitch:
+            await twitch.check_stream_live("twitchdev")
+            self.assertEqual(await twitch._get_headers(),
+                             {"Client-ID": "client_id", "Authorization": "Bearer live-secret-token"})
+
+        with open("recorded.json", encoding="utf-8") as file:
+            recorded = file.read()
+        self.assertNotIn("live-secret-token", recorded)
+        self.assertIn("REDACTED", recorded)
+
+
+class TestSyncReplay(TemporaryDirectoryMixin):
+    def test_recorded_tokens_are_redacted(self):
+        recorder = SyncRecordingTransport(Cassette("recorded.json"), SyncReplayTransport(twitch_cassette()))
+        recorder.request("POST", "https://id.twitch.tv/oauth2/token", data={"client_secret": "secret"})
+        recorder.close()
+        token = SyncReplayTransport("recorded.json").request("POST", "https://id.twitch.tv/oauth2/token").json()
+        self.assertEqual(token, {**TOKEN, "access_token": "REDACTED"})
+
+    def test_live_and_vod(self):
+        cassette = twitch_cassette()
+        cassette.add(cassette.key("GET", f"https://api.twitch.tv/helix/videos?user_id={TWITCH_USER['id']}&type=archive&first=1"),
+                     response({"data": [TWITCH_VOD]}))
+        with SyncTwitch("client_id", "client_secret", transport=SyncReplayTransport(cassette)) as twitch:
+            self.assertIsInstance(twitch.check_stream_live("twitchdev"), TwitchStreamData)
+            self.assertIsInstance(twitch.get_latest_stream_vod("twitchdev"), TwitchVODData)
+
+
+if __name__ == "__main__":
+    unittest.main()
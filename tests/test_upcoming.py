@@ -0,0 +1,139 @@
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.youtube import AsyncYoutube
+from tystream.metrics import MetricsRegistry
+from tystream.models.youtube import YoutubeStreamDataAPI
+from tystream.retry import NO_RETRY
+from tystream.scheduling import ScheduledStarts, AdaptiveScheduler
+from tystream.sync_api.transport import SyncReplayTransport
+from tystream.sync_api.youtube import SyncYoutube
+
+from tests.fixtures import (TemporaryDirectoryMixin, youtube_cassette, response, YOUTUBE_VIDEO, YOUTUBE_BASE_URL,
+                            YOUTUBE_CHANNEL_ID)
+
+UPLOADS_URL = (f"{YOUTUBE_BASE_URL}/playlistItems?part=contentDetails&playlistId=UU{YOUTUBE_CHANNEL_ID[2:]}"
+               f"&maxResults=5")
+UPCOMING_ID = "upcoming01"
+BATCH_URL = f"{YOUTUBE_BASE_URL}/videos?part=snippet,liveStreamingDetails&id=oldvideo,{UPCOMING_ID}"
+SCHEDULED_URL = f"{YOUTUBE_BASE_URL}/videos?part=id,snippet,liveStreamingDetails&id={UPCOMING_ID}"
+
+
+def isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def video(state: str, scheduled: float, video_id: str = UPCOMING_ID) -> dict:
+    return {
+        "id": video_id,
+        "snippet": {**YOUTUBE_VIDEO["snippet"], "liveBroadcastContent": state},
+        "liveStreamingDetails": {**YOUTUBE_VIDEO["liveStreamingDetails"], "scheduledStartTime": isoformat(scheduled)},
+    }
+
+
+def upcoming_cassette(scheduled: float):
+    cassette = youtube_cassette(live=False)
+    cassette.add(cassette.key("GET", UPLOADS_URL), response({"items": [
+        {"contentDetails": {"videoId": "oldvideo"}}, {"contentDetails": {"videoId": UPCOMING_ID}}
+    ]}))
+    cassette.add(cassette.key("GET", BATCH_URL), response({"items": [
+        video("none", scheduled - 86400, "oldvideo"), video("upcoming", scheduled)
+    ]}))
+    cassette.add(cassette.key("GET", SCHEDULED_URL), response({"items": [video("upcoming", scheduled)]}))
+    cassette.add(cassette.key("GET", SCHEDULED_URL), response({"items": [video("live", scheduled)]}))
+    return cassette
+
+
+class TestScheduledStarts(unittest.TestCase):
+    def test_window(self):
+        starts = ScheduledStarts(window_before=300, window_after=1800, window_interval=15, idle_interval=3600)
+        starts.add("Channel", "video", 10_000)
+
+        self.assertEqual(starts.interval("channel", 0), 3600)
+        self.assertEqual(starts.interval("channel", 9_000), 700)
+        self.assertIsNone(starts.in_window("channel", 9_000))
+        self.assertEqual(starts.interval("channel", 9_800), 15)
+        self.assertEqual(starts.in_window("channel", 11_000), "video")
+        self.assertIsNone(starts.interval("other", 0))
+
+        starts.add("channel", "video", 20_000)
+        starts.add("channel", "video", 20_000)
+        self.assertEqual(len(starts._heap), 2)
+        self.assertEqual(starts.expire(15_000), [])
+        self.assertEqual(starts.expire(22_000), [("channel", "video")])
+        self.assertEqual(len(starts), 0)
+
+    def test_adaptive_scheduler_uses_scheduled_starts(self):
+        starts = ScheduledStarts(window_interval=10)
+        scheduler = AdaptiveScheduler(min_interval=60, max_interval=1800, scheduled_starts=starts)
+        now = time.time()
+        starts.add("channel", "video", now + 60)
+        self.assertEqual(scheduler.interval("channel", now), 10)
+
+
+class TestAsyncUpcoming(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_discover_and_check_scheduled(self):
+        scheduled = time.time() + 60
+        metrics = MetricsRegistry()
+        async with AsyncYoutube("key", transport=AsyncReplayTransport(upcoming_cassette(scheduled)),
+                                metrics=metrics) as youtube:
+            broadcasts = await youtube.discover_upcoming(["googledevs"])
+            self.assertEqual([broadcast.id for broadcast in broadcasts], [UPCOMING_ID])
+            self.assertEqual(youtube.scheduled_starts.in_window("googledevs"), UPCOMING_ID)
+
+            self.assertIs(await youtube.check_stream_live("googledevs"), False)
+            live = await youtube.check_stream_live("googledevs")
+            self.assertIsInstance(live, YoutubeStreamDataAPI)
+            self.assertIsNone(youtube.scheduled_starts.in_window("googledevs"))
+
+        # the 100 unit search endpoint was used to validate the api key and once for the live
+        # lookup while the broadcast was upcoming, the scheduled start then found it live directly
+        self.assertEqual(metrics.get("requests_total", endpoint="/youtube/v3/search", status="200"), 2)
+
+    async def test_other_broadcast_while_upcoming(self):
+        cassette = upcoming_cassette(time.time() + 60)
+        cassette._entries[cassette.key("GET", SCHEDULED_URL)] = [response({"items": [video("upcoming", time.time() + 60)]})]
+        for key, responses in youtube_cassette(live=True)._entries.items():
+            cassette._entries[key] = responses
+        async with AsyncYoutube("key", transport=AsyncReplayTransport(cassette)) as youtube:
+            await youtube.discover_upcoming(["googledevs"])
+            live = await youtube.check_stream_live("googledevs")
+            self.assertIsInstance(live, YoutubeStreamDataAPI)
+            self.assertEqual(live.id, YOUTUBE_VIDEO["id"])
+            self.assertEqual(youtube.scheduled_starts.in_window("googledevs"), UPCOMING_ID)
+
+    async def test_repeated_discovery(self):
+        scheduled = time.time() + 7200
+        async with AsyncYoutube("key", transport=AsyncReplayTransport(upcoming_cassette(scheduled))) as youtube:
+            youtube.scheduled_starts.add("othervideo", "ended", time.time() - 7200)
+            for _ in range(3):
+                await youtube.discover_upcoming(["googledevs"])
+
+            self.assertEqual(len(youtube.scheduled_starts), 1)
+            self.assertEqual(len(youtube.scheduled_starts._heap), 1)
+
+    async def test_failed_batch(self):
+        cassette = upcoming_cassette(time.time() + 7200)
+        cassette._entries[cassette.key("GET", BATCH_URL)] = [response({}, status=500)]
+        async with AsyncYoutube("key", transport=AsyncReplayTransport(cassette), retry_policy=NO_RETRY) as youtube:
+            self.assertEqual(await youtube.discover_upcoming(["googledevs"]), [])
+
+
+class TestSyncUpcoming(TemporaryDirectoryMixin):
+    def test_discover(self):
+        scheduled = time.time() + 7200
+        starts = ScheduledStarts()
+        with SyncYoutube("key", transport=SyncReplayTransport(upcoming_cassette(scheduled)),
+                         scheduled_starts=starts) as youtube:
+            self.assertIs(youtube.scheduled_starts, starts)
+            broadcasts = youtube.discover_upcoming(["googledevs"])
+            self.assertEqual(broadcasts[0].url, f"https://www.youtube.com/watch?v={UPCOMING_ID}")
+            self.assertIsNone(youtube.scheduled_starts.in_window("googledevs"))
+            self.assertEqual(youtube.scheduled_starts.next_start("googledevs")[0], UPCOMING_ID)
+
+
+if __name__ == "__main__":
+    unittest.main()
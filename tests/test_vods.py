@@ -0,0 +1,62 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from tystream.async_api.transport import AsyncReplayTransport
+from tystream.async_api.twitch import AsyncTwitch
+from tystream.exceptions import NoResultException
+from tystream.sync_api.transport import SyncReplayTransport
+from tystream.sync_api.twitch import SyncTwitch
+
+from tests.fixtures import TemporaryDirectoryMixin, twitch_cassette, response, TWITCH_USER, TWITCH_VOD
+
+VIDEOS_URL = f"https://api.twitch.tv/helix/videos?user_id={TWITCH_USER['id']}&type=archive&first=100"
+
+
+def vod(day: int) -> dict:
+    created_at = f"2024-03-{day:02d}T15:00:00Z"
+    return {**TWITCH_VOD, "id": str(day), "created_at": created_at, "published_at": created_at}
+
+
+def paged_cassette():
+    cassette = twitch_cassette()
+    cassette.add(cassette.key("GET", VIDEOS_URL),
+                 response({"data": [vod(30), vod(29)], "pagination": {"cursor": "page2"}}))
+    cassette.add(cassette.key("GET", VIDEOS_URL + "&after=page2"),
+                 response({"data": [vod(20), vod(10)], "pagination": {"cursor": "page3"}}))
+    cassette.add(cassette.key("GET", VIDEOS_URL + "&after=page3"),
+                 response({"data": [vod(5)], "pagination": {}}))
+    return cassette
+
+
+class TestAsyncVods(TemporaryDirectoryMixin, IsolatedAsyncioTestCase):
+    async def test_pagination(self):
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(paged_cassette())) as twitch:
+            ids = [vod.id async for vod in twitch.iter_vods("twitchdev")]
+        self.assertEqual(ids, ["30", "29", "20", "10", "5"])
+
+    async def test_since_stops_early(self):
+        cassette = paged_cassette()
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(cassette)) as twitch:
+            ids = [vod.id async for vod in twitch.iter_vods("twitchdev", since=datetime(2024, 3, 15))]
+        self.assertEqual(ids, ["30", "29", "20"])
+        # the third page was never requested
+        self.assertNotIn(cassette.key("GET", VIDEOS_URL + "&after=page3"), cassette._positions)
+
+    async def test_latest_without_vods(self):
+        cassette = twitch_cassette()
+        cassette.add(cassette.key("GET", VIDEOS_URL.replace("first=100", "first=1")), response({"data": [], "pagination": {}}))
+        async with AsyncTwitch("client_id", "client_secret", transport=AsyncReplayTransport(cassette)) as twitch:
+            with self.assertRaises(NoResultException):
+                await twitch.get_latest_stream_vod("twitchdev")
+
+
+class TestSyncVods(TemporaryDirectoryMixin):
+    def test_pagination(self):
+        with SyncTwitch("client_id", "client_secret", transport=SyncReplayTransport(paged_cassette())) as twitch:
+            since = datetime(2024, 3, 15, tzinfo=timezone.utc)
+            self.assertEqual([vod.id for vod in twitch.iter_vods("twitchdev", since=since)], ["30", "29", "20"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,2 +1,88 @@
-from .sync_api import *
-from .async_api import *
\ No newline at end of file
+"""
+A Python library for Twitch & Youtube Stream Notification.
+
+The public names are loaded lazily on first access, so ``import tystream``
+only pays for the clients, models and dependencies that are actually used.
+"""
+from tystream._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "AsyncTwitch": "tystream.async_api.twitch",
+        "AsyncYoutube": "tystream.async_api.youtube",
+        "YDL_OPTS": "tystream.async_api.youtube",
+        "BaseStreamPlatform": "tystream.async_api.base",
+        "AsyncTransport": "tystream.async_api.transport",
+        "AiohttpTransport": "tystream.async_api.transport",
+        "SessionRegistry": "tystream.async_api.transport",
+        "AsyncReplayTransport": "tystream.async_api.transport",
+        "AsyncRecordingTransport": "tystream.async_api.transport",
+        "SyncTwitch": "tystream.sync_api.twitch",
+        "SyncYoutube": "tystream.sync_api.youtube",
+        "SyncTransport": "tystream.sync_api.transport",
+        "RequestsTransport": "tystream.sync_api.transport",
+        "SyncReplayTransport": "tystream.sync_api.transport",
+        "SyncRecordingTransport": "tystream.sync_api.transport",
+        "TwitchOauth": "tystream.async_api.oauth",
+        "YoutubeOauth": "tystream.async_api.oauth",
+        "Cassette": "tystream.transport",
+        "TransportResponse": "tystream.transport",
+        "TwitchUserData": "tystream.models.twitch",
+        "TwitchStreamData": "tystream.models.twitch",
+        "TwitchVODData": "tystream.models.twitch",
+        "TwitchGameData": "tystream.models.twitch",
+        "Thumbnail": "tystream.models.youtube",
+        "Thumbnails": "tystream.models.youtube",
+        "LiveStreamingDetails": "tystream.models.youtube",
+        "YoutubeStreamDataYTDLP": "tystream.models.youtube",
+        "YoutubeStreamDataAPI": "tystream.models.youtube",
+        "YoutubeUpcomingBroadcast": "tystream.models.youtube",
+        "UnknownStream": "tystream.models.status",
+        "CheckResults": "tystream.models.status",
+        "OauthException": "tystream.exceptions",
+        "NoResultException": "tystream.exceptions",
+        "TransportException": "tystream.exceptions",
+        "HTTPException": "tystream.exceptions",
+        "CircuitOpenException": "tystream.exceptions",
+        "CircuitBreaker": "tystream.circuit",
+        "CircuitBreakerRegistry": "tystream.circuit",
+        "ChangeDetector": "tystream.changes",
+        "ChangeEvent": "tystream.changes",
+        "StreamOnline": "tystream.changes",
+        "StreamOffline": "tystream.changes",
+        "TitleChanged": "tystream.changes",
+        "CategoryChanged": "tystream.changes",
+        "ViewersThresholdCrossed": "tystream.changes",
+        "Snapshotter": "tystream.snapshot",
+        "SnapshotStore": "tystream.snapshot",
+        "ShardCoordinator": "tystream.sharding",
+        "HashRing": "tystream.sharding",
+        "LeaseBackend": "tystream.sharding",
+        "MemoryLeaseBackend": "tystream.sharding",
+        "SQLiteLeaseBackend": "tystream.sharding",
+        "AdaptiveScheduler": "tystream.scheduling",
+        "LiveHistogram": "tystream.scheduling",
+        "ScheduledStarts": "tystream.scheduling",
+        "ChannelCache": "tystream.state",
+        "DeliveryPipeline": "tystream.notify",
+        "WebhookSink": "tystream.notify",
+        "DiscordWebhookSink": "tystream.notify",
+        "SlackWebhookSink": "tystream.notify",
+        "AssetCache": "tystream.assets",
+        "asset_urls": "tystream.assets",
+        "PriorityLimiter": "tystream.priority",
+        "request_priority": "tystream.priority",
+        "MetricsRegistry": "tystream.metrics",
+        "RetryPolicy": "tystream.retry",
+        "Tracer": "tystream.tracing",
+        "SpanExporter": "tystream.tracing",
+        "InMemoryExporter": "tystream.tracing",
+        "OpenTelemetryExporter": "tystream.tracing",
+        "setup_logging": "tystream.logger",
+        "close_log_handlers": "tystream.logger",
+    },
+    submodules=("async_api", "sync_api", "models", "exceptions", "transport", "metrics", "tracing", "logger",
+                "cache_handler", "retry", "circuit", "changes",
+                "snapshot", "sharding", "scheduling", "state", "notify", "assets", "priority", "cli"),
+)
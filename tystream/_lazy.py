@@ -0,0 +1,39 @@
+import importlib
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+
+def attach(
+        package: str,
+        attributes: Dict[str, str],
+        submodules: Iterable[str] = ()
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]], List[str]]:
+    """
+    Build the module level ``__getattr__``, ``__dir__`` and ``__all__`` of a lazily loaded package.
+
+    Parameters
+    ----------
+    package: :class:`str`
+        The ``__name__`` of the package.
+    attributes: Dict[:class:`str`, :class:`str`]
+        Public names mapped to the module defining them, the module is imported on first access.
+    submodules: Iterable[:class:`str`]
+        Submodules reachable as attributes of the package.
+    """
+    submodules = set(submodules)
+
+    def __getattr__(name: str) -> Any:
+        if name in submodules:
+            return importlib.import_module(f"{package}.{name}")
+
+        module_name = attributes.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+        value = getattr(importlib.import_module(module_name), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(importlib.import_module(package))) | set(attributes) | submodules)
+
+    return __getattr__, __dir__, list(attributes)
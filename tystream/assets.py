@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Iterator, Set, Tuple
+
+from tystream.exceptions import TransportException
+from tystream.metrics import MetricsRegistry, DISABLED_METRICS
+from tystream.transport import get_header
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = ("maxres", "standard", "high", "medium", "default")
+
+
+def asset_urls(item: Any) -> List[str]:
+    """
+    The image urls of a url, stream, user or change event.
+
+    A Twitch stream gives its thumbnail and the avatar of its user, a Twitch user its avatar and
+    offline image, a YouTube stream its largest thumbnail.
+    """
+    if item is None or item is False:
+        return []
+    if isinstance(item, str):
+        return [item]
+    result = getattr(item, "result", None)
+    if hasattr(item, "kind") and hasattr(item, "channel"):
+        return asset_urls(result) if result else []
+
+    urls = []
+    thumbnails = getattr(item, "thumbnails", None)
+    if thumbnails is not None:
+        for size in THUMBNAIL_SIZES:
+            thumbnail = getattr(thumbnails, size, None)
+            if thumbnail is not None:
+                urls.append(thumbnail.url)
+                break
+    for field in ("thumbnail_url", "thumbnail", "profile_image_url", "offline_image_url"):
+        value = getattr(item, field, None)
+        if value:
+            urls.append(str(value))
+    user = getattr(item, "user", None)
+    if user is not None:
+        urls.extend(asset_urls(user))
+    return list(dict.fromkeys(urls))
+
+
+class AssetCache:
+    """
+    Download thumbnails and avatars once and keep them in a size-bounded directory.
+
+    Images are stored by the digest of their content, so an avatar served under several urls is
+    stored once, and the urls are indexed in a SQLite file next to them. An entry older than
+    ``max_age`` is revalidated with its ``ETag`` before it is used, a 304 keeps the stored file.
+    Concurrent requests for the same url share one download. Once the stored images exceed
+    ``max_bytes``, the least recently used urls are evicted.
+
+    Call :meth:`schedule` when a stream goes live, so its images are on disk by the time a
+    notification is rendered.
+
+    Parameters
+    ----------
+    directory: :class:`str`
+        Where the images and the index are stored.
+    max_bytes: :class:`int`
+        Upper bound of the size of the stored images.
+    max_age: :class:`float`
+        Seconds an image is used without revalidation.
+    transport: Optional[:class:`AsyncTransport`]
+        The transport of the downloads, pass the transport of a client to share its connection pool.
+    concurrency: :class:`int`
+        Downloads running at once.
+    timeout: :class:`float`
+        Timeout of a single download in seconds.
+    metrics: Optional[:class:`MetricsRegistry`]
+        Registry counting lookups by outcome and the stored size.
+    """
+
+    def __init__(
+            self,
+            directory: str = "tystream-assets",
+            max_bytes: int = 256 * 2 ** 20,
+            max_age: float = 3600.0,
+            transport=None,
+            concurrency: int = 8,
+            timeout: float = 10.0,
+            metrics: Optional[MetricsRegistry] = None
+    ) -> None:
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._owns_transport = transport is None
+        if transport is None:
+            from tystream.async_api.transport import AiohttpTransport
+            transport = AiohttpTransport()
+        self.transport = transport
+        self.timeout = timeout
+        self.metrics = metrics or DISABLED_METRICS
+
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = os.path.join(self.directory, "index.sqlite")
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS assets (url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, "
+                "etag TEXT, content_type TEXT, fetched_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS assets_used_at ON assets (used_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS assets_digest ON assets (digest)")
+            self._size = self._stored_size(connection)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self._index, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _stored_size(connection: sqlite3.Connection) -> int:
+        row = connection.execute("SELECT SUM(size) FROM (SELECT DISTINCT digest, size FROM assets)").fetchone()
+        return row[0] or 0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    @property
+    def size(self) -> int:
+        """
+        Bytes of images stored.
+        """
+        return self._size
+
+    @property
+    def entries(self) -> int:
+        """
+        Urls stored.
+        """
+        with self._lock, self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+
+    def cached(self, url: str) -> Optional[str]:
+        """
+        The local path of ``url`` if it is stored, without downloading or revalidating it.
+        """
+        row = self._lookup(url)
+        return self._path(row[0]) if row is not None else None
+
+    def _lookup(self, url: str) -> Optional[Tuple[str, Optional[str], float]]:
+        with self._lock, self._connect() as connection:
+            row = connection.execute("SELECT digest, etag, fetched_at FROM assets WHERE url = ?", (url,)).fetchone()
+        if row is not None and not os.path.exists(self._path(row[0])):
+            # The file was removed behind the index's back, download it again.
+            self._forget(url)
+            return None
+        return row
+
+    def _forget(self, url: str) -> None:
+        with self._lock, self._connect() as connection:
+            row = connection.execute("SELECT digest, size FROM assets WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return
+            connection.execute("DELETE FROM assets WHERE url = ?", (url,))
+            self._size -= self._release(connection, *row)
+
+    def _touch(self, url: str, revalidated: bool) -> None:
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            if revalidated:
+                connection.execute("UPDATE assets SET used_at = ?, fetched_at = ? WHERE url = ?", (now, now, url))
+            else:
+                connection.execute("UPDATE assets SET used_at = ? WHERE url = ?", (now, url))
+
+    def _store(self, url: str, body: bytes, etag: Optional[str], content_type: Optional[str]) -> str:
+        digest = hashlib.blake2b(body, digest_size=20).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as file:
+                file.write(body)
+            os.replace(temporary, path)
+
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            previous = connection.execute("SELECT digest, size FROM assets WHERE url = ?", (url,)).fetchone()
+            if connection.execute("SELECT 1 FROM assets WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+                self._size += len(body)
+            connection.execute(
+                "INSERT OR REPLACE INTO assets (url, digest, size, etag, content_type, fetched_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, len(body), etag, content_type, now, now)
+            )
+            if previous is not None and previous[0] != digest:
+                self._size -= self._release(connection, *previous)
+            self._evict(connection)
+        self.metrics.set("asset_bytes", self._size)
+        return path
+
+    def _release(self, connection: sqlite3.Connection, digest: str, size: int) -> int:
+        """
+        Delete the file of ``digest`` once no url refers to it, returns the bytes freed.
+        """
+        if connection.execute("SELECT 1 FROM assets WHERE digest = ? LIMIT 1", (digest,)).fetchone() is not None:
+            return 0
+        try:
+            os.remove(self._path(digest))
+        except FileNotFoundError:
+            pass
+        return size
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        if self._size <= self.max_bytes:
+            return
+        # The newest entry is never evicted, it is the one being returned.
+        rows = connection.execute("SELECT url, digest, size FROM assets ORDER BY used_at, rowid").fetchall()[:-1]
+        for url, digest, size in rows:
+            connection.execute("DELETE FROM assets WHERE url = ?", (url,))
+            self._size -= self._release(connection, digest, size)
+            logger.debug("Evicted %s from the asset cache.", url)
+            if self._size <= self.max_bytes:
+                break
+
+    async def get(self, url: str, refresh: bool = False) -> Optional[str]:
+        """
+        The local path of the image at ``url``, downloading or revalidating it when needed.
+
+        Returns None when the image could not be downloaded.
+        """
+        in_flight = self._in_flight.get(url)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[url] = future
+        try:
+            path = await self._get(url, refresh)
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            del self._in_flight[url]
+        future.set_result(path)
+        return path
+
+    async def read(self, url: str, refresh: bool = False) -> Optional[bytes]:
+        """
+        The content of the image at ``url``, see :meth:`get`.
+        """
+        path = await self.get(url, refresh)
+        if path is None:
+            return None
+        return await asyncio.to_thread(self._read, path)
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as file:
+            return file.read()
+
+    async def _get(self, url: str, refresh: bool) -> Optional[str]:
+        row = await asyncio.to_thread(self._lookup, url)
+        if row is not None and not refresh and time.time() - row[2] < self.max_age:
+            self.metrics.inc("asset_requests_total", outcome="hit")
+            await asyncio.to_thread(self._touch, url, False)
+            return self._path(row[0])
+
+        headers = {"If-None-Match": row[1]} if row is not None and row[1] else None
+        try:
+            async with self._semaphore:
+                response = await self.transport.request("GET", url, headers=headers, timeout=self.timeout)
+        except TransportException as e:
+            return await self._fail(url, row, e)
+
+        if response.status == 304 and row is not None:
+            self.metrics.inc("asset_requests_total", outcome="revalidated")
+            await asyncio.to_thread(self._touch, url, True)
+            return self._path(row[0])
+        if not 200 <= response.status < 300 or not response.body:
+            return await self._fail(url, row, f"status {response.status}")
+        if len(response.body) > self.max_bytes:
+            return await self._fail(url, row, f"{len(response.body)} bytes exceed the cache size")
+
+        self.metrics.inc("asset_requests_total", outcome="miss")
+        return await asyncio.to_thread(self._store, url, response.body, get_header(response.headers, "ETag"),
+                                       get_header(response.headers, "Content-Type"))
+
+    async def _fail(self, url: str, row, reason) -> Optional[str]:
+        self.metrics.inc("asset_requests_total", outcome="failed")
+        if row is not None:
+            # A stale image beats no image.
+            logger.warning("Revalidating %s failed (%s), using the stored image.", url, reason)
+            return self._path(row[0])
+        logger.warning("Downloading %s failed: %s", url, reason)
+        return None
+
+    async def prefetch(self, *items: Any) -> Dict[str, Optional[str]]:
+        """
+        Download the images of urls, streams, users or change events concurrently.
+
+        Returns
+        -------
+        Dict[:class:`str`, Optional[:class:`str`]]
+            The local path of every image, None for the ones that could not be downloaded.
+        """
+        urls = list(dict.fromkeys(url for item in items for url in asset_urls(item)))
+        paths = await asyncio.gather(*(self.get(url) for url in urls))
+        return dict(zip(urls, paths))
+
+    def schedule(self, *items: Any) -> asyncio.Task:
+        """
+        Start :meth:`prefetch` in the background, e.g. for the result of a stream that just went live.
+        """
+        task = asyncio.create_task(self.prefetch(*items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def clear(self) -> None:
+        """
+        Delete every stored image.
+        """
+        with self._lock, self._connect() as connection:
+            rows = connection.execute("SELECT DISTINCT digest, size FROM assets").fetchall()
+            connection.execute("DELETE FROM assets")
+            for digest, size in rows:
+                self._release(connection, digest, size)
+            self._size = 0
+        self.metrics.set("asset_bytes", 0)
+
+    async def close(self) -> None:
+        """
+        Wait for the scheduled prefetches, then close the transport if the cache created it.
+        """
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._owns_transport:
+            await self.transport.close()
+
+    def __repr__(self) -> str:
+        return f"<AssetCache directory={self.directory!r} bytes={self._size}>"
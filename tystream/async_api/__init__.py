@@ -1,2 +1,19 @@
-from .twitch import *
-from .youtube import *
\ No newline at end of file
+from tystream._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "AsyncTwitch": "tystream.async_api.twitch",
+        "AsyncYoutube": "tystream.async_api.youtube",
+        "YDL_OPTS": "tystream.async_api.youtube",
+        "BaseStreamPlatform": "tystream.async_api.base",
+        "TwitchOauth": "tystream.async_api.oauth",
+        "YoutubeOauth": "tystream.async_api.oauth",
+        "AsyncTransport": "tystream.async_api.transport",
+        "AiohttpTransport": "tystream.async_api.transport",
+        "SessionRegistry": "tystream.async_api.transport",
+        "AsyncReplayTransport": "tystream.async_api.transport",
+        "AsyncRecordingTransport": "tystream.async_api.transport",
+    },
+    submodules=("base", "oauth", "transport", "twitch", "youtube"),
+)
@@ -1,79 +1,287 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, MutableMapping, Tuple, Union, Iterable, List
+import asyncio
 import logging
 import time
-import aiohttp
-from tystream.logger import setup_logging
+from urllib.parse import urlsplit
+from tystream.exceptions import HTTPException, TransportException, CircuitOpenException
+from tystream.metrics import MetricsRegistry, DISABLED_METRICS
+from tystream.tracing import Tracer, DISABLED_TRACER
+from tystream.retry import RetryPolicy
+from tystream.circuit import CircuitBreakerRegistry
+from tystream.decoding import Decoder, get_decoder
+from tystream.priority import PriorityLimiter, PRIORITIES, request_priority, current_priority
+from tystream.models.status import UnknownStream, CheckResults
+from tystream.state import ChannelCache
+from tystream.transport import TransportResponse, request_key, get_header
+from tystream.async_api.transport import AsyncTransport, AiohttpTransport
 
 
 class BaseStreamPlatform(ABC):
     """
     Base class for streaming platform API clients.
+
+    Parameters
+    ----------
+    cache_ttl: :class:`int`
+        Seconds before a cached response is fetched again.
+    transport: Optional[:class:`AsyncTransport`]
+        The transport every request goes through.
+    metrics: Optional[:class:`MetricsRegistry`]
+        Registry recording request, cache and oauth metrics, disabled by default.
+    tracer: Optional[:class:`Tracer`]
+        Tracer recording a span for every public call and its requests, disabled by default.
+    retry_policy: Optional[:class:`RetryPolicy`]
+        How failed requests are retried, defaults to 3 attempts with jittered exponential backoff.
+    circuit_breakers: Optional[:class:`CircuitBreakerRegistry`]
+        Circuit breakers per host and endpoint, share one registry between clients to share endpoint health.
+    decoder: Union[:class:`str`, Callable[[:class:`bytes`], Any]]
+        How response bodies are decoded, ``"auto"`` uses orjson when it is installed, see :func:`~tystream.decoding.get_decoder`.
+    limiter: Optional[:class:`PriorityLimiter`]
+        Request capacity shared by interactive and background calls, see :func:`~tystream.priority.request_priority`.
+        Requests are not limited by default.
     """
 
+    PERSISTENT_CACHES = ("etag",)
+    """Caches whose entries stay useful after the TTL, they are snapshotted regardless of their age."""
+    CONDITIONAL_REQUESTS = False
+    """Send ``If-None-Match`` with the ETag of the last response and reuse its parsed body on a 304."""
+    ETAG_CACHE_SIZE = 1024
+    SECRET_PARAMS: Tuple[str, ...] = ("key",)
+    """Query parameters left out of the ETag cache keys, so snapshots never write credentials to disk."""
+    STREAM_PAYLOAD_KEY = "data"
+    """Field of a stream cache entry that is empty while the channel is offline, see :class:`ChannelCache`."""
+    STREAM_OFFLINE_VALUE = None
+    USER_FIELDS: Tuple[str, ...] = ()
+    """Fields of a user payload, users with exactly these fields are cached as a tuple, see :class:`ChannelCache`."""
+
     def __init__(
             self,
-            cache_ttl: int = 300
+            cache_ttl: int = 300,
+            transport: Optional[AsyncTransport] = None,
+            metrics: Optional[MetricsRegistry] = None,
+            tracer: Optional[Tracer] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+            decoder: Union[str, Decoder] = "auto",
+            limiter: Optional[PriorityLimiter] = None
     ) -> None:
-        setup_logging()
         self.logger = logging.getLogger(__name__)
-        self._session: Optional[aiohttp.ClientSession] = None
+        self.transport = transport or AiohttpTransport()
+        self.metrics = metrics or DISABLED_METRICS
+        self.tracer = tracer or DISABLED_TRACER
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or CircuitBreakerRegistry()
+        self.decoder = get_decoder(decoder)
+        self.limiter = limiter
         self.cache_ttl = cache_ttl
 
-        self._user_cache: Dict[str, Dict[str, Any]] = {}
-        self._stream_cache: Dict[str, Dict[str, Any]] = {}
+        self._user_cache = ChannelCache(fields=self.USER_FIELDS, numeric=("id",))
+        self._stream_cache = ChannelCache(self.STREAM_PAYLOAD_KEY, self.STREAM_OFFLINE_VALUE)
+        self._etag_cache: Dict[str, Dict[str, Any]] = {}
+        self._caches: Dict[str, MutableMapping[str, Dict[str, Any]]] = {
+            "user": self._user_cache,
+            "stream": self._stream_cache,
+            "etag": self._etag_cache
+        }
+        self._cache_ttls: Dict[str, float] = {}
 
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._session:
-            await self._session.close()
+        await self.close()
 
-    @property
-    def session(self) -> aiohttp.ClientSession:
-        """Get or create session"""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
-        return self._session
+    async def close(self) -> None:
+        """
+        Close the underlying transport.
+        """
+        await self.transport.close()
 
     async def _make_request(
             self,
             url: str,
             headers: Optional[Dict[str, str]] = None,
             params: Optional[Dict[str, Any]] = None,
-            timeout: int = 10
-    ) -> Dict:
+            timeout: int = 10,
+            raw: bool = False
+    ) -> Union[Dict, bytes]:
         """
         Centralized request handling with error handling.
+
+        Transient failures are retried with backoff according to :attr:`retry_policy`,
+        :class:`CircuitOpenException` is raised while the endpoint's circuit breaker is open.
+        With :attr:`CONDITIONAL_REQUESTS` the request is made conditional on the ETag of the last
+        response, a 304 returns the body parsed back then.
+
+        With ``raw`` the undecoded body is returned, to be validated straight into a model with
+        :meth:`_build_model_json`, and the request is never conditional.
         """
+        parts = urlsplit(url)
+        endpoint = parts.path
+        breaker = self.circuit_breakers.get(parts.netloc, endpoint)
+        if not breaker.allow():
+            self.metrics.inc("circuit_rejections_total", endpoint=endpoint)
+            raise CircuitOpenException(parts.netloc, endpoint)
+
+        cache_key = validator = None
+        if self.CONDITIONAL_REQUESTS and not raw:
+            cache_key = request_key("GET", url, params, self.SECRET_PARAMS)
+            validator = self._etag_cache.get(cache_key)
+            if validator is not None:
+                headers = {**(headers or {}), "If-None-Match": validator["etag"]}
+
+        policy = self.retry_policy
+        deadline = time.monotonic() + policy.total_timeout
+        attempt = 0
+        recorded = False
+
         try:
-            async with self.session.get(
-                    url,
-                    headers=headers,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=timeout)
-            ) as response:
-                if response.status != 200:
-                    self.logger.error(f"API request failed with status {response.status}")
-                    raise aiohttp.ClientError(f"API request failed: \n{await response.json()}")
-                return await response.json()
-        except aiohttp.ClientError as e:
-            self.logger.error(f"Request failed: {str(e)}")
-            raise
-
-    def _get_cache(self, cache_dict: Dict, key: str) -> Optional[Dict]:
-        """
-        Generic cache getter with TTL check.
-        """
-        cache_data = cache_dict.get(key)
-        if cache_data and time.time() - cache_data["timestamp"] < self.cache_ttl:
-            return cache_data
-        return None
+            while True:
+                attempt += 1
+                remaining = max(deadline - time.monotonic(), 0.001)
+                try:
+                    response = await self._fetch(url, endpoint, headers, params, min(timeout, remaining), attempt == 1)
+                    recorded = True
+                    breaker.record_success()
+                    if raw:
+                        return response.body
+                    return self._read_response(response, endpoint, cache_key, validator)
+                except (TransportException, HTTPException) as e:
+                    retryable = attempt < policy.max_attempts and policy.is_retryable(e)
+                    delay = policy.backoff(attempt, e) if retryable else None
+                    if delay is None or delay >= deadline - time.monotonic():
+                        recorded = True
+                        if self.circuit_breakers.is_failure(e):
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                        self.logger.error("Request failed: %s", e)
+                        raise
+                    self.metrics.inc("retries_total", endpoint=endpoint)
+                    self.logger.warning("Request to %s failed (%s), retrying in %.2fs.", endpoint, e, delay)
+                    await asyncio.sleep(delay)
+        finally:
+            if not recorded:
+                # Cancelled, e.g. by the deadline of check_streams_live, or failed unexpectedly:
+                # a half-open probe must not keep its slot forever.
+                breaker.release()
 
-    @staticmethod
-    def _set_cache(cache_dict: Dict, key: str, data: Dict) -> None:
+    def _read_response(
+            self,
+            response: TransportResponse,
+            endpoint: str,
+            cache_key: Optional[str],
+            validator: Optional[Dict[str, Any]]
+    ) -> Dict:
+        """
+        Parse a response, or return the cached body of a 304, and remember the ETag of a conditional request.
+        """
+        if response.status == 304:
+            if validator is None:
+                raise HTTPException(304, "Not Modified without a cached response.", response.headers)
+            self.metrics.inc("not_modified_total", endpoint=endpoint)
+            self._etag_cache.pop(cache_key, None)
+            self._set_cache(self._etag_cache, cache_key, validator)
+            return validator["data"]
+
+        data = response.json(self.decoder)
+        if cache_key is not None:
+            etag = get_header(response.headers, "ETag") or (data.get("etag") if isinstance(data, dict) else None)
+            if etag:
+                self._etag_cache.pop(cache_key, None)
+                while len(self._etag_cache) >= self.ETAG_CACHE_SIZE:
+                    del self._etag_cache[next(iter(self._etag_cache))]
+                self._set_cache(self._etag_cache, cache_key, {"etag": etag, "data": data})
+        return data
+
+    async def _fetch(
+            self,
+            url: str,
+            endpoint: str,
+            headers: Optional[Dict[str, str]],
+            params: Optional[Dict[str, Any]],
+            timeout: float,
+            hedge: bool = True
+    ) -> TransportResponse:
+        """
+        Send a request, with a hedged duplicate when it is slower than the policy's hedge delay.
+        """
+        hedge_after = self.retry_policy.hedge_after(endpoint) if hedge else None
+        if hedge_after is None or hedge_after >= timeout:
+            return await self._send(url, endpoint, headers, params, timeout)
+
+        pending = {asyncio.ensure_future(self._send(url, endpoint, headers, params, timeout))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if done:
+                return done.pop().result()
+
+            self.metrics.inc("hedges_total", endpoint=endpoint)
+            pending.add(asyncio.ensure_future(self._send(url, endpoint, headers, params, timeout - hedge_after)))
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send(
+            self,
+            url: str,
+            endpoint: str,
+            headers: Optional[Dict[str, str]],
+            params: Optional[Dict[str, Any]],
+            timeout: float
+    ) -> TransportResponse:
+        """
+        Send a single attempt of a request.
+        """
+        with self.tracer.span("http.request", method="GET", endpoint=endpoint) as span:
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = await self.transport.request("GET", url, headers=headers, params=params, timeout=timeout)
+            except TransportException:
+                self.metrics.inc("requests_total", endpoint=endpoint, status="error")
+                self.retry_policy.record(endpoint, None, False)
+                raise
+            finally:
+                if self.limiter is not None:
+                    self.limiter.release()
+                self.metrics.observe("request_duration_seconds", time.perf_counter() - start, endpoint=endpoint)
+
+            span.set_attributes(status=response.status, bytes=len(response.body))
+            self.metrics.inc("requests_total", endpoint=endpoint, status=str(response.status))
+            self.retry_policy.record(endpoint, time.perf_counter() - start, response.status in (200, 304))
+            if response.status not in (200, 304):
+                self.logger.debug("API request to %s failed with status %s", endpoint, response.status)
+                raise HTTPException(response.status, response.body.decode("utf-8", errors="replace"), response.headers)
+            return response
+
+    def _get_cache(self, cache_dict: Dict, key: str, ttl: Optional[float] = None) -> Optional[Dict]:
+        """
+        Generic cache getter with TTL check, ``ttl`` defaults to :attr:`cache_ttl`.
+        """
+        name = self._cache_name(cache_dict)
+        with self.tracer.span("cache.lookup", cache=name, key=key) as span:
+            cache_data = cache_dict.get(key)
+            if cache_data and time.time() - cache_data["timestamp"] < (self.cache_ttl if ttl is None else ttl):
+                span.set_attribute("outcome", "hit")
+                self.metrics.inc("cache_hits_total", cache=name)
+                return cache_data
+            span.set_attribute("outcome", "miss")
+            self.metrics.inc("cache_misses_total", cache=name)
+            return None
+
+    def _set_cache(self, cache_dict: Dict, key: str, data: Dict) -> None:
         """
         Generic cache setter.
         """
@@ -81,6 +289,71 @@ class BaseStreamPlatform(ABC):
             **data,
             "timestamp": time.time()
         }
+        self.metrics.set("cache_entries", len(cache_dict), cache=self._cache_name(cache_dict))
+
+    def _cache_name(self, cache_dict: Dict) -> Optional[str]:
+        """
+        Name of a cache, used as a metric label and span attribute.
+        """
+        if not self.metrics and not self.tracer:
+            return None
+        return next((name for name, cache in self._caches.items() if cache is cache_dict), "unknown")
+
+    def _build_model(self, model, **data):
+        """
+        Construct a model, timed as a ``model.build`` span.
+        """
+        with self.tracer.span("model.build", model=model.__name__):
+            return model(**data)
+
+    def _build_model_json(self, model, body: bytes):
+        """
+        Validate a raw response body straight into a model, without building the intermediate dicts.
+        """
+        with self.tracer.span("model.build", model=model.__name__, bytes=len(body)):
+            return model.model_validate_json(body)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        The fresh cache entries of the client as plain data, restored with :meth:`restore`.
+        """
+        now = time.time()
+        return {
+            "caches": {
+                name: {
+                    key: entry for key, entry in dict(cache).items()
+                    if self._is_fresh(name, entry, now)
+                }
+                for name, cache in self._caches.items()
+            }
+        }
+
+    def _is_fresh(self, name: str, entry: Dict[str, Any], now: float) -> bool:
+        if name in self.PERSISTENT_CACHES:
+            return True
+        return now - entry["timestamp"] < self._cache_ttls.get(name, self.cache_ttl)
+
+    def restore(self, state: Dict[str, Any]) -> int:
+        """
+        Load the cache entries of a :meth:`snapshot` that are still fresh, keeping their original timestamps.
+
+        Returns
+        -------
+        :class:`int`
+            The number of restored entries.
+        """
+        now = time.time()
+        restored = 0
+        for name, entries in state.get("caches", {}).items():
+            cache = self._caches.get(name)
+            if cache is None:
+                continue
+            for key, entry in entries.items():
+                if self._is_fresh(name, entry, now):
+                    cache[key] = entry
+                    restored += 1
+            self.metrics.set("cache_entries", len(cache), cache=name)
+        return restored
 
     async def clear_cache(self, key: Optional[str] = None) -> None:
         """
@@ -92,6 +365,100 @@ class BaseStreamPlatform(ABC):
         else:
             self._user_cache.clear()
             self._stream_cache.clear()
+            self._etag_cache.clear()
+
+    async def check_streams_live(
+            self,
+            usernames: Iterable[str],
+            deadline: Optional[float] = None,
+            concurrency: int = 50,
+            priority: Optional[str] = None,
+            **kwargs
+    ) -> CheckResults:
+        """
+        Check many channels concurrently, returning whatever completed within ``deadline``.
+
+        Checks still running when the deadline passes are cancelled. Their channels are answered
+        with their last known status from an expired cache entry when there is one, and with
+        ``UnknownStream("timeout")`` otherwise. A check that raises is answered with ``UnknownStream("error")``.
+
+        Parameters
+        ----------
+        usernames: Iterable[:class:`str`]
+            The channels to check.
+        deadline: Optional[:class:`float`]
+            Seconds the whole batch may take, None to wait for every check.
+        concurrency: :class:`int`
+            Checks running at once, batches of channels for clients checking many channels per request.
+        priority: Optional[:class:`str`]
+            ``"interactive"`` or ``"background"``, the priority of the requests of the checks with a
+            :attr:`limiter`, defaults to the priority of the caller.
+        **kwargs
+            Passed to :meth:`check_stream_live`.
+
+        Returns
+        -------
+        :class:`CheckResults`
+            The result of every channel, in the order of ``usernames``.
+        """
+        if priority is not None and priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(PRIORITIES)}.")
+        names = list(dict.fromkeys(usernames))
+        results = CheckResults()
+        if not names:
+            return results
+
+        with self.tracer.span("check_streams_live", channels=len(names), deadline=deadline) as span:
+            # The tasks inherit the priority of the context they are created in.
+            with request_priority(priority or current_priority()):
+                tasks = self._start_checks(names, concurrency, **kwargs)
+            try:
+                _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+            finally:
+                for task in tasks.values():
+                    task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+            for name, task in tasks.items():
+                if task in pending:
+                    results.timed_out.add(name)
+                    stale = self._stale_result(name)
+                    if stale is None:
+                        self.metrics.inc("checks_timed_out_total", outcome="unknown")
+                        results[name] = UnknownStream("timeout")
+                    else:
+                        self.metrics.inc("checks_timed_out_total", outcome="stale")
+                        results.stale.add(name)
+                        results[name] = stale
+                elif task.exception() is not None:
+                    self.logger.error("Checking %s failed: %s", name, task.exception())
+                    results[name] = UnknownStream("error")
+                else:
+                    results[name] = task.result()
+            span.set_attributes(timed_out=len(results.timed_out), stale=len(results.stale))
+
+        if results.timed_out:
+            self.logger.warning("%d of %d checks missed the %.2fs deadline.", len(results.timed_out), len(names), deadline)
+        return results
+
+    def _start_checks(self, names: List[str], concurrency: int, **kwargs) -> Dict[str, asyncio.Future]:
+        """
+        Start the checks of :meth:`check_streams_live`, a future per channel resolving to its result.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def check(username: str):
+            async with semaphore:
+                return await self.check_stream_live(username, **kwargs)
+
+        return {name: asyncio.ensure_future(check(name)) for name in names}
+
+    def _stale_result(self, username: str) -> Any:
+        """
+        The last known status of a channel regardless of the cache TTL, None when there is none.
+        """
+        return None
 
     @abstractmethod
     async def check_stream_live(self, username: str):
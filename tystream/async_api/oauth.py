@@ -1,27 +1,27 @@
-import aiohttp
 import time
+from typing import Optional
 
 from tystream.cache_handler import CacheFileHandler
 from tystream.exceptions import OauthException
+from tystream.async_api.transport import AsyncTransport, AiohttpTransport
 
 
 class TwitchOauth:
-    def __init__(self, client_id: str, client_secret: str) -> None:
+    def __init__(self, client_id: str, client_secret: str, transport: Optional[AsyncTransport] = None) -> None:
         self.client_id = client_id
         self.client_secret = client_secret
         self.cache_handler = CacheFileHandler()
+        self.transport = transport or AiohttpTransport()
 
     @staticmethod
     async def is_token_expired(token_info):
         now = int(time.time())
-        return now - token_info["expires_in"] < 60
+        return token_info.get("expires_at", 0) - now < 60
 
-    @staticmethod
-    async def validate_token(access_token: str) -> bool:
+    async def validate_token(self, access_token: str) -> bool:
         headers = {"Authorization": f"OAuth {access_token}"}
-        async with aiohttp.ClientSession() as session:
-            async with session.get("https://id.twitch.tv/oauth2/validate", headers=headers) as response:
-                return response.status == 200
+        response = await self.transport.request("GET", "https://id.twitch.tv/oauth2/validate", headers=headers)
+        return response.status == 200
 
     async def fetch_new_token(self) -> dict:
         data = {
@@ -29,12 +29,11 @@ class TwitchOauth:
             "client_secret": self.client_secret,
             "grant_type": "client_credentials",
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post("https://id.twitch.tv/oauth2/token", data=data) as response:
-                if response.ok:
-                    return await response.json()
-                else:
-                    raise OauthException("Twitch Get Access Token Failed. Detail: " + await response.json())
+        response = await self.transport.request("POST", "https://id.twitch.tv/oauth2/token", data=data)
+        if response.ok:
+            return response.json()
+        else:
+            raise OauthException("Twitch Get Access Token Failed. Detail: " + response.body.decode("utf-8", errors="replace"))
 
     async def get_access_token(self) -> str:
         token_info = self.cache_handler.get_cached_token()
@@ -44,23 +43,26 @@ class TwitchOauth:
                 return token_info["access_token"]
 
         new_token_info = await self.fetch_new_token()
+        new_token_info["expires_at"] = int(time.time()) + new_token_info["expires_in"]
         self.cache_handler.save_token_to_cache(new_token_info)
         return new_token_info["access_token"]
 
 
 class YoutubeOauth:
-    def __init__(self, api_key: str) -> None:
+    def __init__(self, api_key: str, transport: Optional[AsyncTransport] = None) -> None:
         self.api_key = api_key
+        self.transport = transport or AiohttpTransport()
 
     async def validation_token(self):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://www.googleapis.com/youtube/v3/search?part=snippet&q=YouTube+Data+API&type=video&key={self.api_key}"
-            ) as response:
-                if response.ok:
-                    return True
-                else:
-                    raise OauthException(
-                        f"Youtube API Validation Failed. Please check YouTube Data API is enabled in the Google Developer Console.\nOr Check your api_key is enter correctly.\n"
-                        f"Detail: {await response.json()}"
-                    )
+        response = await self.transport.request(
+            "GET",
+            "https://www.googleapis.com/youtube/v3/search",
+            params={"part": "snippet", "q": "YouTube Data API", "type": "video", "key": self.api_key}
+        )
+        if response.ok:
+            return True
+        else:
+            raise OauthException(
+                f"Youtube API Validation Failed. Please check YouTube Data API is enabled in the Google Developer Console.\nOr Check your api_key is enter correctly.\n"
+                f"Detail: {response.body.decode('utf-8', errors='replace')}"
+            )
@@ -0,0 +1,340 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, Tuple, Set
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+import asyncio
+import threading
+import aiohttp
+
+from tystream.exceptions import TransportException
+from tystream.transport import TransportResponse, Cassette
+
+
+class AsyncTransport(ABC):
+    """
+    Base class for the HTTP transports used by the async clients.
+
+    Every platform and oauth request goes through :meth:`request`,
+    custom transports only need to implement it.
+    """
+
+    @abstractmethod
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            data: Optional[Dict[str, Any]] = None,
+            timeout: float = 10
+    ) -> TransportResponse:
+        """
+        Send a request and return the response.
+
+        Raises
+        ------
+        :class:`TransportException`
+            If the request could not be completed.
+        """
+
+    async def close(self) -> None:
+        """
+        Release the resources held by the transport.
+        """
+
+
+DEFAULT_CONNECTOR = {
+    "limit": 100,
+    "limit_per_host": 30,
+    "ttl_dns_cache": 300,
+    "keepalive_timeout": 30.0,
+}
+
+
+class _Session:
+    __slots__ = ("session", "references")
+
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        self.session = session
+        self.references = 0
+
+
+class SessionRegistry:
+    """
+    Process-wide :class:`aiohttp.ClientSession` objects shared by every :class:`AiohttpTransport`.
+
+    Hosts are mapped to host groups, e.g. ``api.twitch.tv`` and ``id.twitch.tv`` to ``"twitch"``,
+    and each group gets one session per event loop, so every client and oauth flow of a process
+    reuses the same warm connections and DNS cache. A session is closed once the last transport
+    using it is closed.
+
+    Parameters
+    ----------
+    host_groups: Optional[Dict[:class:`str`, :class:`str`]]
+        Host group by hostname, added to :attr:`HOST_GROUPS`. Other hosts use the ``"default"`` group.
+    **connector
+        Settings of the :class:`aiohttp.TCPConnector` of every group, such as ``limit``,
+        ``limit_per_host``, ``ttl_dns_cache`` and ``keepalive_timeout``, see :data:`DEFAULT_CONNECTOR`.
+    """
+
+    HOST_GROUPS = {
+        "api.twitch.tv": "twitch",
+        "id.twitch.tv": "twitch",
+        "www.googleapis.com": "youtube",
+    }
+
+    _shared: Optional["SessionRegistry"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, host_groups: Optional[Dict[str, str]] = None, **connector: Any) -> None:
+        self.host_groups = {**self.HOST_GROUPS, **(host_groups or {})}
+        self.connector = {**DEFAULT_CONNECTOR, **connector}
+        self.group_connectors: Dict[str, Dict[str, Any]] = {}
+        self._sessions: "WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _Session]]" = WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "SessionRegistry":
+        """
+        The registry used by transports created without one.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def configure(self, group: str, **connector: Any) -> None:
+        """
+        Override connector settings of a host group, for the sessions created afterwards.
+        """
+        self.group_connectors[group] = {**self.group_connectors.get(group, {}), **connector}
+
+    def group(self, url: str) -> str:
+        """
+        The host group of a url.
+        """
+        return self.host_groups.get(urlsplit(url).hostname or "", "default")
+
+    def connector_settings(self, group: str) -> Dict[str, Any]:
+        return {**self.connector, **self.group_connectors.get(group, {})}
+
+    def acquire(self, group: str) -> aiohttp.ClientSession:
+        """
+        The session of a host group on the running event loop, counting one more user.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sessions = self._sessions.setdefault(loop, {})
+            entry = sessions.get(group)
+            if entry is None or entry.session.closed:
+                connector = aiohttp.TCPConnector(use_dns_cache=True, **self.connector_settings(group))
+                entry = sessions[group] = _Session(aiohttp.ClientSession(connector=connector))
+            entry.references += 1
+            return entry.session
+
+    def detach(self, loop: asyncio.AbstractEventLoop, group: str) -> Optional[aiohttp.ClientSession]:
+        """
+        Count one user less of a session, returning it to be closed when it was the last one.
+        """
+        with self._lock:
+            sessions = self._sessions.get(loop, {})
+            entry = sessions.get(group)
+            if entry is None:
+                return None
+            entry.references -= 1
+            if entry.references > 0:
+                return None
+            del sessions[group]
+        return entry.session
+
+    async def release(self, loop: asyncio.AbstractEventLoop, group: str) -> None:
+        """
+        Count one user less of a session, closing it when it was the last one.
+        """
+        session = self.detach(loop, group)
+        if session is not None:
+            await session.close()
+
+    def references(self, group: str) -> int:
+        """
+        Transports using the session of a host group on the running event loop.
+        """
+        entry = self._sessions.get(asyncio.get_running_loop(), {}).get(group)
+        return entry.references if entry is not None else 0
+
+    async def close(self) -> None:
+        """
+        Close every session of the running event loop, regardless of their users.
+        """
+        with self._lock:
+            sessions = self._sessions.pop(asyncio.get_running_loop(), {})
+        for entry in sessions.values():
+            await entry.session.close()
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    The default transport, backed by the shared sessions of a :class:`SessionRegistry`.
+
+    A closed transport can still be used, its next request acquires sessions from the registry again.
+
+    Parameters
+    ----------
+    session: Optional[:class:`aiohttp.ClientSession`]
+        A session to use for every request instead of the registry, closed along with the transport.
+    registry: Optional[:class:`SessionRegistry`]
+        Where sessions come from, defaults to :meth:`SessionRegistry.shared`.
+    """
+
+    def __init__(
+            self,
+            session: Optional[aiohttp.ClientSession] = None,
+            registry: Optional[SessionRegistry] = None
+    ) -> None:
+        self._session = session
+        self.registry = registry or SessionRegistry.shared()
+        self._acquired: Dict[str, Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+        self._closing: Set["asyncio.Task[None]"] = set()
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        """Whether the transport was closed and hasn't been used since."""
+        return self._closed
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The session of the ``"default"`` host group."""
+        return self._session_for("")
+
+    def _session_for(self, url: str) -> aiohttp.ClientSession:
+        self._closed = False
+        if self._session is not None and not self._session.closed:
+            return self._session
+
+        group = self.registry.group(url)
+        loop = asyncio.get_running_loop()
+        acquired = self._acquired.get(group)
+        # A session is bound to its event loop, a transport reused by a later asyncio.run needs a new one.
+        if acquired is not None and acquired[0] is not loop:
+            self._release_stale(acquired[0], group)
+            acquired = None
+        if acquired is None or acquired[1].closed:
+            acquired = self._acquired[group] = (loop, self.registry.acquire(group))
+        return acquired[1]
+
+    def _release_stale(self, loop: asyncio.AbstractEventLoop, group: str) -> None:
+        """
+        Release the session of an earlier event loop, closing it on the running one when it was the last user.
+        """
+        session = self.registry.detach(loop, group)
+        if session is None:
+            return
+        task = asyncio.get_running_loop().create_task(session.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            data: Optional[Dict[str, Any]] = None,
+            timeout: float = 10
+    ) -> TransportResponse:
+        session = self._session_for(url)
+        try:
+            async with session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    data=data,
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                return TransportResponse(
+                    status=response.status,
+                    headers=dict(response.headers),
+                    body=await response.read(),
+                    url=str(response.url)
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TransportException(str(e) or type(e).__name__) from e
+
+    async def close(self) -> None:
+        """
+        Release the shared sessions used by the transport.
+        """
+        self._closed = True
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        acquired, self._acquired = self._acquired, {}
+        for group, (loop, _) in acquired.items():
+            await self.registry.release(loop, group)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+
+class AsyncReplayTransport(AsyncTransport):
+    """
+    Serve recorded responses from a :class:`Cassette` without touching the network.
+
+    Parameters
+    ----------
+    cassette: :class:`Cassette` | :class:`str`
+        The cassette, or the path of a cassette file, to replay.
+    """
+
+    def __init__(self, cassette) -> None:
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            data: Optional[Dict[str, Any]] = None,
+            timeout: float = 10
+    ) -> TransportResponse:
+        key = self.cassette.key(method, url, params)
+        response = self.cassette.get(key)
+        if response is None:
+            raise TransportException(f"No recorded response for {key}")
+        return response
+
+
+class AsyncRecordingTransport(AsyncTransport):
+    """
+    Forward requests to another transport and record every response into a :class:`Cassette`.
+
+    Parameters
+    ----------
+    cassette: :class:`Cassette` | :class:`str`
+        The cassette, or the path of a cassette file, to record into.
+    transport: Optional[:class:`AsyncTransport`]
+        The transport doing the real requests, defaults to :class:`AiohttpTransport`.
+    """
+
+    def __init__(self, cassette, transport: Optional[AsyncTransport] = None) -> None:
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.transport = transport or AiohttpTransport()
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            data: Optional[Dict[str, Any]] = None,
+            timeout: float = 10
+    ) -> TransportResponse:
+        response = await self.transport.request(method, url, headers=headers, params=params, data=data, timeout=timeout)
+        self.cassette.record(method, url, params, response)
+        return response
+
+    async def close(self) -> None:
+        await self.transport.close()
+        if self.cassette.path:
+            self.cassette.save()
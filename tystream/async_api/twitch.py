@@ -1,45 +1,91 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=too-few-public-methods
-from typing import Optional, Dict
+from typing import Optional, Dict, Any, AsyncIterator, Iterable, Union, List
+import asyncio
 import time
-import aiohttp
+from urllib.parse import urlencode
+from datetime import datetime, timezone
 
 from tystream.async_api.base import BaseStreamPlatform
 from tystream.async_api.oauth import TwitchOauth
-from tystream.models.twitch import TwitchStreamData, TwitchVODData, TwitchUserData
+from tystream.exceptions import NoResultException
+from tystream.tracing import traced
+from tystream.models.twitch import TwitchStreamData, TwitchVODData, TwitchVODPage, TwitchUserData, TwitchGameData
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    # A user lookup whose callers were all cancelled must not log "exception was never retrieved".
+    if not future.cancelled():
+        future.exception()
 
 
 class AsyncTwitch(BaseStreamPlatform):
+    USER_FIELDS = ("id", "login", "display_name", "type", "broadcaster_type", "description",
+                   "profile_image_url", "offline_image_url", "view_count", "created_at")
+
     def __init__(
         self,
         client_id: str,
         client_secret: str,
-        cache_ttl: int = 300
+        cache_ttl: int = 300,
+        game_cache_ttl: int = 7 * 24 * 3600,
+        **kwargs
     ) -> None:
-        super().__init__(cache_ttl)
+        super().__init__(cache_ttl, **kwargs)
         self.client_id = client_id
         self.client_secret = client_secret
-        self._token_cache = {"token": None, "expires_in": 0}
+        self.game_cache_ttl = game_cache_ttl
+        self._game_cache: Dict[str, Dict[str, Any]] = {}
+        self._caches["game"] = self._game_cache
+        self._cache_ttls["game"] = game_cache_ttl
+        self._token_cache = {"token": None, "expires_at": 0}
+        self._token_lock = asyncio.Lock()
+        self._pending_users: Dict[str, asyncio.Future] = {}
+        self._user_batch: Optional[asyncio.Future] = None
+
+    def _cached_token(self) -> Optional[str]:
+        if self._token_cache.get("token") and time.time() < self._token_cache.get("expires_at", 0) - 300:
+            return self._token_cache["token"]
+        return None
 
     async def _renew_token(self) -> Optional[str]:
-        current_time = time.time()
+        token = self._cached_token()
+        if token:
+            return token
 
-        if self._token_cache.get("token") and current_time < self._token_cache.get("expires_in", 0) - 300:
-            return self._token_cache["token"]
+        # Concurrent checks on a cold client wait for a single renewal.
+        async with self._token_lock:
+            token = self._cached_token()
+            if token:
+                return token
 
-        oauth = TwitchOauth(self.client_id, self.client_secret)
+            with self.tracer.span("oauth.renew", platform="twitch"):
+                self.metrics.inc("token_refreshes_total", platform="twitch")
+                oauth = TwitchOauth(self.client_id, self.client_secret, self.transport)
 
-        token = await oauth.get_access_token()
+                token = await oauth.get_access_token()
 
-        token_info = oauth.cache_handler.get_cached_token()
+                token_info = oauth.cache_handler.get_cached_token()
 
-        self._token_cache = {
-            "token": token,
-            "expires_in": token_info["expires_in"]
-        }
+                self._token_cache = {
+                    "token": token,
+                    "expires_at": token_info["expires_at"]
+                }
 
         return token
 
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        The caches of the client and its access token, restored with :meth:`restore`.
+        """
+        return {**super().snapshot(), "token": dict(self._token_cache)}
+
+    def restore(self, state: Dict[str, Any]) -> int:
+        token = state.get("token")
+        if token and token.get("token") and time.time() < token.get("expires_at", 0) - 300:
+            self._token_cache = dict(token)
+        return super().restore(state)
+
     async def _get_headers(self) -> Dict[str, str]:
         """Get headers with cached token"""
         return {
@@ -47,10 +93,14 @@ class AsyncTwitch(BaseStreamPlatform):
             "Authorization": f"Bearer {await self._renew_token()}",
         }
 
+    @traced("twitch.get_user")
     async def get_user(self, streamer_name: str) -> TwitchUserData:
         """
         Get Twitch User Info with caching.
 
+        Concurrent lookups of uncached users are coalesced into one ``helix/users`` request
+        per 100 logins, see :meth:`get_users`.
+
         Parameters
         ----------
         streamer_name: :class:`str`
@@ -60,27 +110,95 @@ class AsyncTwitch(BaseStreamPlatform):
         -------
         :class:`TwitchUserData`
             Twitch User Dataclass.
+
+        Raises
+        ------
+        :class:`NoResultException`
+            If there is no user with this name.
         """
 
         cache_key = streamer_name.lower()
         cache_data = self._get_cache(self._user_cache, cache_key)
         if cache_data:
-            return TwitchUserData(**cache_data["data"])
+            return self._build_model(TwitchUserData, **cache_data["data"])
 
-        headers = await self._get_headers()
-        result = await self._make_request(
-            f"https://api.twitch.tv/helix/users?login={streamer_name}",
-            headers=headers
-        )
+        future = self._pending_users.get(cache_key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            future.add_done_callback(_retrieve_exception)
+            self._pending_users[cache_key] = future
+            if self._user_batch is None:
+                self._user_batch = asyncio.ensure_future(self._load_users())
+        return self._build_model(TwitchUserData, **await asyncio.shield(future))
 
-        user_data = result["data"][0]
-        self._set_cache(self._user_cache, cache_key, {"data": user_data})
-        return TwitchUserData(**user_data)
+    async def get_users(self, streamer_names: Iterable[str]) -> Dict[str, TwitchUserData]:
+        """
+        Get many Twitch users at once, with one ``helix/users`` request per 100 uncached logins.
 
+        Parameters
+        ----------
+        streamer_names: Iterable[:class:`str`]
+            The streamer_names of the Twitch channels.
+
+        Returns
+        -------
+        Dict[:class:`str`, :class:`TwitchUserData`]
+            The users by lowercased login, unknown logins are left out.
+        """
+        names = list(dict.fromkeys(name.lower() for name in streamer_names))
+        results = await asyncio.gather(*(self.get_user(name) for name in names), return_exceptions=True)
+        users = {}
+        for name, result in zip(names, results):
+            if isinstance(result, NoResultException):
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            users[name] = result
+        return users
+
+    async def _load_users(self) -> None:
+        """
+        Resolve the users requested by :meth:`get_user` during the current iteration of the event loop.
+        """
+        await asyncio.sleep(0)
+        pending, self._pending_users = self._pending_users, {}
+        self._user_batch = None
+        logins = list(pending)
+        try:
+            for start in range(0, len(logins), 100):
+                batch = logins[start:start + 100]
+                try:
+                    result = await self._make_request(
+                        f"https://api.twitch.tv/helix/users?{urlencode([('login', login) for login in batch])}",
+                        headers=await self._get_headers()
+                    )
+                except Exception as e:
+                    for login in batch:
+                        pending[login].set_exception(e)
+                    continue
+
+                for user_data in result["data"]:
+                    login = user_data["login"].lower()
+                    self._set_cache(self._user_cache, login, {"data": user_data})
+                    future = pending.get(login)
+                    if future is not None and not future.done():
+                        future.set_result(user_data)
+                for login in batch:
+                    if not pending[login].done():
+                        pending[login].set_exception(NoResultException(f"No Twitch user named {login}."))
+        finally:
+            for future in pending.values():
+                if not future.done():
+                    future.cancel()
+
+    @traced("twitch.check_stream_live")
     async def check_stream_live(self, streamer_name: str) -> bool | TwitchStreamData:
         """
         Check if stream is live with optimized caching.
 
+        ``helix/streams`` is queried first, and the user is only looked up for channels
+        that are live, so an offline channel costs a single request.
+
         Parameters
         ----------
         streamer_name: :class:`str`
@@ -98,32 +216,153 @@ class AsyncTwitch(BaseStreamPlatform):
         if cache_data:
             if not cache_data["data"]:
                 return False
-            return TwitchStreamData(**cache_data["data"], user=cache_data["user"])
+            return self._build_model(TwitchStreamData, **cache_data["data"], user=await self.get_user(streamer_name))
 
-        headers = await self._get_headers()
-        user = await self.get_user(streamer_name)
+        stream_data = (await self._get_streams([cache_key]))[cache_key]
+        if not stream_data:
+            return False
+        return self._build_model(TwitchStreamData, **stream_data, user=await self.get_user(streamer_name))
 
+    async def _get_streams(self, logins: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Query ``helix/streams`` for up to 100 logins at once and cache the status of each, None while offline.
+        """
+        query = [("user_login", login) for login in logins]
+        if len(logins) > 20:
+            # helix/streams answers 20 streams per page unless asked for more.
+            query.append(("first", 100))
         result = await self._make_request(
-            f"https://api.twitch.tv/helix/streams?user_login={streamer_name}",
-            headers=headers
+            f"https://api.twitch.tv/helix/streams?{urlencode(query)}",
+            headers=await self._get_headers()
         )
 
-        if not result["data"]:
-            self._set_cache(self._stream_cache, cache_key, {
-                "data": None,
-                "user": user
-            })
-            self.logger.log(25, "%s is not live.", streamer_name)
+        streams: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys(logins)
+        for stream_data in result["data"]:
+            streams[stream_data["user_login"].lower()] = stream_data
+        for login, stream_data in streams.items():
+            self._set_cache(self._stream_cache, login, {"data": stream_data})
+            self.logger.log(25, "%s is live!" if stream_data else "%s is not live.", login)
+        return streams
+
+    def _start_checks(self, names: List[str], concurrency: int) -> Dict[str, asyncio.Future]:
+        """
+        Check uncached channels with one ``helix/streams`` request per 100 logins, then look the uncached
+        users of every live channel up with a single :meth:`get_users` call once all the batches answered.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        cached: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing = []
+        for login in dict.fromkeys(name.lower() for name in names):
+            cache_data = self._get_cache(self._stream_cache, login)
+            if cache_data:
+                cached[login] = cache_data["data"]
+            else:
+                missing.append(login)
+
+        async def load_streams(batch: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+            async with semaphore:
+                return await self._get_streams(batch)
+
+        batches: Dict[str, asyncio.Future] = {}
+        for start in range(0, len(missing), 100):
+            batch = missing[start:start + 100]
+            task = asyncio.ensure_future(load_streams(batch))
+            batches.update(dict.fromkeys(batch, task))
+
+        async def load_users() -> Dict[str, TwitchUserData]:
+            streams = dict(cached)
+            for result in await asyncio.gather(*set(batches.values()), return_exceptions=True):
+                if not isinstance(result, BaseException):
+                    streams.update(result)
+            return await self.get_users(login for login, stream_data in streams.items() if stream_data)
+
+        users: Optional[asyncio.Future] = None
+
+        async def check(name: str) -> Union[TwitchStreamData, bool]:
+            nonlocal users
+            login = name.lower()
+            stream_data = cached[login] if login in cached else (await batches[login])[login]
+            if not stream_data:
+                return False
+            user_data = self._get_cache(self._user_cache, login)
+            if user_data:
+                return self._build_model(TwitchStreamData, **stream_data,
+                                         user=self._build_model(TwitchUserData, **user_data["data"]))
+            if users is None:
+                users = asyncio.ensure_future(load_users())
+            user = (await users).get(login)
+            if user is None:
+                raise NoResultException(f"No Twitch user named {login}.")
+            return self._build_model(TwitchStreamData, **stream_data, user=user)
+
+        return {name: asyncio.ensure_future(check(name)) for name in names}
+
+    def _stale_result(self, streamer_name: str) -> Union[TwitchStreamData, bool, None]:
+        cache_data = self._stream_cache.get(streamer_name.lower())
+        if cache_data is None:
+            return None
+        if not cache_data["data"]:
             return False
+        user = self._user_cache.get(streamer_name.lower())
+        return self._build_model(TwitchStreamData, **cache_data["data"],
+                                 user=TwitchUserData(**user["data"]) if user else None)
+
+    @traced("twitch.get_games")
+    async def get_games(self, game_ids: Iterable[Union[str, int]]) -> Dict[str, TwitchGameData]:
+        """
+        Get Twitch games (categories) by id, with a long-lived cache.
+
+        Ids missing from the cache are resolved with one request per 100 ids.
+        The game cache is part of :meth:`snapshot`, so it can be persisted with a :class:`~tystream.snapshot.Snapshotter`.
+
+        Parameters
+        ----------
+        game_ids: Iterable[Union[:class:`str`, :class:`int`]]
+            The ids of the games.
 
-        self._set_cache(self._stream_cache, cache_key, {
-            "data": result["data"][0],
-            "user": user
-        })
+        Returns
+        -------
+        Dict[:class:`str`, :class:`TwitchGameData`]
+            The games by id, unknown ids are left out.
+        """
+        games: Dict[str, TwitchGameData] = {}
+        missing = []
+        for game_id in dict.fromkeys(str(game_id) for game_id in game_ids if game_id):
+            cache_data = self._get_cache(self._game_cache, game_id, self.game_cache_ttl)
+            if cache_data:
+                games[game_id] = self._build_model(TwitchGameData, **cache_data["data"])
+            else:
+                missing.append(game_id)
+
+        for start in range(0, len(missing), 100):
+            query = urlencode([("id", game_id) for game_id in missing[start:start + 100]])
+            result = await self._make_request(
+                f"https://api.twitch.tv/helix/games?{query}",
+                headers=await self._get_headers()
+            )
+            for game_data in result["data"]:
+                self._set_cache(self._game_cache, game_data["id"], {"data": game_data})
+                games[game_data["id"]] = self._build_model(TwitchGameData, **game_data)
+
+        return games
 
-        self.logger.log(25, "%s is live!", streamer_name)
-        return TwitchStreamData(**result["data"][0], user=user)
+    async def get_stream_games(self, streams: Iterable[TwitchStreamData]) -> Dict[str, TwitchGameData]:
+        """
+        Get the games of a batch of live streams, costing at most one request per 100 uncached games.
 
+        Parameters
+        ----------
+        streams: Iterable[:class:`TwitchStreamData`]
+            Results of :meth:`check_stream_live`, offline results are skipped.
+
+        Returns
+        -------
+        Dict[:class:`str`, :class:`TwitchGameData`]
+            The games by id.
+        """
+        return await self.get_games(stream.game_id for stream in streams if stream)
+
+    @traced("twitch.get_latest_stream_vod")
     async def get_latest_stream_vod(self, streamer_name: str) -> TwitchVODData:
         """
         Retrieve the latest Twitch Stream VOD data.
@@ -138,17 +377,73 @@ class AsyncTwitch(BaseStreamPlatform):
         :class:`TwitchVODData`
             The latest Twitch VOD data.
 
+        Raises
+        ------
+        :class:`NoResultException`
+            If the streamer has no VOD.
+
         Notes:
             It is recommended to execute this function
             after the Stream is end in order to retrieve the latest VOD data.
         """
-        headers = await self._get_headers()
+        vods = self.iter_vods(streamer_name, page_size=1)
+        vod = await anext(vods, None)
+        await vods.aclose()
+        if vod is None:
+            raise NoResultException("No VOD Found.")
+        return vod
+
+    async def iter_vods(
+        self,
+        streamer_name: str,
+        type: str = "archive",
+        since: Optional[datetime] = None,
+        page_size: int = 100
+    ) -> AsyncIterator[TwitchVODData]:
+        """
+        Iterate over the VODs of a streamer, newest first, one page at a time.
+
+        Pages are fetched lazily by following the pagination cursor, so a large
+        back-catalog is read in constant memory. Each page is validated from the raw
+        response body, without decoding it to dicts first.
+
+        Parameters
+        ----------
+        streamer_name: :class:`str`
+            The name of the streamer.
+        type: :class:`str`
+            The type of VOD, ``"all"``, ``"archive"``, ``"highlight"`` or ``"upload"``.
+        since: Optional[:class:`datetime`]
+            Stop at the first VOD created before this time, naive datetimes are taken as UTC.
+        page_size: :class:`int`
+            VODs per request, at most 100.
+
+        Yields
+        ------
+        :class:`TwitchVODData`
+            The VODs of the streamer.
+        """
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+
         user = await self.get_user(streamer_name)
+        params = {"user_id": user.id, "type": type, "first": min(page_size, 100)}
+
+        while True:
+            body = await self._make_request(
+                "https://api.twitch.tv/helix/videos",
+                headers=await self._get_headers(),
+                params=params,
+                raw=True
+            )
+            page = self._build_model_json(TwitchVODPage, body)
+
+            for vod in page.data:
+                if since is not None and vod.created_at < since:
+                    return
+                yield vod
 
-        async with self.session.get(
-            f"https://api.twitch.tv/helix/videos?user_id={user.id}&type=archive",
-            headers=headers,
-            timeout=aiohttp.ClientTimeout(total=10),
-        ) as response:
-            vod_data = (await response.json())["data"][0]
-            return TwitchVODData(**vod_data)
+            cursor = page.pagination.get("cursor")
+            if not cursor or not page.data:
+                return
+            params = {**params, "after": cursor}
@@ -1,13 +1,17 @@
 import asyncio
-import yt_dlp
 
-from typing import Dict, Any, Union, Optional, overload, Literal
+from typing import Dict, Any, Union, Optional, List, Iterable, Tuple, overload, Literal
 
-from tystream.async_api import BaseStreamPlatform
-from tystream.models import LiveStreamingDetails
-from tystream.exceptions import NoResultException
+from tystream.async_api.base import BaseStreamPlatform
+from tystream.exceptions import (NoResultException, CircuitOpenException, HTTPException, TransportException,
+                                 OauthException)
 from tystream.async_api.oauth import YoutubeOauth
-from tystream.models.youtube import YoutubeStreamDataAPI, YoutubeStreamDataYTDLP
+from tystream.tracing import traced
+from tystream.models.youtube import (YoutubeStreamDataAPI, YoutubeStreamDataYTDLP, LiveStreamingDetails,
+                                     YoutubeUpcomingBroadcast)
+from tystream.scheduling import ScheduledStarts
+from tystream.models.status import UnknownStream
+from tystream.transport import request_key
 
 YDL_OPTS = {
     "quiet": True,
@@ -26,11 +30,27 @@ YDL_OPTS = {
 
 class AsyncYoutube(BaseStreamPlatform):
     BASE_URL = "https://www.googleapis.com/youtube/v3"
-
-    def __init__(self, api_key: Optional[str] = None, cache_ttl: int = 300) -> None:
-        super().__init__(cache_ttl)
-        self.oauth = YoutubeOauth(api_key)
+    API_HOST = "www.googleapis.com"
+    CONDITIONAL_REQUESTS = True
+    STREAM_PAYLOAD_KEY = "live_id"
+    STREAM_OFFLINE_VALUE = False
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache_ttl: int = 300,
+        ytdlp_fallback: bool = True,
+        scheduled_starts: Optional[ScheduledStarts] = None,
+        **kwargs
+    ) -> None:
+        super().__init__(cache_ttl, **kwargs)
+        self.oauth = YoutubeOauth(api_key, self.transport)
+        self.ytdlp_fallback = ytdlp_fallback
+        self._api_key_validated = False
+        self._api_key_rejection: Optional[Tuple[str, OauthException]] = None
+        self.scheduled_starts = scheduled_starts if scheduled_starts is not None else ScheduledStarts()
         self._channel_cache: Dict[str, Dict[str, Any]] = {}
+        self._caches["channel"] = self._channel_cache
 
     async def _get_channel_id(self, username: str) -> str:
         """
@@ -98,8 +118,6 @@ class AsyncYoutube(BaseStreamPlatform):
             },
         )
 
-        print("result", result)
-
         live_id = result["items"][0]["id"]["videoId"] if result.get("items") else False
         self._set_cache(self._stream_cache, channelid, {"live_id": live_id})
         return live_id
@@ -113,12 +131,16 @@ class AsyncYoutube(BaseStreamPlatform):
     @overload
     async def check_stream_live(self, username: str, use_yt_dlp: Literal[True]) -> YoutubeStreamDataYTDLP: ...
 
+    @traced("youtube.check_stream_live")
     async def check_stream_live(
         self, username: str, use_yt_dlp: bool = False
-    ) -> Union[YoutubeStreamDataAPI, YoutubeStreamDataYTDLP, bool]:
+    ) -> Union[YoutubeStreamDataAPI, YoutubeStreamDataYTDLP, UnknownStream, bool]:
         """
         Check if a YouTube stream is live, either using the YouTube API or yt_dlp.
 
+        While the circuit breaker of the YouTube Data API is open, the check falls back to yt_dlp
+        unless ``ytdlp_fallback`` was disabled. A client created without an ``api_key`` always uses yt_dlp.
+
         Parameters
         ----------
         username: :class:`str`
@@ -131,61 +153,269 @@ class AsyncYoutube(BaseStreamPlatform):
         - :class:`YoutubeStreamDataAPI` if using the YouTube API.
         - :class:`YoutubeStreamDataYTDLP` if using yt_dlp.
         - `False` if the stream is not live.
+        - :class:`UnknownStream` if the status could not be determined.
+
+        Raises
+        ------
+        :class:`OauthException`
+            The API key was rejected.
+        """
+        if use_yt_dlp or not self.oauth.api_key:
+            return await self._check_with_yt_dlp(username)
+
+        try:
+            return await self._check_with_api(username)
+        except CircuitOpenException:
+            if not self.ytdlp_fallback:
+                self.logger.warning("YouTube Data API circuit is open, status of %s is unknown.", username)
+                return UnknownStream("circuit_open")
+            self.logger.warning("YouTube Data API circuit is open, checking %s with yt_dlp.", username)
+            self.metrics.inc("ytdlp_fallbacks_total")
+            return await self._check_with_yt_dlp(username)
+        except (HTTPException, TransportException) as e:
+            self.logger.error("Error using YouTube API: %s", e)
+            return UnknownStream("error")
+        except OauthException:
+            raise
+        except Exception as e:
+            self.logger.error("Error using YouTube API: %s", e)
+            return False
+
+    def _stale_result(self, username: str) -> Union[YoutubeStreamDataAPI, bool, None]:
+        channel = self._channel_cache.get(username.lower())
+        cache_data = self._stream_cache.get(channel["id"]) if channel else None
+        if cache_data is None:
+            return None
+        live_id = cache_data["live_id"]
+        if not live_id:
+            return False
+        # The details of the stream are only kept as the ETag validator of its videos request.
+        validator = self._etag_cache.get(request_key("GET", f"{self.BASE_URL}/videos", {
+            "part": "id,snippet,liveStreamingDetails", "id": live_id
+        }, self.SECRET_PARAMS))
+        if validator is None or not validator["data"].get("items"):
+            return None
+        return self._build_stream(live_id, validator["data"]["items"][0])
+
+    def _extract_info(self, username: str) -> Optional[Dict[str, Any]]:
+        """
+        Run yt_dlp on the live page of a channel, blocking.
+        """
+        import yt_dlp
+
+        with (
+            self.tracer.span("ytdlp.extract", channel=username),
+            self.metrics.timer("ytdlp_duration_seconds"),
+            yt_dlp.YoutubeDL(YDL_OPTS) as ydl
+        ):
+            return ydl.extract_info(
+                f"https://youtube.com/{(username if username.startswith('@') else '@' + username)}/live",
+                download=False,
+            )
+
+    async def _check_with_yt_dlp(self, username: str) -> Union[YoutubeStreamDataYTDLP, UnknownStream, bool]:
+        try:
+            info = await asyncio.to_thread(self._extract_info, username)
+        except Exception as e:
+            self.metrics.inc("ytdlp_errors_total")
+            self.logger.error("Error using yt_dlp to request: %s", e)
+            return UnknownStream("error")
+
+        if not info:
+            self.logger.log(20, "%s is not live (yt_dlp).", username)
+            return False
+
+        return self._build_model(YoutubeStreamDataYTDLP, **info)
+
+    async def _validate_api_key(self) -> None:
+        """
+        Validate the API key with a search, once, retried and guarded by the circuit breaker like any request.
+
+        An unhealthy API (an exhausted quota, 429 or 5xx) says nothing about the key, the error is
+        raised but the key is not validated again, a search costs 100 quota units. A rejected key
+        is not sent again either, until :attr:`oauth` gets another key.
+
+        Raises
+        ------
+        :class:`OauthException`
+            The API rejected the key.
         """
-        if use_yt_dlp:
+        if self._api_key_rejection is not None and self._api_key_rejection[0] == self.oauth.api_key:
+            raise self._api_key_rejection[1]
+        try:
+            with self.tracer.span("oauth.validate", platform="youtube"):
+                await self._make_request(
+                    f"{self.BASE_URL}/search",
+                    params={"part": "snippet", "q": "YouTube Data API", "type": "video", "key": self.oauth.api_key},
+                )
+        except (HTTPException, TransportException) as e:
+            if not self.circuit_breakers.is_failure(e):
+                rejection = OauthException(
+                    "Youtube API Validation Failed. Please check YouTube Data API is enabled in the Google "
+                    f"Developer Console.\nOr Check your api_key is enter correctly.\nDetail: {e}"
+                )
+                self._api_key_rejection = (self.oauth.api_key, rejection)
+                raise rejection from e
+            self._api_key_validated = True
+            raise
+        self._api_key_validated = True
 
-            def extract_info():
-                try:
-                    with yt_dlp.YoutubeDL(YDL_OPTS) as ydl:
-                        return ydl.extract_info(
-                            f"https://youtube.com/{(username if username.startswith('@') else '@' + username)}/live",
-                            download=False,
-                        )
-                except Exception as e:
-                    self.logger.error(f"Error using yt_dlp to request: {e}")
-                    return None
+    async def _check_with_api(self, username: str) -> Union[YoutubeStreamDataAPI, bool]:
+        if not self._api_key_validated:
+            await self._validate_api_key()
 
-            info = await asyncio.to_thread(extract_info)
+        channel_id = await self._get_channel_id(username)
 
-            if not info:
-                self.logger.log(20, f"{username} is not live (yt_dlp).")
-                return False
+        video_id = self.scheduled_starts.in_window(username)
+        if video_id:
+            scheduled = await self._check_scheduled(username, channel_id, video_id)
+            if scheduled is not None:
+                return scheduled
 
-            return YoutubeStreamDataYTDLP(**info)
-        else:
-            await self.oauth.validation_token()
+        live_id = await self._get_live_id(channel_id)
 
-            try:
-                channel_id = await self._get_channel_id(username)
-                live_id = await self._get_live_id(channel_id)
+        if not live_id:
+            self.logger.log(20, "%s is not live (API).", username)
+            return False
 
-                if not live_id:
-                    self.logger.log(20, f"{username} is not live (API).")
-                    return False
+        result = await self._make_request(
+            f"{self.BASE_URL}/videos",
+            params={"part": "id,snippet,liveStreamingDetails", "id": live_id, "key": self.oauth.api_key},
+        )
 
-                result = await self._make_request(
-                    f"{self.BASE_URL}/videos",
-                    params={"part": "id,snippet,liveStreamingDetails", "id": live_id, "key": self.oauth.api_key},
-                )
+        self.logger.log(20, "%s is live (API).", username)
+        return self._build_stream(live_id, result["items"][0])
+
+    def _build_stream(self, live_id: str, item: Dict[str, Any]) -> YoutubeStreamDataAPI:
+        snippet = item["snippet"]
+        live_detail = item["liveStreamingDetails"]
+        data = {
+            k: snippet[k]
+            for k in [
+                "title",
+                "description",
+                "publishedAt",
+                "channelTitle",
+                "categoryId",
+                "thumbnails",
+                "channelId",
+            ]
+        }
+
+        return self._build_model(YoutubeStreamDataAPI, id=live_id, LiveDetails=LiveStreamingDetails(**live_detail), **data)
+
+    async def _check_scheduled(
+            self, username: str, channel_id: str, video_id: str
+    ) -> Union[YoutubeStreamDataAPI, bool, None]:
+        """
+        Check the scheduled broadcast of a channel directly, costing one quota unit instead of a search.
 
-                item = result["items"][0]
+        Returns None when the broadcast is not live, still upcoming, cancelled or already ended. The
+        channel is then looked up as usual, so another broadcast of the channel is not missed.
+        """
+        result = await self._make_request(
+            f"{self.BASE_URL}/videos",
+            params={"part": "id,snippet,liveStreamingDetails", "id": video_id, "key": self.oauth.api_key},
+        )
+        items = result.get("items")
+        state = items[0]["snippet"].get("liveBroadcastContent") if items else "none"
+
+        if state == "live":
+            self.scheduled_starts.discard(username, video_id)
+            self._set_cache(self._stream_cache, channel_id, {"live_id": video_id})
+            self.logger.log(20, "%s is live (API, scheduled).", username)
+            return self._build_stream(video_id, items[0])
+
+        if state == "upcoming":
+            scheduled = items[0].get("liveStreamingDetails", {}).get("scheduledStartTime")
+            if scheduled:
+                start = LiveStreamingDetails.parse_datetime(scheduled).timestamp()
+                if self.scheduled_starts.next_start(username) != (video_id, start):
+                    self.scheduled_starts.add(username, video_id, start)
+            self.logger.log(20, "%s scheduled broadcast is not live yet (API).", username)
+            return None
+
+        self.scheduled_starts.discard(username, video_id)
+        return None
+
+    async def discover_upcoming(self, usernames: Iterable[str], per_channel: int = 5) -> List[YoutubeUpcomingBroadcast]:
+        """
+        Find the upcoming broadcasts of channels and add them to :attr:`scheduled_starts`.
+
+        The latest uploads of every channel are listed and their details fetched 50 videos per request,
+        about 2 quota units per channel instead of 100 for a search. Broadcasts whose window has
+        passed are dropped from :attr:`scheduled_starts` first.
+
+        Parameters
+        ----------
+        usernames: Iterable[:class:`str`]
+            The usernames of the YouTube channels.
+        per_channel: :class:`int`
+            Latest uploads of each channel to look at, scheduled broadcasts are listed among them.
+
+        Returns
+        -------
+        List[:class:`YoutubeUpcomingBroadcast`]
+            The upcoming broadcasts, ordered by scheduled start.
+        """
+        self.scheduled_starts.expire()
+        owners: Dict[str, str] = {}
+        usernames = list(usernames)
+        channel_ids = await asyncio.gather(*(self._get_channel_id(name) for name in usernames), return_exceptions=True)
+        found = [(name, channel_id) for name, channel_id in zip(usernames, channel_ids)
+                 if not self._discovery_failed(name, channel_id)]
+        playlists = await asyncio.gather(*(self._list_uploads(channel_id, per_channel) for _, channel_id in found),
+                                         return_exceptions=True)
+        for (name, _), playlist in zip(found, playlists):
+            if not self._discovery_failed(name, playlist):
+                for video_id in playlist:
+                    owners[video_id] = name
+
+        video_ids = list(owners)
+        chunks = [video_ids[i:i + 50] for i in range(0, len(video_ids), 50)]
+        batches = await asyncio.gather(*(
+            self._make_request(
+                f"{self.BASE_URL}/videos",
+                params={"part": "snippet,liveStreamingDetails", "id": ",".join(chunk), "key": self.oauth.api_key},
+            )
+            for chunk in chunks
+        ), return_exceptions=True)
+
+        broadcasts = []
+        for chunk, batch in zip(chunks, batches):
+            if self._discovery_failed(", ".join(sorted({owners[video_id] for video_id in chunk})), batch):
+                continue
+            for item in batch.get("items", []):
                 snippet = item["snippet"]
-                live_detail = item["liveStreamingDetails"]
-                data = {
-                    k: snippet[k]
-                    for k in [
-                        "title",
-                        "description",
-                        "publishedAt",
-                        "channelTitle",
-                        "categoryId",
-                        "thumbnails",
-                        "channelId",
-                    ]
-                }
-
-                self.logger.log(20, f"{username} is live (API).")
-                return YoutubeStreamDataAPI(id=live_id, LiveDetails=LiveStreamingDetails(**live_detail), **data)
-            except Exception as e:
-                self.logger.error(f"Error using YouTube API: {e}")
-                return False
+                scheduled = item.get("liveStreamingDetails", {}).get("scheduledStartTime")
+                if snippet.get("liveBroadcastContent") != "upcoming" or not scheduled:
+                    continue
+                broadcast = self._build_model(
+                    YoutubeUpcomingBroadcast,
+                    id=item["id"],
+                    channelId=snippet["channelId"],
+                    channelTitle=snippet["channelTitle"],
+                    title=snippet["title"],
+                    scheduledStartTime=scheduled,
+                )
+                self.scheduled_starts.add(owners[broadcast.id], broadcast.id, broadcast.scheduledStartTime.timestamp())
+                broadcasts.append(broadcast)
+
+        return sorted(broadcasts, key=lambda broadcast: broadcast.scheduledStartTime)
+
+    async def _list_uploads(self, channel_id: str, limit: int) -> List[str]:
+        """
+        The ids of the latest uploads of a channel, scheduled broadcasts included.
+        """
+        result = await self._make_request(
+            f"{self.BASE_URL}/playlistItems",
+            params={"part": "contentDetails", "playlistId": "UU" + channel_id[2:], "maxResults": limit,
+                    "key": self.oauth.api_key},
+        )
+        return [item["contentDetails"]["videoId"] for item in result.get("items", [])]
+
+    def _discovery_failed(self, username: str, result: Any) -> bool:
+        if isinstance(result, BaseException):
+            self.logger.warning("Discovering upcoming broadcasts of %s failed: %s", username, result)
+            return True
+        return False
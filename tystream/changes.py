@@ -0,0 +1,366 @@
+import hashlib
+import sys
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+
+from tystream.metrics import MetricsRegistry, DISABLED_METRICS
+from tystream.models.status import UnknownStream
+from tystream.models.twitch import TwitchStreamData
+from tystream.models.youtube import YoutubeStreamDataAPI, YoutubeStreamDataYTDLP
+
+
+def _digest(text: Optional[str]) -> Optional[int]:
+    """
+    A 64-bit digest of a string that is stable between processes, unlike :func:`hash`.
+    """
+    if text is None:
+        return None
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _title(result: Any) -> Optional[str]:
+    if isinstance(result, YoutubeStreamDataYTDLP):
+        return result.fulltitle
+    return getattr(result, "title", None)
+
+
+class Fingerprint:
+    """
+    The compact state of a channel kept between observations.
+
+    The title is stored as a 64-bit digest, so a channel costs a few small values
+    no matter how large the stream object is.
+
+    Attributes
+    ----------
+    stream_id: Optional[:class:`str`]
+        Id of the live stream, None while offline.
+    title: Optional[:class:`int`]
+        Digest of the stream title.
+    category: Optional[:class:`str`]
+        Game or category of the stream, when the platform reports one.
+    viewers: Optional[:class:`int`]
+        Concurrent viewers.
+    observed_at: :class:`float`
+        Unix timestamp of the observation.
+    """
+
+    __slots__ = ("stream_id", "title", "category", "viewers", "observed_at")
+
+    def __init__(
+            self,
+            stream_id: Optional[str] = None,
+            title: Optional[int] = None,
+            category: Optional[str] = None,
+            viewers: Optional[int] = None,
+            observed_at: Optional[float] = None
+    ) -> None:
+        self.stream_id = stream_id
+        self.title = title
+        self.category = category
+        self.viewers = viewers
+        self.observed_at = time.time() if observed_at is None else observed_at
+
+    @property
+    def live(self) -> bool:
+        return self.stream_id is not None
+
+    @classmethod
+    def from_result(cls, result: Any) -> "Fingerprint":
+        """
+        Build the fingerprint of a ``check_stream_live`` result, ``False`` is an offline channel.
+        """
+        if isinstance(result, TwitchStreamData):
+            return cls(str(result.id), _digest(result.title), sys.intern(result.game_name), result.viewer_count)
+        if isinstance(result, YoutubeStreamDataAPI):
+            viewers = result.LiveDetails.concurrentViewers if result.LiveDetails else None
+            return cls(result.id, _digest(result.title), None, viewers)
+        if isinstance(result, YoutubeStreamDataYTDLP):
+            return cls(result.video_id, _digest(_title(result)), None, result.concurrent_view_count)
+        if not result:
+            return cls()
+        raise TypeError(f"Cannot fingerprint {type(result).__name__}.")
+
+    def to_tuple(self) -> Tuple:
+        return self.stream_id, self.title, self.category, self.viewers, self.observed_at
+
+    @classmethod
+    def from_tuple(cls, values: Iterable) -> "Fingerprint":
+        return cls(*values)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Fingerprint) and self.to_tuple()[:4] == other.to_tuple()[:4]
+
+    def __repr__(self) -> str:
+        return (f"<Fingerprint stream_id={self.stream_id!r} category={self.category!r} "
+                f"viewers={self.viewers}>")
+
+
+class ChangeEvent:
+    """
+    A change of a watched field between two observations of a channel.
+
+    Attributes
+    ----------
+    platform: :class:`str`
+        ``"twitch"`` or ``"youtube"``.
+    channel: :class:`str`
+        The channel the change was observed on.
+    old: Any
+        The previous value, None when it is unknown.
+    new: Any
+        The new value.
+    result: Any
+        The ``check_stream_live`` result that triggered the event.
+    timestamp: :class:`float`
+        Unix timestamp of the observation.
+    """
+
+    kind = "changed"
+
+    __slots__ = ("platform", "channel", "old", "new", "result", "timestamp")
+
+    def __init__(self, platform: str, channel: str, old: Any, new: Any, result: Any, timestamp: float) -> None:
+        self.platform = platform
+        self.channel = channel
+        self.old = old
+        self.new = new
+        self.result = result
+        self.timestamp = timestamp
+
+    @property
+    def url(self) -> Optional[str]:
+        """
+        The url of the stream, None when the result has none.
+        """
+        if isinstance(self.result, YoutubeStreamDataYTDLP):
+            return self.result.webpage_url
+        return getattr(self.result, "url", None)
+
+    @property
+    def title(self) -> Optional[str]:
+        return _title(self.result)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The event as plain JSON serializable data.
+        """
+        data = {
+            "event": self.kind,
+            "platform": self.platform,
+            "channel": self.channel,
+            "timestamp": self.timestamp,
+            "old": self.old,
+            "new": self.new,
+        }
+        if self.result:
+            data["title"] = self.title
+            data["url"] = self.url
+        return data
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.platform}/{self.channel} {self.old!r} -> {self.new!r}>"
+
+
+class StreamOnline(ChangeEvent):
+    """The channel went live, or started a new stream. ``old`` is the id of the previous stream."""
+    kind = "online"
+    __slots__ = ()
+
+
+class StreamOffline(ChangeEvent):
+    """The channel went offline. ``old`` is the id of the stream that ended."""
+    kind = "offline"
+    __slots__ = ()
+
+
+class TitleChanged(ChangeEvent):
+    """The stream title changed. ``old`` is None, only a digest of the previous title is kept."""
+    kind = "title"
+    __slots__ = ()
+
+
+class CategoryChanged(ChangeEvent):
+    """The game or category of the stream changed."""
+    kind = "category"
+    __slots__ = ()
+
+
+class ViewersThresholdCrossed(ChangeEvent):
+    """
+    The viewer count crossed one of the configured thresholds.
+
+    Attributes
+    ----------
+    threshold: :class:`int`
+        The threshold that was crossed.
+    rising: :class:`bool`
+        True when the count went above the threshold, False when it fell below.
+    """
+    kind = "viewers"
+    __slots__ = ("threshold", "rising")
+
+    def __init__(self, platform: str, channel: str, old: Any, new: Any, result: Any, timestamp: float,
+                 threshold: int = 0) -> None:
+        super().__init__(platform, channel, old, new, result, timestamp)
+        self.threshold = threshold
+        self.rising = new >= threshold
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**super().to_dict(), "threshold": self.threshold, "rising": self.rising}
+
+
+class ChangeDetector:
+    """
+    Keep a :class:`Fingerprint` of the last observation of every channel
+    and turn new ``check_stream_live`` results into :class:`ChangeEvent` objects.
+
+    Only changes of watched fields produce events, so consumers don't have to keep
+    and diff full stream objects. :class:`UnknownStream` results are ignored and keep the last state.
+
+    Parameters
+    ----------
+    watch: Tuple[:class:`str`, ...]
+        The event kinds to emit, any of ``"online"``, ``"offline"``, ``"title"``, ``"category"`` and ``"viewers"``.
+    viewer_thresholds: Tuple[:class:`int`, ...]
+        Viewer counts that emit :class:`ViewersThresholdCrossed` when crossed in either direction.
+    emit_initial: :class:`bool`
+        Emit :class:`StreamOnline` for channels that are already live on their first observation.
+    metrics: Optional[:class:`MetricsRegistry`]
+        Registry counting emitted events by kind.
+    """
+
+    EVENT_KINDS = ("online", "offline", "title", "category", "viewers")
+
+    def __init__(
+            self,
+            watch: Tuple[str, ...] = EVENT_KINDS,
+            viewer_thresholds: Tuple[int, ...] = (10_000,),
+            emit_initial: bool = False,
+            metrics: Optional[MetricsRegistry] = None
+    ) -> None:
+        unknown = set(watch) - set(self.EVENT_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown event kinds: {', '.join(sorted(unknown))}")
+
+        self.watch = frozenset(watch)
+        self.viewer_thresholds = tuple(sorted(viewer_thresholds))
+        self.emit_initial = emit_initial
+        self.metrics = metrics or DISABLED_METRICS
+
+        self._state: Dict[Tuple[str, str], Fingerprint] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    @staticmethod
+    def _platform(result: Any) -> Optional[str]:
+        if isinstance(result, TwitchStreamData):
+            return "twitch"
+        if isinstance(result, (YoutubeStreamDataAPI, YoutubeStreamDataYTDLP)):
+            return "youtube"
+        return None
+
+    def get(self, platform: str, channel: str) -> Optional[Fingerprint]:
+        """
+        The last fingerprint of a channel, None if it was never observed.
+        """
+        return self._state.get((platform, channel.lower()))
+
+    def forget(self, platform: str, channel: str) -> None:
+        with self._lock:
+            self._state.pop((platform, channel.lower()), None)
+
+    def observe(self, channel: str, result: Any, platform: Optional[str] = None) -> List[ChangeEvent]:
+        """
+        Compare a ``check_stream_live`` result with the last observation of the channel.
+
+        Parameters
+        ----------
+        channel: :class:`str`
+            The channel that was checked.
+        result: Any
+            The result of ``check_stream_live``.
+        platform: Optional[:class:`str`]
+            The platform of the channel, derived from the result when it is live.
+
+        Returns
+        -------
+        List[:class:`ChangeEvent`]
+            The changes of watched fields, empty when nothing changed.
+        """
+        if isinstance(result, UnknownStream):
+            return []
+
+        platform = platform or self._platform(result)
+        if platform is None:
+            raise ValueError("platform is required for offline results.")
+
+        new = Fingerprint.from_result(result)
+        key = (platform, channel.lower())
+        with self._lock:
+            old = self._state.get(key)
+            self._state[key] = new
+
+        events = self._diff(platform, channel, old, new, result)
+        for event in events:
+            self.metrics.inc("changes_total", kind=event.kind)
+        return events
+
+    def _diff(
+            self,
+            platform: str,
+            channel: str,
+            old: Optional[Fingerprint],
+            new: Fingerprint,
+            result: Any
+    ) -> List[ChangeEvent]:
+        watch = self.watch
+        now = new.observed_at
+        events: List[ChangeEvent] = []
+
+        if old is None:
+            if self.emit_initial and new.live and "online" in watch:
+                events.append(StreamOnline(platform, channel, None, new.stream_id, result, now))
+            return events
+
+        if not new.live:
+            if old.live and "offline" in watch:
+                events.append(StreamOffline(platform, channel, old.stream_id, None, result, now))
+            return events
+
+        if new.stream_id != old.stream_id:
+            if "online" in watch:
+                events.append(StreamOnline(platform, channel, old.stream_id, new.stream_id, result, now))
+            if not old.live:
+                return events
+
+        if "title" in watch and new.title != old.title:
+            events.append(TitleChanged(platform, channel, None, _title(result), result, now))
+        if "category" in watch and new.category != old.category:
+            events.append(CategoryChanged(platform, channel, old.category, new.category, result, now))
+        if "viewers" in watch and old.viewers is not None and new.viewers is not None:
+            low, high = sorted((old.viewers, new.viewers))
+            for threshold in self.viewer_thresholds:
+                if low < threshold <= high:
+                    events.append(ViewersThresholdCrossed(platform, channel, old.viewers, new.viewers, result, now,
+                                                          threshold=threshold))
+        return events
+
+    def snapshot(self) -> Dict[Tuple[str, str], Tuple]:
+        """
+        The state of every channel as plain tuples, see :meth:`restore`.
+        """
+        with self._lock:
+            return {key: fingerprint.to_tuple() for key, fingerprint in self._state.items()}
+
+    def restore(self, state: Dict[Tuple[str, str], Iterable]) -> None:
+        """
+        Load the state returned by :meth:`snapshot`, replacing the state of the same channels.
+        """
+        with self._lock:
+            for (platform, channel), values in state.items():
+                self._state[(platform, channel.lower())] = Fingerprint.from_tuple(values)
+
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Optional, Dict, Tuple
+
+from tystream.exceptions import HTTPException, TransportException
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests to an endpoint after repeated failures.
+
+    The breaker opens after ``failure_threshold`` consecutive failures and rejects requests.
+    Once ``recovery_timeout`` has passed it half-opens and lets ``half_open_max_calls`` probe
+    requests through, a successful probe closes it again and a failed one re-opens it.
+
+    Parameters
+    ----------
+    failure_threshold: :class:`int`
+        Consecutive failures that open the breaker.
+    recovery_timeout: :class:`float`
+        Seconds the breaker stays open before probing.
+    half_open_max_calls: :class:`int`
+        Probe requests allowed at the same time while half-open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    @property
+    def retry_at(self) -> Optional[float]:
+        """Monotonic time at which an open breaker starts probing."""
+        if self._state != self.OPEN:
+            return None
+        return self._opened_at + self.recovery_timeout
+
+    def allow(self) -> bool:
+        """
+        Whether a request may be sent now, a probe slot is taken when half-open.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            return False
+
+    def release(self) -> None:
+        """
+        Give back the probe slot of a request that ended without an outcome, e.g. because it was cancelled.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probes = 0
+
+
+class CircuitBreakerRegistry:
+    """
+    One :class:`CircuitBreaker` per host and endpoint.
+
+    The registry can be shared between clients, so every client stops calling an endpoint that is down.
+    Parameters are the same as :class:`CircuitBreaker`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str, endpoint: str) -> CircuitBreaker:
+        key = (host, endpoint)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    key, CircuitBreaker(self.failure_threshold, self.recovery_timeout, self.half_open_max_calls)
+                )
+        return breaker
+
+    def is_open(self, host: str, endpoint: Optional[str] = None) -> bool:
+        """
+        Whether the breaker of an endpoint, or any endpoint of ``host`` when no endpoint is given, is open.
+        """
+        for (breaker_host, breaker_endpoint), breaker in list(self._breakers.items()):
+            if breaker_host == host and endpoint in (None, breaker_endpoint) and breaker.state == CircuitBreaker.OPEN:
+                return True
+        return False
+
+    @staticmethod
+    def is_failure(error: BaseException) -> bool:
+        """
+        Errors showing the endpoint is unhealthy: connection errors, 429, 5xx and exhausted quotas.
+        Client errors such as 404 don't count.
+        """
+        if isinstance(error, TransportException):
+            return True
+        if isinstance(error, HTTPException):
+            return error.status >= 500 or error.status == 429 or (error.status == 403 and "quota" in str(error).lower())
+        return False
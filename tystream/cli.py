@@ -0,0 +1,252 @@
+"""
+The ``tystream`` command.
+
+``tystream watch`` checks a watchlist in a loop and writes every change as one JSON object
+per line to stdout, so it can feed a Unix pipeline or a queue consumer::
+
+    tystream watch channels.txt --interval 30 --concurrency 100 | jq .
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Optional, Dict, Any, List, Iterable, BinaryIO, Sequence
+
+from tystream.changes import ChangeDetector
+from tystream.priority import BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+PLATFORMS = ("twitch", "youtube")
+
+
+def read_watchlist(lines: Iterable[str], default_platform: str = "twitch") -> Dict[str, List[str]]:
+    """
+    Parse a watchlist, one channel per line.
+
+    A line is either a channel of ``default_platform`` or ``platform:channel``,
+    blank lines and ``#`` comments are skipped and duplicates are dropped.
+    """
+    watchlist: Dict[str, Dict[str, None]] = {}
+    for number, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        platform, separator, channel = line.partition(":")
+        if not separator:
+            platform, channel = default_platform, line
+        platform, channel = platform.strip().lower(), channel.strip()
+        if platform not in PLATFORMS or not channel:
+            raise ValueError(f"Line {number}: expected 'channel' or 'platform:channel', got {line!r}.")
+        watchlist.setdefault(platform, {})[channel] = None
+    return {platform: list(channels) for platform, channels in watchlist.items()}
+
+
+class NDJSONWriter:
+    """
+    Write objects as newline delimited JSON through a large write buffer.
+
+    Parameters
+    ----------
+    stream: BinaryIO
+        The binary stream to write to.
+    buffer_size: :class:`int`
+        Bytes buffered before they are written to ``stream``.
+    """
+
+    def __init__(self, stream: BinaryIO, buffer_size: int = 65536) -> None:
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+        self.written = 0
+
+    def write(self, data: Dict[str, Any]) -> None:
+        self._buffer += json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+        self._buffer += b"\n"
+        self.written += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.stream.write(self._buffer)
+            self._buffer.clear()
+        self.stream.flush()
+
+
+async def watch(
+        watchlist: Dict[str, List[str]],
+        clients: Dict[str, Any],
+        writer: NDJSONWriter,
+        detector: Optional[ChangeDetector] = None,
+        interval: float = 60.0,
+        concurrency: int = 50,
+        once: bool = False,
+        deadline: Optional[float] = None
+) -> None:
+    """
+    Check every channel of the watchlist each ``interval`` seconds and write its changes.
+
+    Every platform is swept with ``check_streams_live`` as background requests, its results are
+    written as soon as its sweep completes and the writer is flushed after each sweep.
+
+    Parameters
+    ----------
+    watchlist: Dict[:class:`str`, List[:class:`str`]]
+        The channels by platform, see :func:`read_watchlist`.
+    clients: Dict[:class:`str`, Any]
+        An async client for every platform of the watchlist.
+    writer: :class:`NDJSONWriter`
+        Where the events are written.
+    detector: Optional[:class:`ChangeDetector`]
+        Turns results into events, defaults to online and offline events.
+    interval: :class:`float`
+        Seconds between the starts of two sweeps.
+    concurrency: :class:`int`
+        Checks running at once on each platform.
+    once: :class:`bool`
+        Stop after the first sweep.
+    deadline: Optional[:class:`float`]
+        Seconds a sweep may take, channels still being checked then are answered with their last
+        known status. None to wait for every check.
+    """
+    if detector is None:
+        detector = ChangeDetector(watch=("online", "offline"))
+
+    async def sweep(platform: str, channels: List[str]):
+        return platform, await clients[platform].check_streams_live(channels, deadline, concurrency, BACKGROUND)
+
+    while True:
+        started = time.monotonic()
+        sweeps = [sweep(platform, channels) for platform, channels in watchlist.items()]
+        timed_out = 0
+        for completed in asyncio.as_completed(sweeps):
+            platform, results = await completed
+            timed_out += len(results.timed_out)
+            for channel, result in results.items():
+                for event in detector.observe(channel, result, platform):
+                    writer.write(event.to_dict())
+        writer.flush()
+        logger.info("Checked %d channels in %.2fs, %d timed out.", sum(map(len, watchlist.values())),
+                    time.monotonic() - started, timed_out)
+
+        if once:
+            return
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="tystream", description="Twitch & Youtube stream notifications.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    watch_parser = commands.add_parser(
+        "watch",
+        help="Check a watchlist in a loop and write changes to stdout as NDJSON.",
+        description="Check a watchlist in a loop and write changes to stdout as NDJSON. "
+                    "Lines of the watchlist are 'channel' or 'platform:channel'."
+    )
+    watch_parser.add_argument("watchlist", nargs="?", default="-",
+                              help="The watchlist file, '-' or nothing to read it from stdin.")
+    watch_parser.add_argument("--platform", choices=PLATFORMS, default="twitch",
+                              help="Platform of lines without a prefix (default: %(default)s).")
+    watch_parser.add_argument("--interval", type=float, default=60.0,
+                              help="Seconds between the starts of two sweeps (default: %(default)s).")
+    watch_parser.add_argument("--concurrency", type=int, default=50,
+                              help="Checks running at once on each platform (default: %(default)s).")
+    watch_parser.add_argument("--deadline", type=float, default=None,
+                              help="Seconds a sweep may take, slower channels keep their last known status. "
+                                   "Defaults to the interval, or no deadline with --once.")
+    watch_parser.add_argument("--cache-ttl", type=int, default=None,
+                              help="Seconds results are cached, defaults to a bit less than the interval.")
+    watch_parser.add_argument("--once", action="store_true", help="Stop after the first sweep.")
+    watch_parser.add_argument("--events", default="online,offline",
+                              help="Comma separated event kinds to write, any of "
+                                   f"{', '.join(ChangeDetector.EVENT_KINDS)} (default: %(default)s).")
+    watch_parser.add_argument("--emit-initial", action="store_true",
+                              help="Write online events for channels already live on the first sweep.")
+    watch_parser.add_argument("--buffer-size", type=int, default=65536,
+                              help="Bytes of output buffered between writes (default: %(default)s).")
+    watch_parser.add_argument("--twitch-client-id", default=os.environ.get("TWITCH_CLIENT_ID"),
+                              help="Defaults to $TWITCH_CLIENT_ID.")
+    watch_parser.add_argument("--twitch-client-secret", default=os.environ.get("TWITCH_CLIENT_SECRET"),
+                              help="Defaults to $TWITCH_CLIENT_SECRET.")
+    watch_parser.add_argument("--youtube-api-key", default=os.environ.get("YOUTUBE_API_KEY"),
+                              help="Defaults to $YOUTUBE_API_KEY, YouTube channels are checked with yt-dlp without one.")
+    watch_parser.add_argument("--log-level", type=str.upper, default="WARNING",
+                              choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+                              help="Level of the log written to stderr (default: %(default)s).")
+    return parser
+
+
+def _create_clients(args: argparse.Namespace, platforms: Iterable[str], parser: argparse.ArgumentParser):
+    cache_ttl = args.cache_ttl if args.cache_ttl is not None else max(0, int(args.interval) - 1)
+    clients = {}
+    for platform in platforms:
+        if platform == "twitch":
+            if not args.twitch_client_id or not args.twitch_client_secret:
+                parser.error("Twitch channels need --twitch-client-id and --twitch-client-secret.")
+            from tystream.async_api.twitch import AsyncTwitch
+            clients["twitch"] = AsyncTwitch(args.twitch_client_id, args.twitch_client_secret, cache_ttl=cache_ttl)
+        else:
+            if not args.youtube_api_key:
+                logger.info("No --youtube-api-key, checking YouTube channels with yt-dlp.")
+            from tystream.async_api.youtube import AsyncYoutube
+            clients["youtube"] = AsyncYoutube(args.youtube_api_key or None, cache_ttl=cache_ttl)
+    return clients
+
+
+async def _run_watch(
+        args: argparse.Namespace,
+        watchlist: Dict[str, List[str]],
+        clients: Dict[str, Any],
+        detector: ChangeDetector
+) -> None:
+    writer = NDJSONWriter(sys.stdout.buffer, args.buffer_size)
+    try:
+        deadline = args.deadline if args.deadline is not None or args.once else args.interval
+        await watch(watchlist, clients, writer, detector, args.interval, args.concurrency, args.once, deadline)
+    finally:
+        for client in clients.values():
+            await client.close()
+        writer.flush()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level, stream=sys.stderr,
+                        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    try:
+        if args.watchlist == "-":
+            watchlist = read_watchlist(sys.stdin, args.platform)
+        else:
+            with open(args.watchlist, encoding="utf-8") as file:
+                watchlist = read_watchlist(file, args.platform)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not watchlist:
+        parser.error("The watchlist is empty.")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1.")
+    if args.deadline is not None and args.deadline <= 0:
+        parser.error("--deadline must be positive.")
+    try:
+        detector = ChangeDetector(watch=tuple(kind.strip() for kind in args.events.split(",") if kind.strip()),
+                                  emit_initial=args.emit_initial)
+    except ValueError as e:
+        parser.error(str(e))
+
+    clients = _create_clients(args, watchlist, parser)
+    try:
+        asyncio.run(_run_watch(args, watchlist, clients, detector))
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # The reader went away, e.g. `tystream watch | head`, don't fail again when stdout is closed at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    return 0
@@ -0,0 +1,55 @@
+"""
+JSON decoders for response bodies.
+
+The clients decode every response with the decoder passed as ``decoder``. ``"auto"``, the
+default, uses `orjson <https://github.com/ijl/orjson>`_ when it is installed
+(``pip install tystream[fast]``) and the standard library otherwise.
+"""
+import json
+from typing import Any, Callable, Optional, Union
+
+Decoder = Callable[[bytes], Any]
+
+_auto: Optional[Decoder] = None
+
+
+def stdlib_decoder(body: bytes) -> Any:
+    return json.loads(body)
+
+
+def orjson_decoder() -> Decoder:
+    import orjson
+
+    return orjson.loads
+
+
+def get_decoder(decoder: Union[str, Decoder, None] = "auto") -> Decoder:
+    """
+    Resolve a decoder.
+
+    Parameters
+    ----------
+    decoder: Union[:class:`str`, Callable[[:class:`bytes`], Any], None]
+        ``"auto"`` or None for the fastest installed decoder, ``"json"`` for the standard library,
+        ``"orjson"`` for orjson, or a callable decoding bytes.
+
+    Raises
+    ------
+    :class:`ImportError`
+        ``"orjson"`` was requested but it is not installed.
+    """
+    global _auto
+    if callable(decoder):
+        return decoder
+    if decoder in ("auto", None):
+        if _auto is None:
+            try:
+                _auto = orjson_decoder()
+            except ImportError:
+                _auto = stdlib_decoder
+        return _auto
+    if decoder == "json":
+        return stdlib_decoder
+    if decoder == "orjson":
+        return orjson_decoder()
+    raise ValueError(f"Unknown decoder {decoder!r}, expected 'auto', 'json', 'orjson' or a callable.")
@@ -4,4 +4,31 @@ class OauthException(Exception):
 
 class NoResultException(Exception):
     def __init__(self, *args: object) -> None:
-        super().__init__(*args)
\ No newline at end of file
+        super().__init__(*args)
+
+class TransportException(Exception):
+    """
+    Raised by a transport when a request could not be completed, e.g. a connection error or a timeout.
+    """
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+class HTTPException(Exception):
+    """
+    Raised when an API request returns an unexpected status code.
+    """
+    def __init__(self, status: int, message: str = "", headers=None) -> None:
+        super().__init__(f"API request failed with status {status}: {message}")
+        self.status = status
+        self.headers = dict(headers or {})
+
+
+class CircuitOpenException(Exception):
+    """
+    Raised instead of sending a request while the circuit breaker of its endpoint is open.
+    """
+    def __init__(self, host: str, endpoint: str) -> None:
+        super().__init__(f"Circuit breaker for {host}{endpoint} is open.")
+        self.host = host
+        self.endpoint = endpoint
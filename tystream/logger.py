@@ -1,46 +1,113 @@
 import logging
+import logging.handlers
 import atexit
-from colorlog import ColoredFormatter
+import queue
+import threading
+from typing import Optional, List
+
+logging.addLevelName(25, 'TWITCH')
+logging.addLevelName(21, 'YOUTUBE')
+logging.getLogger("tystream").addHandler(logging.NullHandler())
 
 file_handler = None  # Global variable
+queue_listener: Optional[logging.handlers.QueueListener] = None
+_installed_handlers: List[logging.Handler] = []
+_lock = threading.Lock()
+
+
+def setup_logging(
+        filename: Optional[str] = "stream.log",
+        mode: str = "a",
+        level: int = logging.INFO,
+        use_queue: bool = True
+) -> None:
+    """
+    Configure colored console and file logging on the root logger.
+
+    Logging is opt-in, the clients never call this themselves.
+    Calling it again does nothing until :func:`close_log_handlers` is called.
+
+    Parameters
+    ----------
+    filename: Optional[:class:`str`]
+        The log file, None to only log to the console.
+    mode: :class:`str`
+        The mode the log file is opened with, ``"w"`` truncates it.
+    level: :class:`int`
+        The level of the root logger.
+    use_queue: :class:`bool`
+        Hand records to a :class:`logging.handlers.QueueListener` thread,
+        so console and disk I/O never run on the caller's thread or event loop.
+    """
+    global file_handler, queue_listener
+
+    with _lock:
+        if _installed_handlers:
+            return
 
-def setup_logging():
-    global file_handler
+        from colorlog import ColoredFormatter
 
-    formatter = ColoredFormatter(
-        '%(asctime)s %(log_color)s [%(levelname)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S',
-        log_colors={
-            'DEBUG': 'cyan',
-            'INFO': 'white',
-            'WARNING': 'yellow',
-            'ERROR': 'red',
-            'CRITICAL': 'bold_red',
-            'TWITCH': 'purple',
-            'YOUTUBE': 'red',
-        }
-    )
+        formatter = ColoredFormatter(
+            '%(asctime)s %(log_color)s [%(levelname)s] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S',
+            log_colors={
+                'DEBUG': 'cyan',
+                'INFO': 'white',
+                'WARNING': 'yellow',
+                'ERROR': 'red',
+                'CRITICAL': 'bold_red',
+                'TWITCH': 'purple',
+                'YOUTUBE': 'red',
+            }
+        )
 
-    logging.addLevelName(25, 'TWITCH')
-    logging.addLevelName(21, 'YOUTUBE')
+        stream_handler = logging.StreamHandler()
+        stream_handler.setLevel(logging.INFO)
+        stream_handler.setFormatter(formatter)
+        handlers: List[logging.Handler] = [stream_handler]
 
-    stream_handler = logging.StreamHandler()
-    stream_handler.setLevel(logging.INFO)
-    stream_handler.setFormatter(formatter)
+        if filename:
+            file_handler = logging.FileHandler(filename=filename, encoding="utf-8", mode=mode)
+            file_handler.setLevel(logging.DEBUG)
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
 
-    file_handler = logging.FileHandler(filename="stream.log", encoding="utf-8", mode="w")
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
+        root = logging.getLogger()
+        root.setLevel(level)
 
-    logging.basicConfig(
-        handlers=[stream_handler, file_handler], level=logging.INFO
-    )
+        if use_queue:
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+            queue_listener.start()
+            handlers = [logging.handlers.QueueHandler(log_queue)]
+
+        for handler in handlers:
+            root.addHandler(handler)
+        _installed_handlers.extend(handlers)
+
+        if not getattr(setup_logging, "_atexit_registered", False):
+            atexit.register(close_log_handlers)
+            setup_logging._atexit_registered = True
 
-    atexit.register(close_log_handlers)
 
 def close_log_handlers():
-    global file_handler
-    if file_handler:
-        logging.getLogger().removeHandler(file_handler)
-        file_handler.close()
-        file_handler = None
\ No newline at end of file
+    """
+    Stop the queue listener and remove the handlers installed by :func:`setup_logging`.
+    """
+    global file_handler, queue_listener
+
+    with _lock:
+        if queue_listener:
+            queue_listener.stop()
+            queue_listener = None
+
+        root = logging.getLogger()
+        for handler in _installed_handlers:
+            root.removeHandler(handler)
+            handler.close()
+        _installed_handlers.clear()
+
+        if file_handler:
+            logging.getLogger().removeHandler(file_handler)
+            file_handler.close()
+            file_handler = None
@@ -0,0 +1,219 @@
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DESCRIPTIONS = {
+    "requests_total": "HTTP requests made, by endpoint and status.",
+    "request_duration_seconds": "HTTP request latency, by endpoint.",
+    "request_wait_seconds": "Time requests waited for a PriorityLimiter, by priority.",
+    "retries_total": "HTTP requests retried after a transient failure.",
+    "hedges_total": "Hedged duplicate HTTP requests sent.",
+    "circuit_rejections_total": "HTTP requests rejected by an open circuit breaker.",
+    "ytdlp_fallbacks_total": "YouTube checks served by yt-dlp because the Data API circuit was open.",
+    "not_modified_total": "Conditional HTTP requests answered with 304 Not Modified.",
+    "cache_hits_total": "Cache lookups that returned a fresh entry.",
+    "cache_misses_total": "Cache lookups that found no fresh entry.",
+    "cache_entries": "Entries currently held by a cache.",
+    "checks_timed_out_total": "Checks of a batch cancelled by its deadline, by whether a stale result was used.",
+    "changes_total": "Change events emitted by a ChangeDetector, by kind.",
+    "deliveries_total": "Notification deliveries to a sink, by sink and outcome.",
+    "delivery_retries_total": "Notification POSTs retried, by sink.",
+    "notifications_dropped_total": "Notifications dropped because the delivery queue was full.",
+    "asset_requests_total": "Asset cache lookups, by outcome.",
+    "asset_bytes": "Bytes of images stored by an AssetCache.",
+    "token_refreshes_total": "OAuth token renewals.",
+    "ytdlp_duration_seconds": "yt-dlp extraction latency.",
+    "ytdlp_errors_total": "yt-dlp extractions that raised an error.",
+}
+
+MetricCallback = Callable[[str, str, float, Dict[str, str]], Any]
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, str]) -> None:
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    An in-process registry of counters, gauges and histograms.
+
+    Metrics are created on first use and can be exported with :meth:`render`
+    in the Prometheus text exposition format, or forwarded with :meth:`add_callback`.
+
+    Parameters
+    ----------
+    enabled: :class:`bool`
+        When disabled every update returns immediately.
+    namespace: :class:`str`
+        Prefix added to every metric name.
+    buckets: Tuple[:class:`float`, ...]
+        Upper bounds of the histogram buckets, in seconds.
+    """
+
+    def __init__(self, enabled: bool = True, namespace: str = "tystream", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.enabled = enabled
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._types: Dict[str, str] = {}
+        self._values: Dict[str, Dict[Tuple[Tuple[str, str], ...], Any]] = {}
+        self._callbacks: List[MetricCallback] = []
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return self.enabled
+
+    def add_callback(self, callback: MetricCallback) -> None:
+        """
+        Register a callback called as ``callback(kind, name, value, labels)`` on every update.
+        """
+        self._callbacks.append(callback)
+
+    def _series(self, kind: str, name: str) -> Dict:
+        series = self._values.get(name)
+        if series is None:
+            self._types[name] = kind
+            series = self._values[name] = {}
+        return series
+
+    def _notify(self, kind: str, name: str, value: float, labels: Dict[str, str]) -> None:
+        for callback in self._callbacks:
+            callback(kind, name, value, labels)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """
+        Increase a counter.
+        """
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series("counter", name)
+            series[key] = series.get(key, 0.0) + value
+        if self._callbacks:
+            self._notify("counter", name, value, labels)
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """
+        Set a gauge.
+        """
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series("gauge", name)[key] = value
+        if self._callbacks:
+            self._notify("gauge", name, value, labels)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Record a value in a histogram.
+        """
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series("histogram", name)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][i] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+        if self._callbacks:
+            self._notify("histogram", name, value, labels)
+
+    def timer(self, name: str, **labels: str):
+        """
+        A context manager observing the time spent in its block into a histogram.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def get(self, name: str, **labels: str) -> Optional[float]:
+        """
+        Get the current value of a counter or gauge, or the observation count of a histogram.
+        """
+        series = self._values.get(name, {})
+        value = series.get(tuple(sorted(labels.items())))
+        if isinstance(value, list):
+            return value[2]
+        return value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._types.clear()
+            self._values.clear()
+
+    @staticmethod
+    def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        items = labels + extra
+        if not items:
+            return ""
+        escaped = (
+            k + '="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            for k, v in items
+        )
+        return "{" + ",".join(escaped) + "}"
+
+    def render(self) -> str:
+        """
+        Export every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for name, series in self._values.items():
+                kind = self._types[name]
+                full_name = f"{self.namespace}_{name}" if self.namespace else name
+                if name in DESCRIPTIONS:
+                    lines.append(f"# HELP {full_name} {DESCRIPTIONS[name]}")
+                lines.append(f"# TYPE {full_name} {kind}")
+
+                for labels, value in series.items():
+                    if kind != "histogram":
+                        lines.append(f"{full_name}{self._format_labels(labels)} {value}")
+                        continue
+
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket in zip(self.buckets, counts):
+                        cumulative += bucket
+                        lines.append(f"{full_name}_bucket{self._format_labels(labels, (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{full_name}_bucket{self._format_labels(labels, (('le', '+Inf'),))} {count}")
+                    lines.append(f"{full_name}_sum{self._format_labels(labels)} {total}")
+                    lines.append(f"{full_name}_count{self._format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+DISABLED_METRICS = MetricsRegistry(enabled=False)
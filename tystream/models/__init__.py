@@ -1,2 +1,20 @@
-from .twitch import *
-from .youtube import *
\ No newline at end of file
+from tystream._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "TwitchUserData": "tystream.models.twitch",
+        "TwitchStreamData": "tystream.models.twitch",
+        "TwitchVODData": "tystream.models.twitch",
+        "TwitchGameData": "tystream.models.twitch",
+        "Thumbnail": "tystream.models.youtube",
+        "Thumbnails": "tystream.models.youtube",
+        "LiveStreamingDetails": "tystream.models.youtube",
+        "YoutubeStreamDataYTDLP": "tystream.models.youtube",
+        "YoutubeStreamDataAPI": "tystream.models.youtube",
+        "YoutubeUpcomingBroadcast": "tystream.models.youtube",
+        "UnknownStream": "tystream.models.status",
+        "CheckResults": "tystream.models.status",
+    },
+    submodules=("twitch", "youtube", "status"),
+)
@@ -0,0 +1,62 @@
+from typing import Set
+
+
+class UnknownStream:
+    """
+    Returned instead of ``False`` when the live status of a channel could not be determined,
+    for example while the API is failing.
+
+    It is falsy like an offline result, check ``isinstance(result, UnknownStream)`` to tell them apart.
+
+    Attributes
+    ----------
+    reason: :class:`str`
+        Why the status is unknown, e.g. ``"error"`` or ``"circuit_open"``.
+    """
+
+    __slots__ = ("reason",)
+
+    def __init__(self, reason: str = "unknown") -> None:
+        self.reason = reason
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, UnknownStream) and other.reason == self.reason
+
+    def __hash__(self) -> int:
+        return hash(("UnknownStream", self.reason))
+
+    def __repr__(self) -> str:
+        return f"UnknownStream(reason={self.reason!r})"
+
+
+class CheckResults(dict):
+    """
+    The results of a batch of checks by channel, returned by ``check_streams_live``.
+
+    Channels whose check did not complete before the deadline map to their last known status,
+    or to ``UnknownStream("timeout")`` when there is none.
+
+    Attributes
+    ----------
+    timed_out: Set[:class:`str`]
+        The channels whose check was cancelled by the deadline.
+    stale: Set[:class:`str`]
+        The channels among ``timed_out`` answered from an expired cache entry.
+    """
+
+    __slots__ = ("timed_out", "stale")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.timed_out: Set[str] = set()
+        self.stale: Set[str] = set()
+
+    @property
+    def complete(self) -> bool:
+        """
+        Whether every check completed before the deadline.
+        """
+        return not self.timed_out
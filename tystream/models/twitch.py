@@ -49,7 +49,7 @@ class TwitchStreamData(BaseModel):
     thumbnail_url: HttpUrl
     is_mature: bool = Field(default=False)
     tags: Optional[List[str]] = None
-    user: TwitchUserData
+    user: Optional[TwitchUserData] = None
 
     @field_validator("started_at", mode="before")
     @classmethod
@@ -97,3 +97,34 @@ class TwitchVODData(BaseModel):
     @classmethod
     def fix_thumbnail_url(cls, value: str) -> str:
         return value.replace("%{width}x%{height}", "320x180")
+
+
+class TwitchVODPage(BaseModel):
+    """
+    A page of Twitch VODs, validated straight from the raw response body.
+    """
+    data: List[TwitchVODData]
+    pagination: Dict[str, str] = Field(default_factory=dict)
+
+
+class TwitchGameData(BaseModel):
+    """
+    Twitch Game (Category) Model.
+    """
+    id: str
+    name: str
+    box_art_url: str
+    igdb_id: Optional[str] = None
+
+    @field_validator("igdb_id", mode="before")
+    @classmethod
+    def validate_igdb_id(cls, value):
+        if not value:
+            return None
+        return value
+
+    def box_art(self, width: int = 285, height: int = 380) -> str:
+        """
+        The url of the box art in the given size.
+        """
+        return self.box_art_url.replace("{width}x{height}", f"{width}x{height}")
@@ -3,6 +3,7 @@ from pydantic import BaseModel, field_validator, Field
 from datetime import datetime, timezone
 
 from typing import List, Optional
+from urllib.parse import parse_qs, urlsplit
 
 
 class Thumbnail(BaseModel):
@@ -84,6 +85,8 @@ class YoutubeStreamDataYTDLP(BaseModel):
         The URL of the YouTube channel that uploaded the video.
     webpage_url : str
         The URL of the YouTube video (video page link).
+    id : Optional[str]
+        The ID of the video.
     """
 
     fulltitle: str
@@ -94,6 +97,17 @@ class YoutubeStreamDataYTDLP(BaseModel):
     description: str
     channel_url: str
     webpage_url: str
+    id: Optional[str] = None
+
+    @property
+    def video_id(self) -> str:
+        """
+        The ID of the video, the same as :attr:`YoutubeStreamDataAPI.id` for the same stream.
+        """
+        if self.id:
+            return self.id
+        query = parse_qs(urlsplit(self.webpage_url).query)
+        return query["v"][0] if query.get("v") else self.webpage_url
 
     @field_validator("timestamp", mode="before")
     @classmethod
@@ -156,3 +170,39 @@ class YoutubeStreamDataAPI(BaseModel):
     def url(self) -> str:
         return f"https://www.youtube.com/watch?v={self.id}"
 
+
+class YoutubeUpcomingBroadcast(BaseModel):
+    """
+    A scheduled YouTube live stream that has not started yet.
+
+    Attributes
+    ----------
+    id: :class:`str`
+        The ID of the video of the broadcast.
+    channelId: :class:`str`
+        The ID of the channel hosting the broadcast.
+    channelTitle: :class:`str`
+        The title of the channel.
+    title: :class:`str`
+        The broadcast's title.
+    scheduledStartTime: :class:`datetime`
+        The time the broadcast is scheduled to start.
+    url: :class:`str`
+        The broadcast's url.
+    """
+    id: str
+    channelId: str
+    channelTitle: str
+    title: str
+    scheduledStartTime: datetime
+
+    @field_validator("scheduledStartTime", mode="before")
+    @classmethod
+    def parse_scheduledStartTime(cls, value):
+        if isinstance(value, str):
+            return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        return value
+
+    @property
+    def url(self) -> str:
+        return f"https://www.youtube.com/watch?v={self.id}"
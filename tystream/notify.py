@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+from urllib.parse import urlsplit
+
+from tystream.changes import ChangeEvent
+from tystream.exceptions import HTTPException, TransportException
+from tystream.metrics import MetricsRegistry, DISABLED_METRICS
+from tystream.retry import RetryPolicy
+from tystream.transport import get_header
+
+logger = logging.getLogger(__name__)
+
+PLATFORM_NAMES = {"twitch": "Twitch", "youtube": "YouTube"}
+
+
+class WebhookSink:
+    """
+    An HTTP endpoint receiving one JSON POST per event.
+
+    Every POST carries an ``Idempotency-Key`` header that stays the same across retries,
+    so an endpoint that honours it never posts an event twice.
+
+    Parameters
+    ----------
+    url: :class:`str`
+        The webhook url.
+    name: Optional[:class:`str`]
+        Name of the sink in logs and metrics, defaults to the host of the url.
+    kinds: Optional[Tuple[:class:`str`, ...]]
+        The event kinds delivered to the sink, None for every kind.
+    concurrency: :class:`int`
+        POSTs in flight to the sink at once.
+    headers: Optional[Dict[:class:`str`, :class:`str`]]
+        Extra headers, e.g. an ``Authorization`` header.
+    timeout: :class:`float`
+        Timeout of a single POST in seconds.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            name: Optional[str] = None,
+            kinds: Optional[Tuple[str, ...]] = None,
+            concurrency: int = 4,
+            headers: Optional[Dict[str, str]] = None,
+            timeout: float = 10.0
+    ) -> None:
+        self.url = url
+        self.name = name or urlsplit(url).netloc
+        self.kinds = frozenset(kinds) if kinds is not None else None
+        self.concurrency = max(1, concurrency)
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+
+    def accepts(self, event: ChangeEvent) -> bool:
+        return self.kinds is None or event.kind in self.kinds
+
+    def render(self, event: ChangeEvent) -> Dict[str, Any]:
+        """
+        The JSON body posted for an event.
+        """
+        return event.to_dict()
+
+    def idempotency_key(self, event: ChangeEvent) -> str:
+        """
+        A key identifying the delivery of an event to this sink.
+
+        Going live and offline are keyed by the stream, so the same stream is never announced
+        twice, other events by their observation time.
+        """
+        if event.kind in ("online", "offline"):
+            identity = (event.kind, event.old, event.new)
+        else:
+            identity = (event.kind, event.old, event.new, event.timestamp)
+        text = json.dumps([self.name, self.url, event.platform, event.channel.lower(), *identity], default=str)
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} name={self.name!r}>"
+
+
+class DiscordWebhookSink(WebhookSink):
+    """
+    A Discord webhook, posting ``template`` as the message content.
+
+    ``template`` is formatted with the fields of :meth:`ChangeEvent.to_dict` and ``platform_name``.
+    Only going live is delivered unless ``kinds`` says otherwise.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            template: str = "**{channel}** is live on {platform_name}: {title}\n{url}",
+            kinds: Optional[Tuple[str, ...]] = ("online",),
+            **kwargs
+    ) -> None:
+        super().__init__(url, kinds=kinds, **kwargs)
+        self.template = template
+
+    def message(self, event: ChangeEvent) -> str:
+        data = event.to_dict()
+        data.setdefault("title", None)
+        data.setdefault("url", None)
+        return self.template.format(platform_name=PLATFORM_NAMES.get(event.platform, event.platform), **data)
+
+    def render(self, event: ChangeEvent) -> Dict[str, Any]:
+        return {"content": self.message(event)}
+
+
+class SlackWebhookSink(DiscordWebhookSink):
+    """
+    A Slack incoming webhook, posting ``template`` as the message text.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            template: str = "*{channel}* is live on {platform_name}: {title}\n{url}",
+            **kwargs
+    ) -> None:
+        super().__init__(url, template=template, **kwargs)
+
+    def render(self, event: ChangeEvent) -> Dict[str, Any]:
+        return {"text": self.message(event)}
+
+
+class _SinkState:
+    __slots__ = ("semaphore", "blocked_until")
+
+    def __init__(self, concurrency: int) -> None:
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.blocked_until = 0.0
+
+
+class DeliveryPipeline:
+    """
+    Deliver change events to many sinks concurrently.
+
+    Events wait in a bounded queue, :meth:`submit` blocks while it is full so a burst of events
+    slows the producer down instead of growing memory. Worker tasks fan every event out to the sinks
+    that accept it, with at most :attr:`WebhookSink.concurrency` POSTs in flight per sink.
+
+    Failed POSTs are retried according to ``retry_policy``. A 429 or an exhausted rate limit
+    (``Retry-After``, ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset-After``, as sent by Discord
+    and Slack) pauses every delivery to that sink until the limit resets. Delivered idempotency keys
+    are remembered, so an event submitted twice is only posted once.
+
+    Parameters
+    ----------
+    sinks: Iterable[:class:`WebhookSink`]
+        Where events are delivered.
+    transport: Optional[:class:`AsyncTransport`]
+        The transport of the POSTs, pass the transport of a client to share its connection pool.
+    queue_size: :class:`int`
+        Events waiting for delivery before :meth:`submit` blocks.
+    workers: :class:`int`
+        Events delivered at once.
+    retry_policy: Optional[:class:`RetryPolicy`]
+        How failed POSTs are retried.
+    metrics: Optional[:class:`MetricsRegistry`]
+        Registry counting deliveries, retries and dropped events.
+    dedupe_size: :class:`int`
+        Delivered idempotency keys remembered.
+    """
+
+    def __init__(
+            self,
+            sinks: Iterable[WebhookSink],
+            transport=None,
+            queue_size: int = 1000,
+            workers: int = 16,
+            retry_policy: Optional[RetryPolicy] = None,
+            metrics: Optional[MetricsRegistry] = None,
+            dedupe_size: int = 10000
+    ) -> None:
+        self.sinks: List[WebhookSink] = list(sinks)
+        self._owns_transport = transport is None
+        if transport is None:
+            from tystream.async_api.transport import AiohttpTransport
+            transport = AiohttpTransport()
+        self.transport = transport
+        self.workers = max(1, workers)
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=5, max_delay=30.0, total_timeout=120.0)
+        self.metrics = metrics or DISABLED_METRICS
+        self.dedupe_size = dedupe_size
+
+        self._queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self._states = {id(sink): _SinkState(sink.concurrency) for sink in self.sinks}
+        self._delivered: "OrderedDict[str, None]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def start(self) -> None:
+        """
+        Start the worker tasks, on the running event loop.
+        """
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work(), name=f"tystream-delivery-{number}")
+                           for number in range(self.workers)]
+
+    @property
+    def pending(self) -> int:
+        """
+        Events waiting in the queue.
+        """
+        return self._queue.qsize()
+
+    async def submit(self, event: ChangeEvent) -> None:
+        """
+        Queue an event for delivery, waiting while the queue is full.
+        """
+        await self._queue.put(event)
+
+    def submit_nowait(self, event: ChangeEvent) -> bool:
+        """
+        Queue an event unless the queue is full, returns False when it was dropped.
+        """
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.metrics.inc("notifications_dropped_total")
+            logger.warning("Delivery queue is full, dropped %r.", event)
+            return False
+        return True
+
+    async def join(self) -> None:
+        """
+        Wait until every queued event was delivered or given up on.
+        """
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """
+        Deliver the queued events, then stop the workers and close the transport if the pipeline created it.
+        """
+        if self._tasks:
+            await self.join()
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        if self._owns_transport:
+            await self.transport.close()
+
+    async def _work(self) -> None:
+        while True:
+            event = await self._queue.get()
+            try:
+                await self.deliver(event)
+            except Exception as e:
+                logger.error("Delivering %r failed: %s", event, e)
+            finally:
+                self._queue.task_done()
+
+    async def deliver(self, event: ChangeEvent) -> Dict[str, bool]:
+        """
+        Deliver an event to every sink accepting it now, bypassing the queue.
+
+        Returns
+        -------
+        Dict[:class:`str`, :class:`bool`]
+            Whether the event was delivered, or had already been, by sink name.
+        """
+        sinks = [sink for sink in self.sinks if sink.accepts(event)]
+        results = await asyncio.gather(*(self._deliver(sink, event) for sink in sinks))
+        return {sink.name: result for sink, result in zip(sinks, results)}
+
+    async def _deliver(self, sink: WebhookSink, event: ChangeEvent) -> bool:
+        key = sink.idempotency_key(event)
+        if key in self._delivered:
+            self.metrics.inc("deliveries_total", sink=sink.name, outcome="duplicate")
+            return True
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.metrics.inc("deliveries_total", sink=sink.name, outcome="duplicate")
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            delivered = await self._post(sink, event, key)
+        except BaseException:
+            future.set_result(False)
+            raise
+        finally:
+            del self._in_flight[key]
+        future.set_result(delivered)
+
+        if delivered:
+            self._delivered[key] = None
+            while len(self._delivered) > self.dedupe_size:
+                self._delivered.popitem(last=False)
+        return delivered
+
+    async def _post(self, sink: WebhookSink, event: ChangeEvent, key: str) -> bool:
+        state = self._states[id(sink)]
+        body = json.dumps(sink.render(event), separators=(",", ":"), default=str).encode("utf-8")
+        headers = {**sink.headers, "Content-Type": "application/json", "Idempotency-Key": key}
+        policy = self.retry_policy
+        deadline = time.monotonic() + policy.total_timeout
+        attempt = 0
+
+        async with state.semaphore:
+            while True:
+                attempt += 1
+                wait = state.blocked_until - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    response = await self.transport.request("POST", sink.url, headers=headers, data=body,
+                                                            timeout=sink.timeout)
+                    self._update_rate_limit(state, response.headers)
+                    if not 200 <= response.status < 300:
+                        raise HTTPException(response.status, response.body.decode("utf-8", errors="replace"),
+                                            response.headers)
+                    self.metrics.inc("deliveries_total", sink=sink.name, outcome="delivered")
+                    return True
+                except (TransportException, HTTPException) as e:
+                    retryable = attempt < policy.max_attempts and policy.is_retryable(e)
+                    delay = policy.backoff(attempt, e) if retryable else None
+                    if delay is None or delay >= deadline - time.monotonic():
+                        self.metrics.inc("deliveries_total", sink=sink.name, outcome="failed")
+                        logger.error("Delivering %r to %s failed: %s", event, sink.name, e)
+                        return False
+                    self.metrics.inc("delivery_retries_total", sink=sink.name)
+                    logger.warning("Delivery to %s failed (%s), retrying in %.2fs.", sink.name, e, delay)
+                    if isinstance(e, HTTPException) and e.status == 429:
+                        # The limit is shared by every delivery to the sink, not just this one.
+                        state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+                    await asyncio.sleep(delay)
+
+    @staticmethod
+    def _update_rate_limit(state: _SinkState, headers: Dict[str, str]) -> None:
+        """
+        Pause the sink until its rate limit resets when the response says it is exhausted.
+        """
+        remaining = get_header(headers, "X-RateLimit-Remaining")
+        reset_after = get_header(headers, "X-RateLimit-Reset-After")
+        if remaining is None or reset_after is None:
+            return
+        try:
+            if int(float(remaining)) <= 0:
+                state.blocked_until = max(state.blocked_until, time.monotonic() + float(reset_after))
+        except ValueError:
+            return
@@ -0,0 +1,204 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional, Deque, Iterator, AsyncIterator
+
+from tystream.metrics import MetricsRegistry, DISABLED_METRICS
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+_priority: ContextVar[str] = ContextVar("tystream_priority", default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    """
+    The priority of the requests made by the current task, ``"interactive"`` unless set with :func:`request_priority`.
+    """
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """
+    Tag the requests made inside the block, and by the tasks it starts, with a priority.
+
+    Example
+    -------
+    ::
+
+        with request_priority("background"):
+            await twitch.check_streams_live(watchlist)
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(PRIORITIES)}.")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class PriorityLimiter:
+    """
+    Hand out request capacity to interactive requests before background ones.
+
+    Capacity is a number of requests in flight and, optionally, a request rate. While requests
+    wait, a free slot goes to the oldest interactive request, except that every
+    ``background_every``-th grant goes to a waiting background request, so a steady stream of
+    interactive lookups slows a background sweep down but never stops it.
+
+    Share one limiter between the clients that share a rate limit.
+
+    Parameters
+    ----------
+    concurrency: :class:`int`
+        Requests in flight at once.
+    rate: Optional[:class:`float`]
+        Requests started per second, None for no limit.
+    burst: Optional[:class:`int`]
+        Requests that may start at once after an idle period, defaults to ``concurrency``.
+    background_every: :class:`int`
+        A waiting background request gets at least one of this many grants.
+    metrics: Optional[:class:`MetricsRegistry`]
+        Registry recording the time requests waited, by priority.
+    """
+
+    def __init__(
+            self,
+            concurrency: int = 10,
+            rate: Optional[float] = None,
+            burst: Optional[int] = None,
+            background_every: int = 5,
+            metrics: Optional[MetricsRegistry] = None
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst if burst is not None else concurrency
+        self.background_every = max(1, background_every)
+        self.metrics = metrics or DISABLED_METRICS
+
+        self._in_flight = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._waiters = {INTERACTIVE: deque(), BACKGROUND: deque()}
+        self._interactive_streak = 0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def waiting(self, priority: Optional[str] = None) -> int:
+        """
+        Requests waiting for capacity, of one priority or in total.
+        """
+        if priority is not None:
+            return len(self._waiters[priority])
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None) -> AsyncIterator[None]:
+        """
+        Hold a unit of capacity for the duration of the block.
+        """
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Optional[str] = None) -> None:
+        """
+        Wait for a unit of capacity, with the priority of the current task by default.
+        """
+        priority = priority or current_priority()
+        start = time.monotonic()
+        if not self.waiting() and self._take():
+            self.metrics.observe("request_wait_seconds", 0.0, priority=priority)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        waiters: Deque[asyncio.Future] = self._waiters[priority]
+        waiters.append(future)
+        self._grant()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted right before the cancellation, pass the slot on.
+                self.release()
+            elif future in waiters:
+                # _grant may already have dropped the cancelled future.
+                waiters.remove(future)
+            raise
+        self.metrics.observe("request_wait_seconds", time.monotonic() - start, priority=priority)
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._grant()
+
+    def _refill(self) -> None:
+        if self.rate is None:
+            return
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _take(self) -> bool:
+        if self._in_flight >= self.concurrency:
+            return False
+        self._refill()
+        if self.rate is not None:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+        self._in_flight += 1
+        return True
+
+    def _next(self) -> Optional[Deque[asyncio.Future]]:
+        interactive, background = self._waiters[INTERACTIVE], self._waiters[BACKGROUND]
+        if background and (not interactive or self._interactive_streak >= self.background_every - 1):
+            self._interactive_streak = 0
+            return background
+        if interactive:
+            if background:
+                self._interactive_streak += 1
+            return interactive
+        return None
+
+    def _grant(self) -> None:
+        while True:
+            for waiters in self._waiters.values():
+                while waiters and waiters[0].done():
+                    waiters.popleft()
+            if not self.waiting():
+                return
+            if not self._take():
+                self._schedule_wakeup()
+                return
+            waiters = self._next()
+            waiters.popleft().set_result(None)
+
+    def _schedule_wakeup(self) -> None:
+        """
+        Grant again once the rate allows the next request, when only the rate holds requests back.
+        """
+        if self.rate is None or self._in_flight >= self.concurrency or self._wakeup is not None:
+            return
+        delay = max(0.0, (1 - self._tokens) / self.rate)
+
+        def wakeup() -> None:
+            self._wakeup = None
+            self._grant()
+
+        self._wakeup = asyncio.get_running_loop().call_later(delay, wakeup)
+
+    def __repr__(self) -> str:
+        return (f"<PriorityLimiter in_flight={self._in_flight}/{self.concurrency} "
+                f"interactive={self.waiting(INTERACTIVE)} background={self.waiting(BACKGROUND)}>")
@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Deque, Tuple
+
+from tystream.exceptions import HTTPException, TransportException
+from tystream.transport import get_header
+
+
+class RetryPolicy:
+    """
+    Decide whether a failed request is retried, how long to wait before the next attempt,
+    and when a hedged duplicate of a slow request is sent.
+
+    Parameters
+    ----------
+    max_attempts: :class:`int`
+        Attempts made for a request, including the first one. 1 disables retries.
+    base_delay: :class:`float`
+        Backoff of the first retry in seconds, doubled for every following attempt.
+    max_delay: :class:`float`
+        Upper bound of a single backoff.
+    total_timeout: :class:`float`
+        Time budget in seconds for all attempts and backoffs of a request.
+    jitter: :class:`bool`
+        Use "full jitter", a random backoff between 0 and the exponential delay.
+    retry_statuses: Tuple[:class:`int`, ...]
+        Status codes considered transient.
+    hedge: :class:`bool`
+        Send a duplicate of a request that takes longer than the hedge delay, the first response wins.
+        Hedging is only used by the async clients.
+    hedge_delay: Optional[:class:`float`]
+        Fixed hedge delay in seconds, defaults to the observed p95 latency of the endpoint.
+    hedge_min_samples: :class:`int`
+        Latency samples of an endpoint needed before the p95 is trusted.
+    hedge_max_error_rate: :class:`float`
+        No hedges are sent while the recent error rate is above this ratio,
+        so hedging never doubles the load during an outage.
+    """
+
+    def __init__(
+            self,
+            max_attempts: int = 3,
+            base_delay: float = 0.25,
+            max_delay: float = 5.0,
+            total_timeout: float = 30.0,
+            jitter: bool = True,
+            retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504),
+            hedge: bool = False,
+            hedge_delay: Optional[float] = None,
+            hedge_min_samples: int = 20,
+            hedge_max_error_rate: float = 0.1,
+            window: int = 200
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.total_timeout = total_timeout
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_max_error_rate = hedge_max_error_rate
+        self.window = window
+
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """
+        Connection errors, timeouts and the transient status codes are retryable,
+        any other error is fatal.
+        """
+        if isinstance(error, TransportException):
+            return True
+        if isinstance(error, HTTPException):
+            return error.status in self.retry_statuses
+        return False
+
+    @staticmethod
+    def retry_after(error: BaseException) -> Optional[float]:
+        """
+        The delay requested by the server through ``Retry-After`` or Twitch's ``Ratelimit-Reset``.
+        """
+        if not isinstance(error, HTTPException):
+            return None
+
+        value = get_header(error.headers, "Retry-After")
+        if value is not None:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    return None
+
+        reset = get_header(error.headers, "Ratelimit-Reset")
+        if error.status == 429 and reset is not None:
+            try:
+                return max(0.0, float(reset) - time.time())
+            except ValueError:
+                return None
+        return None
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        Seconds to wait before the next attempt, ``attempt`` is the number of attempts already made.
+        """
+        requested = self.retry_after(error) if error is not None else None
+        if requested is not None:
+            return requested
+
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def record(self, endpoint: Optional[str], latency: Optional[float], success: bool) -> None:
+        """
+        Record the outcome of an attempt, used to derive the hedge delay.
+        """
+        with self._lock:
+            self._outcomes.append(success)
+            if success and latency is not None:
+                samples = self._latencies.get(endpoint)
+                if samples is None:
+                    samples = self._latencies[endpoint] = deque(maxlen=self.window)
+                samples.append(latency)
+
+    def percentile(self, endpoint: Optional[str], quantile: float = 0.95) -> Optional[float]:
+        samples = self._latencies.get(endpoint)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    def hedge_after(self, endpoint: Optional[str]) -> Optional[float]:
+        """
+        Seconds after which a hedged request is sent, None when no hedge should be sent.
+        """
+        if not self.hedge:
+            return None
+
+        with self._lock:
+            if self._outcomes:
+                error_rate = self._outcomes.count(False) / len(self._outcomes)
+                if error_rate > self.hedge_max_error_rate:
+                    return None
+            if self.hedge_delay is not None:
+                return self.hedge_delay
+            samples = self._latencies.get(endpoint)
+            if samples is None or len(samples) < self.hedge_min_samples:
+                return None
+            return self.percentile(endpoint)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
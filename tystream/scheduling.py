@@ -0,0 +1,351 @@
+import heapq
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple
+
+from tystream.models.status import UnknownStream
+
+HOURS_PER_WEEK = 168
+WEEK = 7 * 24 * 3600
+
+
+def hour_of_week(timestamp: float) -> int:
+    """
+    The hour of the week of a unix timestamp in UTC, 0 is Monday 00:00.
+    """
+    moment = datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.weekday() * 24 + moment.hour
+
+
+class LiveHistogram:
+    """
+    In how many weeks a channel was checked, seen live, and went live in each hour of the week.
+
+    Every hour counts at most once per week, however often the channel is checked in it.
+    Counters are single bytes, about 1 KB per channel including the week markers. When a counter
+    would overflow every counter is halved, which also lets an old schedule fade out.
+    """
+
+    __slots__ = ("weeks", "live", "starts", "_checked_week", "_live_week")
+
+    LIMIT = 0xFF
+
+    def __init__(self) -> None:
+        self.weeks = array("B", bytes(HOURS_PER_WEEK))
+        self.live = array("B", bytes(HOURS_PER_WEEK))
+        self.starts = array("B", bytes(HOURS_PER_WEEK))
+        self._checked_week = array("H", bytes(2 * HOURS_PER_WEEK))
+        self._live_week = array("H", bytes(2 * HOURS_PER_WEEK))
+
+    def _increment(self, counters: array, hour: int) -> None:
+        if counters[hour] == self.LIMIT:
+            for series in (self.weeks, self.live, self.starts):
+                for index, value in enumerate(series):
+                    series[index] = value // 2
+        counters[hour] += 1
+
+    def record(self, timestamp: float, live: bool, started: bool) -> None:
+        """
+        Record a check made at ``timestamp``.
+        """
+        hour = hour_of_week(timestamp)
+        week = int(timestamp // WEEK) % 0xFFFF + 1
+        if self._checked_week[hour] != week:
+            self._checked_week[hour] = week
+            self._increment(self.weeks, hour)
+        if live and self._live_week[hour] != week:
+            self._live_week[hour] = week
+            self._increment(self.live, hour)
+        if started:
+            self._increment(self.starts, hour)
+
+    def activity(self, hour: int) -> float:
+        """
+        Likelihood, between 0 and 1, that the channel is live in ``hour``.
+        Starts count twice, catching a start quickly is what polling is for.
+        """
+        weeks = self.weeks[hour]
+        if not weeks:
+            return 0.0
+        return min(1.0, (self.live[hour] + self.starts[hour]) / weeks)
+
+    def observed_hours(self) -> int:
+        return sum(self.weeks)
+
+
+class ScheduledStarts:
+    """
+    A time-ordered heap of the scheduled starts of upcoming broadcasts.
+
+    A channel with a scheduled start is checked every ``window_interval`` seconds from
+    ``window_before`` seconds before its start until ``window_after`` seconds after it,
+    and only every ``idle_interval`` seconds before that window.
+
+    Parameters
+    ----------
+    window_before: :class:`float`
+        Seconds before the scheduled start at which tight polling begins.
+    window_after: :class:`float`
+        Seconds after the scheduled start at which a broadcast that didn't start is dropped.
+    window_interval: :class:`float`
+        Seconds between checks inside the window.
+    idle_interval: :class:`float`
+        Longest interval between checks of a channel waiting for its window.
+    """
+
+    def __init__(
+            self,
+            window_before: float = 300.0,
+            window_after: float = 1800.0,
+            window_interval: float = 15.0,
+            idle_interval: float = 3600.0
+    ) -> None:
+        self.window_before = window_before
+        self.window_after = window_after
+        self.window_interval = window_interval
+        self.idle_interval = idle_interval
+
+        self._heap: List[Tuple[float, str, str]] = []
+        self._starts: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(starts) for starts in self._starts.values())
+
+    def add(self, channel: str, video_id: str, start: float) -> None:
+        """
+        Add or move the scheduled start, as a unix timestamp, of a broadcast of ``channel``.
+        Adding a start that is already known does nothing.
+        """
+        key = channel.lower()
+        with self._lock:
+            starts = self._starts.setdefault(key, {})
+            if starts.get(video_id) == start:
+                return
+            starts[video_id] = start
+            heapq.heappush(self._heap, (start, key, video_id))
+
+    def discard(self, channel: str, video_id: str) -> None:
+        key = channel.lower()
+        with self._lock:
+            starts = self._starts.get(key)
+            if starts is not None:
+                starts.pop(video_id, None)
+                if not starts:
+                    del self._starts[key]
+
+    def expire(self, at: Optional[float] = None) -> List[Tuple[str, str]]:
+        """
+        Drop the broadcasts whose window has passed, returns their channels and video ids.
+        """
+        limit = (time.time() if at is None else at) - self.window_after
+        expired = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < limit:
+                start, key, video_id = heapq.heappop(self._heap)
+                starts = self._starts.get(key)
+                if starts is not None and starts.get(video_id) == start:
+                    del starts[video_id]
+                    if not starts:
+                        del self._starts[key]
+                    expired.append((key, video_id))
+        return expired
+
+    def next_start(self, channel: str, at: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """
+        The video id and start of the next broadcast of a channel whose window hasn't passed.
+        """
+        now = time.time() if at is None else at
+        starts = self._starts.get(channel.lower())
+        if not starts:
+            return None
+        pending = [(start, video_id) for video_id, start in starts.items() if start + self.window_after >= now]
+        if not pending:
+            return None
+        start, video_id = min(pending)
+        return video_id, start
+
+    def in_window(self, channel: str, at: Optional[float] = None) -> Optional[str]:
+        """
+        The video id of a broadcast of the channel whose window is open, None otherwise.
+        """
+        now = time.time() if at is None else at
+        upcoming = self.next_start(channel, now)
+        if upcoming is None or now < upcoming[1] - self.window_before:
+            return None
+        return upcoming[0]
+
+    def interval(self, channel: str, at: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds until the next check of a channel with a scheduled start, None when it has none.
+        """
+        now = time.time() if at is None else at
+        upcoming = self.next_start(channel, now)
+        if upcoming is None:
+            return None
+        opens = upcoming[1] - self.window_before
+        if now >= opens:
+            return self.window_interval
+        return max(self.window_interval, min(self.idle_interval, opens - now))
+
+
+class AdaptiveScheduler:
+    """
+    Decide when each channel is checked next, from its history of live checks.
+
+    Every ``check_stream_live`` outcome is recorded in a :class:`LiveHistogram` of the channel.
+    Channels are then checked every ``min_interval`` seconds around the hours they usually go live
+    and back off towards ``max_interval`` in hours they never stream.
+
+    Parameters
+    ----------
+    min_interval: :class:`float`
+        Shortest interval between two checks of a channel, also used while it is live.
+    max_interval: :class:`float`
+        Longest interval between two checks, in hours without any activity.
+    warmup: :class:`int`
+        Hours of the week a channel must have been observed in before its history is trusted,
+        until then it is checked every ``min_interval``. The default is one full week.
+    lookahead: :class:`int`
+        Hours after the current one that are taken into account, so polling speeds up before a usual start.
+    scheduled_starts: Optional[:class:`ScheduledStarts`]
+        Scheduled starts of upcoming broadcasts, e.g. ``AsyncYoutube.scheduled_starts``.
+        They take precedence over the history of a channel that has one.
+    """
+
+    def __init__(
+            self,
+            min_interval: float = 60.0,
+            max_interval: float = 1800.0,
+            warmup: int = 168,
+            lookahead: int = 1,
+            scheduled_starts: Optional[ScheduledStarts] = None
+    ) -> None:
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Expected 0 < min_interval <= max_interval.")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.warmup = warmup
+        self.lookahead = lookahead
+        self.scheduled_starts = scheduled_starts
+
+        self._histograms: Dict[str, LiveHistogram] = {}
+        self._live: Dict[str, bool] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._next)
+
+    def __contains__(self, channel: str) -> bool:
+        return channel.lower() in self._next
+
+    def add(self, channel: str, at: Optional[float] = None) -> None:
+        """
+        Schedule a channel, by default for an immediate check.
+        """
+        self._schedule(channel.lower(), time.time() if at is None else at)
+
+    def remove(self, channel: str) -> None:
+        """
+        Stop scheduling a channel and forget its history.
+        """
+        key = channel.lower()
+        with self._lock:
+            self._next.pop(key, None)
+            self._histograms.pop(key, None)
+            self._live.pop(key, None)
+            self._compact()
+
+    def _schedule(self, key: str, at: float) -> None:
+        with self._lock:
+            self._next[key] = at
+            heapq.heappush(self._heap, (at, key))
+            self._compact()
+
+    def _compact(self) -> None:
+        """
+        Drop the heap entries of removed and rescheduled channels once they outnumber the scheduled ones.
+        """
+        if len(self._heap) <= 2 * len(self._next) + 64:
+            return
+        self._heap = [(at, key) for at, key in self._heap if self._next.get(key) == at]
+        heapq.heapify(self._heap)
+
+    def histogram(self, channel: str) -> Optional[LiveHistogram]:
+        return self._histograms.get(channel.lower())
+
+    def record(self, channel: str, result: Any, at: Optional[float] = None) -> float:
+        """
+        Record the result of a check and schedule the next one.
+
+        :class:`UnknownStream` results are not recorded, the channel is retried after ``min_interval``.
+
+        Returns
+        -------
+        :class:`float`
+            Seconds until the next check of the channel.
+        """
+        key = channel.lower()
+        now = time.time() if at is None else at
+        if isinstance(result, UnknownStream):
+            interval = self.min_interval
+        else:
+            live = bool(result)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LiveHistogram()
+            started = live and self._live.get(key) is False
+            histogram.record(now, live, started)
+            self._live[key] = live
+            interval = self.interval(key, now)
+
+        if key in self._next:
+            self._schedule(key, now + interval)
+        return interval
+
+    def interval(self, channel: str, at: Optional[float] = None) -> float:
+        """
+        Seconds between checks of a channel at time ``at``.
+        """
+        key = channel.lower()
+        if self._live.get(key):
+            return self.min_interval
+
+        if self.scheduled_starts is not None:
+            scheduled = self.scheduled_starts.interval(key, at)
+            if scheduled is not None:
+                return scheduled
+
+        histogram = self._histograms.get(key)
+        if histogram is None or histogram.observed_hours() < self.warmup:
+            return self.min_interval
+
+        hour = hour_of_week(time.time() if at is None else at)
+        activity = max(histogram.activity((hour + offset) % HOURS_PER_WEEK) for offset in range(self.lookahead + 1))
+        return self.min_interval * (self.max_interval / self.min_interval) ** (1.0 - activity)
+
+    def due(self, at: Optional[float] = None) -> List[str]:
+        """
+        Pop the channels whose check is due, they are rescheduled by :meth:`record`.
+        """
+        now = time.time() if at is None else at
+        channels = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                scheduled, key = heapq.heappop(self._heap)
+                if self._next.get(key) == scheduled:
+                    channels.append(key)
+        return channels
+
+    def next_due(self) -> Optional[float]:
+        """
+        Unix time of the next due check, None when no channel is scheduled.
+        """
+        with self._lock:
+            while self._heap and self._next.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
@@ -0,0 +1,359 @@
+from abc import ABC, abstractmethod
+import bisect
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Iterable, Iterator, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hashing of channels onto workers.
+
+    Every worker is placed on the ring ``replicas`` times, a channel belongs to the first
+    worker after its hash. Adding or removing one of N workers moves about 1/N of the channels.
+
+    Parameters
+    ----------
+    nodes: Iterable[:class:`str`]
+        The initial workers.
+    replicas: :class:`int`
+        Virtual nodes per worker, more replicas spread the channels more evenly.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64) -> None:
+        self.replicas = replicas
+        self._nodes: Set[str] = set()
+        self._hashes: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> Set[str]:
+        return set(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._nodes
+
+    def add(self, node: str) -> None:
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._hashes, point)
+            self._hashes.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        kept = [(point, owner) for point, owner in zip(self._hashes, self._owners) if owner != node]
+        self._hashes = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def owner(self, key: str) -> Optional[str]:
+        """
+        The worker a channel belongs to, None when the ring is empty.
+        """
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class LeaseBackend(ABC):
+    """
+    Shared storage of worker heartbeats and channel leases.
+
+    A channel lease is held by one worker at a time, so a channel that moves between
+    workers is only polled by its new owner after the previous owner released it or its lease expired.
+    Subclass it to coordinate through another store such as Redis or a database.
+    """
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, ttl: float) -> None:
+        """Mark a worker alive for ``ttl`` seconds."""
+
+    @abstractmethod
+    def members(self) -> List[str]:
+        """The workers with a live heartbeat."""
+
+    @abstractmethod
+    def leave(self, worker_id: str) -> None:
+        """Remove a worker and release all of its leases."""
+
+    @abstractmethod
+    def acquire(self, keys: Iterable[str], worker_id: str, ttl: float) -> Set[str]:
+        """Acquire or renew the leases of ``keys`` for ``ttl`` seconds, returns the keys now held."""
+
+    @abstractmethod
+    def release(self, keys: Iterable[str], worker_id: str) -> None:
+        """Release leases held by the worker."""
+
+
+class MemoryLeaseBackend(LeaseBackend):
+    """
+    A lease backend for workers running in the same process.
+    """
+
+    def __init__(self) -> None:
+        self._workers: Dict[str, float] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def heartbeat(self, worker_id: str, ttl: float) -> None:
+        with self._lock:
+            self._workers[worker_id] = time.time() + ttl
+
+    def members(self) -> List[str]:
+        now = time.time()
+        with self._lock:
+            return sorted(worker for worker, expires_at in self._workers.items() if expires_at > now)
+
+    def leave(self, worker_id: str) -> None:
+        with self._lock:
+            self._workers.pop(worker_id, None)
+            for key in [key for key, (owner, _) in self._leases.items() if owner == worker_id]:
+                del self._leases[key]
+
+    def acquire(self, keys: Iterable[str], worker_id: str, ttl: float) -> Set[str]:
+        now = time.time()
+        held = set()
+        with self._lock:
+            for key in keys:
+                owner, expires_at = self._leases.get(key, (None, 0.0))
+                if owner in (None, worker_id) or expires_at <= now:
+                    self._leases[key] = (worker_id, now + ttl)
+                    held.add(key)
+        return held
+
+    def release(self, keys: Iterable[str], worker_id: str) -> None:
+        with self._lock:
+            for key in keys:
+                if self._leases.get(key, (None, 0.0))[0] == worker_id:
+                    del self._leases[key]
+
+
+class SQLiteLeaseBackend(LeaseBackend):
+    """
+    A lease backend for workers on the same host, sharing a SQLite file.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        Path of the SQLite file.
+    """
+
+    def __init__(self, path: str = "tystream.leases") -> None:
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, expires_at REAL)")
+            connection.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT, expires_at REAL)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def heartbeat(self, worker_id: str, ttl: float) -> None:
+        with self._connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO workers (worker_id, expires_at) VALUES (?, ?)",
+                               (worker_id, time.time() + ttl))
+
+    def members(self) -> List[str]:
+        with self._connect() as connection:
+            rows = connection.execute("SELECT worker_id FROM workers WHERE expires_at > ? ORDER BY worker_id",
+                                      (time.time(),)).fetchall()
+        return [row[0] for row in rows]
+
+    def leave(self, worker_id: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+            connection.execute("DELETE FROM leases WHERE owner = ?", (worker_id,))
+
+    def acquire(self, keys: Iterable[str], worker_id: str, ttl: float) -> Set[str]:
+        now = time.time()
+        keys = list(keys)
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                [(key, worker_id, now + ttl, now) for key in keys]
+            )
+            rows = connection.execute("SELECT key FROM leases WHERE owner = ?", (worker_id,)).fetchall()
+        wanted = set(keys)
+        return {row[0] for row in rows if row[0] in wanted}
+
+    def release(self, keys: Iterable[str], worker_id: str) -> None:
+        with self._connect() as connection:
+            connection.executemany("DELETE FROM leases WHERE key = ? AND owner = ?",
+                                   [(key, worker_id) for key in keys])
+
+
+class ShardCoordinator:
+    """
+    Split a watchlist across workers and tell this worker which channels to poll.
+
+    Each worker heartbeats into a shared :class:`LeaseBackend` and builds a :class:`HashRing`
+    of the live workers. A worker only polls a channel that the ring assigns to it *and*
+    whose lease it holds, and releases the leases of channels that moved away, so during a
+    rebalance a channel is never polled, and notified, by two workers at once.
+
+    Parameters
+    ----------
+    worker_id: :class:`str`
+        A unique, stable id of this worker.
+    backend: :class:`LeaseBackend`
+        Where heartbeats and leases are shared.
+    lease_ttl: :class:`float`
+        Seconds a heartbeat or channel lease stays valid without renewal.
+    heartbeat_interval: :class:`float`
+        Seconds between two refreshes once :meth:`start` was called, well below ``lease_ttl``.
+    replicas: :class:`int`
+        Virtual nodes per worker on the hash ring.
+    """
+
+    def __init__(
+            self,
+            worker_id: str,
+            backend: LeaseBackend,
+            lease_ttl: float = 15.0,
+            heartbeat_interval: float = 5.0,
+            replicas: int = 64
+    ) -> None:
+        self.worker_id = worker_id
+        self.backend = backend
+        self.lease_ttl = lease_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.ring = HashRing(replicas=replicas)
+
+        self._channels: Set[str] = set()
+        self._owned: Set[str] = set()
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _key(channel: str) -> str:
+        return channel.lower()
+
+    def set_watchlist(self, channels: Iterable[str]) -> None:
+        """
+        Replace the channels split across the workers, the same list on every worker.
+        """
+        with self._lock:
+            self._channels = {self._key(channel) for channel in channels}
+
+    def refresh(self) -> Set[str]:
+        """
+        Heartbeat, rebuild the ring from the live workers and renew the leases of the owned channels.
+
+        Returns
+        -------
+        Set[:class:`str`]
+            The channels this worker polls until the next refresh.
+        """
+        self.backend.heartbeat(self.worker_id, self.lease_ttl)
+        members = set(self.backend.members()) | {self.worker_id}
+        for node in self.ring.nodes - members:
+            self.ring.remove(node)
+        for node in members - self.ring.nodes:
+            self.ring.add(node)
+
+        with self._lock:
+            channels = set(self._channels)
+        assigned = {channel for channel in channels if self.ring.owner(channel) == self.worker_id}
+
+        moved = self._owned - assigned
+        if moved:
+            self.backend.release(moved, self.worker_id)
+            logger.info("Worker %s handed off %d channels.", self.worker_id, len(moved))
+
+        owned = self.backend.acquire(assigned, self.worker_id, self.lease_ttl) if assigned else set()
+        if len(owned) < len(assigned):
+            logger.debug("Worker %s waits for %d leases.", self.worker_id, len(assigned) - len(owned))
+        self._owned = owned
+        self._refreshed_at = time.monotonic()
+        return set(owned)
+
+    @property
+    def owned(self) -> Set[str]:
+        """
+        The channels this worker polls, as of the last :meth:`refresh`.
+        Empty once the leases may have expired, so a worker that can't reach the backend stops polling.
+        """
+        if time.monotonic() - self._refreshed_at >= self.lease_ttl:
+            return set()
+        return set(self._owned)
+
+    def owns(self, channel: str) -> bool:
+        return self._key(channel) in self.owned
+
+    def shard(self, channels: Iterable[str]) -> List[str]:
+        """
+        The channels of ``channels`` that this worker polls.
+        """
+        owned = self.owned
+        return [channel for channel in channels if self._key(channel) in owned]
+
+    def start(self) -> None:
+        """
+        Refresh every :attr:`heartbeat_interval` seconds from a background thread.
+        """
+        if self._thread is not None:
+            return
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"tystream-shard-{self.worker_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop refreshing and leave the ring, releasing every lease so other workers take over at once.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.backend.leave(self.worker_id)
+        self._owned = set()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("Shard refresh of worker %s failed: %s", self.worker_id, e)
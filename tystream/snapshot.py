@@ -0,0 +1,238 @@
+import asyncio
+import concurrent.futures
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Iterator
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def _encode_default(value: Any) -> Any:
+    model_dump = getattr(value, "model_dump", None)
+    if model_dump is not None:
+        return model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class SnapshotStore:
+    """
+    Keep named snapshots in a SQLite file, each one a zlib compressed JSON document.
+
+    A snapshot is replaced in a single transaction, so a crash while saving leaves the previous one intact.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        Path of the SQLite file.
+    """
+
+    def __init__(self, path: str = "tystream.snapshot") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "name TEXT PRIMARY KEY, version INTEGER NOT NULL, saved_at REAL NOT NULL, data BLOB NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def save(self, name: str, state: Dict[str, Any]) -> int:
+        """
+        Replace the snapshot ``name``, returns its compressed size in bytes.
+        """
+        data = zlib.compress(json.dumps(state, separators=(",", ":"), default=_encode_default).encode("utf-8"))
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO snapshots (name, version, saved_at, data) VALUES (?, ?, ?, ?)",
+                (name, SNAPSHOT_VERSION, time.time(), data)
+            )
+        return len(data)
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        The snapshot ``name``, None when there is none or it was written by an incompatible version.
+        """
+        with self._lock, self._connect() as connection:
+            row = connection.execute("SELECT version, data FROM snapshots WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        if row[0] != SNAPSHOT_VERSION:
+            logger.warning("Ignoring snapshot %s with version %s.", name, row[0])
+            return None
+        return json.loads(zlib.decompress(row[1]))
+
+    def saved_at(self, name: str) -> Optional[float]:
+        with self._lock, self._connect() as connection:
+            row = connection.execute("SELECT saved_at FROM snapshots WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def delete(self, name: str) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM snapshots WHERE name = ?", (name,))
+
+
+class Snapshotter:
+    """
+    Periodically persist the caches of platform clients and the state of a
+    :class:`~tystream.changes.ChangeDetector`, and restore them on startup.
+
+    After a restart the clients answer from the restored caches and the detector
+    knows which streams were already live, so a deploy neither re-polls every channel
+    at once nor repeats "went live" notifications.
+
+    Parameters
+    ----------
+    store: :class:`SnapshotStore` | :class:`str`
+        The store, or the path of one.
+    clients: Dict[:class:`str`, :class:`BaseStreamPlatform`]
+        The clients to snapshot, by a name that stays the same between restarts.
+    detector: Optional[:class:`ChangeDetector`]
+        A change detector to snapshot along with the clients.
+    interval: :class:`float`
+        Seconds between two snapshots once :meth:`start` was called.
+    name: :class:`str`
+        Name of the snapshot in the store, use one per process sharing a store.
+    loop: Optional[:class:`asyncio.AbstractEventLoop`]
+        The event loop the async clients and the detector are used on, their state is copied on it
+        so the background thread never reads a cache while it is written. Defaults to the running
+        loop when :meth:`start` is called from one.
+    """
+
+    def __init__(
+            self,
+            store,
+            clients: Optional[Dict[str, Any]] = None,
+            detector=None,
+            interval: float = 60.0,
+            name: str = "default",
+            loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> None:
+        self.store = SnapshotStore(store) if isinstance(store, (str, os.PathLike)) else store
+        self.clients = clients or {}
+        self.detector = detector
+        self.interval = interval
+        self.name = name
+        self.loop = loop
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self.restore()
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        The current state of the clients and the detector, copied on :attr:`loop` while it runs.
+        """
+        loop = self.loop
+        if loop is None or not loop.is_running() or _running_loop() is loop:
+            return self._collect()
+
+        future = asyncio.run_coroutine_threadsafe(self._collect_on_loop(), loop)
+        while True:
+            try:
+                return future.result(timeout=0.1)
+            except concurrent.futures.TimeoutError:
+                # stop() may be blocking the loop while it waits for this thread.
+                if self._stop.is_set() and threading.current_thread() is self._thread:
+                    future.cancel()
+                    raise concurrent.futures.CancelledError() from None
+
+    async def _collect_on_loop(self) -> Dict[str, Any]:
+        return self._collect()
+
+    def _collect(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {"clients": {name: client.snapshot() for name, client in self.clients.items()}}
+        if self.detector is not None:
+            state["detector"] = [[platform, channel, *values]
+                                 for (platform, channel), values in self.detector.snapshot().items()]
+        return state
+
+    def save(self) -> int:
+        """
+        Save a snapshot now, returns its size in bytes.
+        """
+        start = time.perf_counter()
+        size = self.store.save(self.name, self.collect())
+        logger.debug("Saved snapshot %s (%d bytes) in %.3fs.", self.name, size, time.perf_counter() - start)
+        return size
+
+    def restore(self) -> bool:
+        """
+        Restore the last snapshot, returns False when there is none.
+        """
+        state = self.store.load(self.name)
+        if state is None:
+            return False
+
+        for name, client_state in state.get("clients", {}).items():
+            client = self.clients.get(name)
+            if client is not None:
+                client.restore(client_state)
+
+        rows: List[List[Any]] = state.get("detector") or []
+        if self.detector is not None and rows:
+            self.detector.restore({(row[0], row[1]): row[2:] for row in rows})
+
+        logger.info("Restored snapshot %s.", self.name)
+        return True
+
+    def start(self) -> None:
+        """
+        Save a snapshot every :attr:`interval` seconds from a background thread.
+        """
+        if self._thread is not None:
+            return
+        if self.loop is None:
+            self.loop = _running_loop()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tystream-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self, save: bool = True) -> None:
+        """
+        Stop the background thread and, by default, save a last snapshot.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if save:
+            self.save()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.save()
+            except concurrent.futures.CancelledError:
+                return
+            except Exception as e:
+                logger.error("Saving snapshot %s failed: %s", self.name, e)
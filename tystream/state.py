@@ -0,0 +1,117 @@
+import sys
+from collections.abc import MutableMapping
+from typing import Optional, Dict, Any, Iterator, Tuple, Union
+
+
+class ChannelCache(MutableMapping):
+    """
+    A per-channel cache that stores its entries in compact rows.
+
+    Most of a large watchlist is offline at any moment, and an offline entry only needs
+    its timestamp: it is stored as a bare float under the interned channel key, instead of
+    a dict holding the raw response and related models. An entry is offline when its
+    ``payload_key`` is falsy.
+
+    With ``fields``, a payload with exactly those fields is stored as a tuple of values instead
+    of a dict, values equal to the channel key share the key string and the ``numeric`` fields
+    are stored as ints. Any other entry is kept as it is.
+
+    Reading an entry rebuilds the dict it was stored from, so the cache is a drop-in
+    replacement of a plain cache dict.
+
+    Parameters
+    ----------
+    payload_key: :class:`str`
+        The entry field that holds the payload, falsy for an offline channel.
+    empty: Any
+        The value of ``payload_key`` in an offline entry.
+    fields: Tuple[:class:`str`, ...]
+        The fields of a payload stored as a tuple.
+    numeric: Tuple[:class:`str`, ...]
+        Fields among ``fields`` holding numeric strings, such as ids.
+    """
+
+    __slots__ = ("payload_key", "empty", "fields", "numeric", "_entries")
+
+    def __init__(
+            self,
+            payload_key: str = "data",
+            empty: Any = None,
+            fields: Tuple[str, ...] = (),
+            numeric: Tuple[str, ...] = ()
+    ) -> None:
+        self.payload_key = payload_key
+        self.empty = empty
+        self.fields = fields
+        self.numeric = frozenset(numeric)
+        self._entries: Dict[str, Union[float, Tuple, Dict[str, Any]]] = {}
+
+    def _pack(self, key: str, entry: Dict[str, Any]) -> Union[Tuple, Dict[str, Any]]:
+        payload = entry[self.payload_key]
+        if (not self.fields or len(entry) != 2 or not isinstance(payload, dict)
+                or len(payload) != len(self.fields) or not all(field in payload for field in self.fields)):
+            return entry
+
+        values = [entry["timestamp"]]
+        for field in self.fields:
+            value = payload[field]
+            if isinstance(value, str):
+                if value == key:
+                    value = key
+                elif field in self.numeric and value.isascii() and value.isdigit() and str(int(value)) == value:
+                    value = int(value)
+            values.append(value)
+        return tuple(values)
+
+    def _unpack(self, row: Tuple) -> Dict[str, Any]:
+        payload = {}
+        for field, value in zip(self.fields, row[1:]):
+            if field in self.numeric and isinstance(value, int):
+                value = str(value)
+            payload[field] = value
+        return {self.payload_key: payload, "timestamp": row[0]}
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        entry = self._entries[key]
+        if isinstance(entry, float):
+            return {self.payload_key: self.empty, "timestamp": entry}
+        if isinstance(entry, tuple):
+            return self._unpack(entry)
+        return entry
+
+    def __setitem__(self, key: str, entry: Dict[str, Any]) -> None:
+        key = sys.intern(key)
+        if entry.get(self.payload_key):
+            self._entries[key] = self._pack(key, entry)
+        else:
+            self._entries[key] = float(entry["timestamp"])
+
+    def __delitem__(self, key: str) -> None:
+        del self._entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def get(self, key: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        if key not in self._entries:
+            return default
+        return self[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def live(self) -> int:
+        """
+        The number of entries holding a payload.
+        """
+        return sum(1 for entry in self._entries.values() if not isinstance(entry, float))
+
+    def __repr__(self) -> str:
+        return f"<ChannelCache entries={len(self)} live={self.live}>"
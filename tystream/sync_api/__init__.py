@@ -1,2 +1,20 @@
-from .twitch import *
-from .youtube import *
\ No newline at end of file
+from tystream._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "SyncTwitch": "tystream.sync_api.twitch",
+        "SyncYoutube": "tystream.sync_api.youtube",
+        "YDL_OPTS": "tystream.sync_api.youtube",
+        "BaseStreamPlatform": "tystream.sync_api.base",
+        "ThreadedTransport": "tystream.sync_api.base",
+        "EventLoopThread": "tystream.sync_api.loop",
+        "TwitchOauth": "tystream.sync_api.oauth",
+        "YoutubeOauth": "tystream.sync_api.oauth",
+        "SyncTransport": "tystream.sync_api.transport",
+        "RequestsTransport": "tystream.sync_api.transport",
+        "SyncReplayTransport": "tystream.sync_api.transport",
+        "SyncRecordingTransport": "tystream.sync_api.transport",
+    },
+    submodules=("base", "loop", "oauth", "transport", "twitch", "youtube"),
+)
@@ -1,80 +1,148 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
-import logging
-import time
-import requests
-from tystream.logger import setup_logging
+import asyncio
+from typing import Optional, Dict, Any, Callable, Iterator, Iterable
 
+from tystream.async_api.base import BaseStreamPlatform as AsyncStreamPlatform
+from tystream.async_api.transport import AsyncTransport
+from tystream.models.status import CheckResults
+from tystream.priority import current_priority, request_priority
+from tystream.transport import TransportResponse
+from tystream.sync_api.loop import EventLoopThread
+from tystream.sync_api.transport import SyncTransport
 
-class BaseStreamPlatform(ABC):
-    """
-    Base class for streaming platform API clients.
+
+async def _with_priority(coro, priority: str):
+    with request_priority(priority):
+        return await coro
+
+
+class ThreadedTransport(AsyncTransport):
     """
+    Run a :class:`SyncTransport` in worker threads, so it can serve an async client.
 
-    def __init__(self, cache_ttl: int = 300) -> None:
-        setup_logging()
-        self.logger = logging.getLogger(__name__)
-        self.cache_ttl = cache_ttl
+    Parameters
+    ----------
+    transport: :class:`SyncTransport`
+        The transport doing the requests.
+    """
 
-        self._user_cache: Dict[str, Dict[str, Any]] = {}
-        self._stream_cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, transport: SyncTransport) -> None:
+        self.transport = transport
 
-    def _make_request(
+    async def request(
             self,
+            method: str,
             url: str,
             headers: Optional[Dict[str, str]] = None,
             params: Optional[Dict[str, Any]] = None,
-            timeout: int = 10
-    ) -> Dict:
+            data: Optional[Dict[str, Any]] = None,
+            timeout: float = 10
+    ) -> TransportResponse:
+        return await asyncio.to_thread(
+            self.transport.request, method, url, headers=headers, params=params, data=data, timeout=timeout
+        )
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self.transport.close)
+
+
+class BaseStreamPlatform(ABC):
+    """
+    Base class for the sync streaming platform API clients.
+
+    A sync client is a blocking facade over the async client of the same platform,
+    whose coroutines run on an :class:`EventLoopThread`. Both share a single implementation,
+    and sync callers get its pooled connections and concurrent fan-out.
+    Attributes that aren't defined here, such as ``metrics`` or ``cache_ttl``, are read from :attr:`client`.
+
+    Parameters
+    ----------
+    client: :class:`tystream.async_api.base.BaseStreamPlatform`
+        The async client doing the work.
+    loop: Optional[:class:`EventLoopThread`]
+        The loop running the client, defaults to one shared by every sync client.
+    """
+
+    def __init__(self, client: AsyncStreamPlatform, loop: Optional[EventLoopThread] = None) -> None:
+        self.client = client
+        self.loop = loop or EventLoopThread.shared()
+
+    @staticmethod
+    def _async_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Centralized request handling with error handling.
+        The keyword arguments of the async client, with a :class:`SyncTransport` run in threads.
         """
-        try:
-            response = requests.get(
-                url,
-                headers=headers,
-                params=params,
-                timeout=timeout
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            self.logger.error(f"Request failed: {str(e)}")
-            raise
+        transport = kwargs.get("transport")
+        if isinstance(transport, SyncTransport):
+            return {**kwargs, "transport": ThreadedTransport(transport)}
+        return kwargs
 
-    def _get_cache(self, cache_dict: Dict, key: str) -> Optional[Dict]:
+    def __getattr__(self, name: str) -> Any:
+        if name in ("client", "loop"):
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def _run(self, coro):
+        # The loop thread has its own context, carry the priority of the calling thread over.
+        return self.loop.run(_with_priority(coro, current_priority()))
+
+    def _iterate(self, iterator) -> Iterator:
+        return self.loop.iterate(iterator)
+
+    def _call(self, function: Callable, *args) -> Any:
         """
-        Generic cache getter with TTL check.
+        Call a plain method of the client on the loop thread, so it never races with a running request.
         """
-        cache_data = cache_dict.get(key)
-        if cache_data and time.time() - cache_data["timestamp"] < self.cache_ttl:
-            return cache_data
-        return None
+        async def call():
+            return function(*args)
+        return self._run(call())
 
-    @staticmethod
-    def _set_cache(cache_dict: Dict, key: str, data: Dict) -> None:
+    def snapshot(self) -> Dict[str, Any]:
         """
-        Generic cache setter.
+        The fresh cache entries of the client as plain data, restored with :meth:`restore`.
         """
-        cache_dict[key] = {
-            **data,
-            "timestamp": time.time()
-        }
+        return self._call(self.client.snapshot)
+
+    def restore(self, state: Dict[str, Any]) -> int:
+        """
+        Load the cache entries of a :meth:`snapshot` that are still fresh, returns their number.
+        """
+        return self._call(self.client.restore, state)
 
     def clear_cache(self, key: Optional[str] = None) -> None:
         """
         Clear specific or all cache entries.
         """
-        if key:
-            self._user_cache.pop(key.lower(), None)
-            self._stream_cache.pop(key.lower(), None)
-        else:
-            self._user_cache.clear()
-            self._stream_cache.clear()
+        self._run(self.client.clear_cache(key))
+
+    def close(self) -> None:
+        """
+        Close the underlying transport.
+        """
+        self._run(self.client.close())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def check_streams_live(
+            self,
+            usernames: Iterable[str],
+            deadline: Optional[float] = None,
+            concurrency: int = 50,
+            priority: Optional[str] = None,
+            **kwargs
+    ) -> CheckResults:
+        """
+        Check many channels concurrently within a deadline, see :meth:`AsyncTwitch.check_streams_live`.
+        """
+        return self._run(self.client.check_streams_live(list(usernames), deadline, concurrency, priority, **kwargs))
 
     @abstractmethod
     def check_stream_live(self, username: str):
         """
         Check if a stream is live. Must be implemented by subclasses.
         """
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from typing import Optional, Any, AsyncIterator, Coroutine, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class EventLoopThread:
+    """
+    An asyncio event loop running forever in a daemon thread.
+
+    The sync clients submit the coroutines of their async client to it and block on
+    the result, so every sync client sharing a loop also shares its connections.
+
+    Parameters
+    ----------
+    name: :class:`str`
+        Name of the thread.
+    """
+
+    _shared: Optional["EventLoopThread"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, name: str = "tystream-loop") -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls) -> "EventLoopThread":
+        """
+        The loop thread used by sync clients that aren't given one, started on first use.
+        """
+        with cls._shared_lock:
+            if cls._shared is None or not cls._shared.running:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive() and not self.loop.is_closed()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the loop and wait for its result.
+
+        Raises
+        ------
+        :class:`RuntimeError`
+            When called from the loop thread itself, which would deadlock.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("A sync client can't be called from its own event loop, use the async client.")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    @staticmethod
+    async def _next(iterator: AsyncIterator[T]) -> T:
+        return await iterator.__anext__()
+
+    def iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Drive an async iterator from the calling thread, one item at a time.
+        """
+        try:
+            while True:
+                try:
+                    yield self.run(self._next(iterator))
+                except StopAsyncIteration:
+                    return
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                self.run(aclose())
+
+    def stop(self) -> None:
+        """
+        Stop the loop and wait for its thread to exit.
+        """
+        if not self.running:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
@@ -1,26 +1,27 @@
 import time
-import requests
+from typing import Optional
 
 from tystream.cache_handler import CacheFileHandler
 from tystream.exceptions import OauthException
+from tystream.sync_api.transport import SyncTransport, RequestsTransport
 
 
 class TwitchOauth:
-    def __init__(self, client_id: str, client_secret: str) -> None:
+    def __init__(self, client_id: str, client_secret: str, transport: Optional[SyncTransport] = None) -> None:
         self.client_id = client_id
         self.client_secret = client_secret
         self.cache_handler = CacheFileHandler()
+        self.transport = transport or RequestsTransport()
 
     @staticmethod
     def is_token_expired(token_info) -> bool:
         now = int(time.time())
-        return now - token_info["expires_in"] < 60
+        return token_info.get("expires_at", 0) - now < 60
 
-    @staticmethod
-    def validate_token(access_token: str) -> bool:
+    def validate_token(self, access_token: str) -> bool:
         headers = {"Authorization": f"OAuth {access_token}"}
-        response = requests.get("https://id.twitch.tv/oauth2/validate", headers=headers, timeout=10)
-        return response.status_code == 200
+        response = self.transport.request("GET", "https://id.twitch.tv/oauth2/validate", headers=headers, timeout=10)
+        return response.status == 200
 
     def fetch_new_token(self) -> dict:
         data = {
@@ -28,11 +29,11 @@ class TwitchOauth:
             "client_secret": self.client_secret,
             "grant_type": "client_credentials",
         }
-        response = requests.post("https://id.twitch.tv/oauth2/token", data=data, timeout=10)
+        response = self.transport.request("POST", "https://id.twitch.tv/oauth2/token", data=data, timeout=10)
         if response.ok:
             return response.json()
         else:
-            raise OauthException("Twitch Get Access Token Failed. Detail: " + response.json())
+            raise OauthException("Twitch Get Access Token Failed. Detail: " + response.body.decode("utf-8", errors="replace"))
 
     def get_access_token(self) -> str:
         token_info = self.cache_handler.get_cached_token()
@@ -42,16 +43,20 @@ class TwitchOauth:
                 return token_info["access_token"]
 
         new_token_info = self.fetch_new_token()
+        new_token_info["expires_at"] = int(time.time()) + new_token_info["expires_in"]
         self.cache_handler.save_token_to_cache(new_token_info)
         return new_token_info["access_token"]
 
 class YoutubeOauth:
-    def __init__(self, api_key: str) -> None:
+    def __init__(self, api_key: str, transport: Optional[SyncTransport] = None) -> None:
         self.api_key = api_key
+        self.transport = transport or RequestsTransport()
 
     def validation_token(self) -> bool:
-        response = requests.get(
-            f"https://www.googleapis.com/youtube/v3/search?part=snippet&q=YouTube+Data+API&type=video&key={self.api_key}",
+        response = self.transport.request(
+            "GET",
+            "https://www.googleapis.com/youtube/v3/search",
+            params={"part": "snippet", "q": "YouTube Data API", "type": "video", "key": self.api_key},
             timeout=10
         )
         if response.ok:
@@ -60,5 +65,5 @@ class YoutubeOauth:
             raise OauthException(
                 "YouTube API Validation Failed. Please check YouTube Data API is enabled in the Google Developer Console.\n"
                 "Or check if your API key is entered correctly.\n"
-                f"Detail: {response.json()}"
-            )
\ No newline at end of file
+                f"Detail: {response.body.decode('utf-8', errors='replace')}"
+            )
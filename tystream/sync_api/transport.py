@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any
+import requests
+
+from tystream.exceptions import TransportException
+from tystream.transport import TransportResponse, Cassette
+
+
+class SyncTransport(ABC):
+    """
+    Base class for the HTTP transports used by the sync clients.
+
+    Every platform and oauth request goes through :meth:`request`,
+    custom transports only need to implement it.
+    """
+
+    @abstractmethod
+    def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            data: Optional[Dict[str, Any]] = None,
+            timeout: float = 10
+    ) -> TransportResponse:
+        """
+        Send a request and return the response.
+
+        Raises
+        ------
+        :class:`TransportException`
+            If the request could not be completed.
+        """
+
+    def close(self) -> None:
+        """
+        Release the resources held by the transport.
+        """
+
+
+class RequestsTransport(SyncTransport):
+    """
+    The default transport, backed by a :class:`requests.Session`.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None) -> None:
+        self.session = session or requests.Session()
+
+    def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            data: Optional[Dict[str, Any]] = None,
+            timeout: float = 10
+    ) -> TransportResponse:
+        try:
+            response = self.session.request(
+                method,
+                url,
+                headers=headers,
+                params=params,
+                data=data,
+                timeout=timeout
+            )
+        except requests.RequestException as e:
+            raise TransportException(str(e)) from e
+
+        return TransportResponse(
+            status=response.status_code,
+            headers=dict(response.headers),
+            body=response.content,
+            url=response.url
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class SyncReplayTransport(SyncTransport):
+    """
+    Serve recorded responses from a :class:`Cassette` without touching the network.
+
+    Parameters
+    ----------
+    cassette: :class:`Cassette` | :class:`str`
+        The cassette, or the path of a cassette file, to replay.
+    """
+
+    def __init__(self, cassette) -> None:
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+
+    def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            data: Optional[Dict[str, Any]] = None,
+            timeout: float = 10
+    ) -> TransportResponse:
+        key = self.cassette.key(method, url, params)
+        response = self.cassette.get(key)
+        if response is None:
+            raise TransportException(f"No recorded response for {key}")
+        return response
+
+
+class SyncRecordingTransport(SyncTransport):
+    """
+    Forward requests to another transport and record every response into a :class:`Cassette`.
+
+    Parameters
+    ----------
+    cassette: :class:`Cassette` | :class:`str`
+        The cassette, or the path of a cassette file, to record into.
+    transport: Optional[:class:`SyncTransport`]
+        The transport doing the real requests, defaults to :class:`RequestsTransport`.
+    """
+
+    def __init__(self, cassette, transport: Optional[SyncTransport] = None) -> None:
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.transport = transport or RequestsTransport()
+
+    def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            data: Optional[Dict[str, Any]] = None,
+            timeout: float = 10
+    ) -> TransportResponse:
+        response = self.transport.request(method, url, headers=headers, params=params, data=data, timeout=timeout)
+        self.cassette.record(method, url, params, response)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+        if self.cassette.path:
+            self.cassette.save()
@@ -1,137 +1,49 @@
-import requests
-import yt_dlp
-from typing import Dict, Any, Union, Optional
+from typing import Union, Optional, List, Iterable
 
+from tystream.async_api.youtube import AsyncYoutube, YDL_OPTS
 from tystream.sync_api.base import BaseStreamPlatform
-from tystream.models import LiveStreamingDetails
-from tystream.exceptions import NoResultException
-from tystream.sync_api.oauth import YoutubeOauth
-from tystream.models.youtube import YoutubeStreamDataAPI, YoutubeStreamDataYTDLP
-
-YDL_OPTS = {
-    "quiet": True,
-    "no_warnings": True,
-    "extract_flat": True,
-    "force_generic_extractor": True,
-    "noplaylist": True,
-    "geo_bypass": True,
-    "default_search": "ytsearch",
-    "skip_download": True,
-    "ignoreerrors": True,
-}
+from tystream.sync_api.loop import EventLoopThread
+from tystream.models.youtube import YoutubeStreamDataAPI, YoutubeStreamDataYTDLP, YoutubeUpcomingBroadcast
+from tystream.models.status import UnknownStream
+from tystream.scheduling import ScheduledStarts
 
 
 class SyncYoutube(BaseStreamPlatform):
-    BASE_URL = "https://www.googleapis.com/youtube/v3"
-
-    def __init__(self, api_key: Optional[str] = None, cache_ttl: int = 300) -> None:
-        super().__init__(cache_ttl)
-        self.oauth = YoutubeOauth(api_key)
-        self._channel_cache: Dict[str, Dict[str, Any]] = {}
-
-    def _get_channel_id(self, username: str) -> str:
-        """
-        Get the ID of a YouTube channel by its username with caching.
-        """
-        cache_key = username.lower()
-        cache_data = self._get_cache(self._channel_cache, cache_key)
-        if cache_data:
-            return cache_data["id"]
-
-        response = requests.get(
-            f"{self.BASE_URL}/channels",
-            params={
-                "part": "snippet",
-                "forHandle": username,
-                "key": self.oauth.api_key
-            },
-            timeout=10
+    """
+    Blocking YouTube client, running an :class:`~tystream.async_api.youtube.AsyncYoutube` on an :class:`EventLoopThread`.
+
+    Takes the parameters of :class:`~tystream.async_api.youtube.AsyncYoutube`, ``transport`` may
+    also be a :class:`SyncTransport`.
+    """
+
+    BASE_URL = AsyncYoutube.BASE_URL
+    API_HOST = AsyncYoutube.API_HOST
+
+    client: AsyncYoutube
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache_ttl: int = 300,
+        ytdlp_fallback: bool = True,
+        scheduled_starts: Optional[ScheduledStarts] = None,
+        loop: Optional[EventLoopThread] = None,
+        **kwargs
+    ) -> None:
+        super().__init__(
+            AsyncYoutube(api_key, cache_ttl, ytdlp_fallback, scheduled_starts, **self._async_kwargs(kwargs)),
+            loop
         )
-        response.raise_for_status()
-        result = response.json()
-
-        if not result.get("items"):
-            raise NoResultException("No Channel Found.")
-
-        channel_id = result["items"][0]["id"]
-        self._set_cache(self._channel_cache, cache_key, {"id": channel_id})
-        return channel_id
 
-    def _get_live_id(self, channelid: str) -> str:
+    def check_stream_live(self, username: str, use_yt_dlp: bool = False) -> Union[
+        YoutubeStreamDataAPI, YoutubeStreamDataYTDLP, UnknownStream, bool]:
         """
-        Get the ID of the live stream for a YouTube channel with caching.
+        Check if a YouTube stream is live, see :meth:`AsyncYoutube.check_stream_live`.
         """
-        cache_data = self._get_cache(self._stream_cache, channelid)
-        if cache_data:
-            return cache_data["live_id"]
-
-        response = requests.get(
-            f"{self.BASE_URL}/search",
-            params={
-                "part": "snippet",
-                "channelId": channelid,
-                "eventType": "live",
-                "type": "video",
-                "key": self.oauth.api_key
-            },
-            timeout=10
-        )
-        response.raise_for_status()
-        result = response.json()
-
-        live_id = result["items"][0]["id"]["videoId"] if result.get("items") else False
-        self._set_cache(self._stream_cache, channelid, {"live_id": live_id})
-        return live_id
+        return self._run(self.client.check_stream_live(username, use_yt_dlp))
 
-    def check_stream_live(self, username: str, use_yt_dlp: bool = False) -> Union[
-        YoutubeStreamDataAPI, YoutubeStreamDataYTDLP, bool]:
+    def discover_upcoming(self, usernames: Iterable[str], per_channel: int = 5) -> List[YoutubeUpcomingBroadcast]:
         """
-        Check if a YouTube stream is live, either using the YouTube API or yt_dlp.
+        Find the upcoming broadcasts of channels, see :meth:`AsyncYoutube.discover_upcoming`.
         """
-        if use_yt_dlp:
-            try:
-                with yt_dlp.YoutubeDL(YDL_OPTS) as ydl:
-                    info = ydl.extract_info(f"https://www.youtube.com/@{username}/live", download=False)
-            except Exception as e:
-                self.logger.error(f"Error using yt_dlp: {e}")
-                return False
-
-            if not info:
-                self.logger.log("%s is not live (yt_dlp).", username)
-                return False
-
-            return YoutubeStreamDataYTDLP(**info)
-        else:
-            self.oauth.validation_token()
-
-            try:
-                channel_id = self._get_channel_id(username)
-                live_id = self._get_live_id(channel_id)
-
-                if not live_id:
-                    self.logger.log("%s is not live (API).", username)
-                    return False
-
-                response = requests.get(
-                    f"{self.BASE_URL}/videos",
-                    params={
-                        "part": "id,snippet,liveStreamingDetails",
-                        "id": live_id,
-                        "key": self.oauth.api_key
-                    },
-                    timeout=10
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                item = result["items"][0]
-                snippet = item["snippet"]
-                live_detail = item["liveStreamingDetails"]
-                data = {k: snippet[k] for k in
-                        ["title", "description", "publishedAt", "channelTitle", "categoryId", "tags"]}
-
-                self.logger.log("%s is live (API).", username)
-                return YoutubeStreamDataAPI(id=live_id, LiveDetails=LiveStreamingDetails(**live_detail), **data)
-            except Exception as e:
-                self.logger.error(f"Error using YouTube API: {e}")
-                return False
+        return self._run(self.client.discover_upcoming(list(usernames), per_channel))
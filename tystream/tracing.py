@@ -0,0 +1,227 @@
+import functools
+import inspect
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Iterator
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("tystream_current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation, with the span it was started in as its parent.
+
+    Attributes
+    ----------
+    name: :class:`str`
+        The name of the operation, e.g. ``http.request``.
+    trace_id: :class:`str`
+        The id shared by every span of the same trace.
+    span_id: :class:`str`
+        The id of this span.
+    parent: Optional[:class:`Span`]
+        The parent span, None for a root span.
+    attributes: Dict[:class:`str`, Any]
+        Attributes such as the endpoint, status code, bytes or cache outcome.
+    start_time: :class:`float`
+        Start time as a unix timestamp.
+    end_time: Optional[:class:`float`]
+        End time as a unix timestamp, None while the span is running.
+    error: Optional[:class:`BaseException`]
+        The exception that ended the span, if any.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent", "attributes",
+                 "start_time", "end_time", "error", "_start_counter", "_duration")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes or {}
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self._start_counter = time.perf_counter()
+        self._duration: Optional[float] = None
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        return self.parent.span_id if self.parent else None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """The duration of the span in seconds, None while it is running."""
+        return self._duration
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        self._duration = time.perf_counter() - self._start_counter
+        self.end_time = self.start_time + self._duration
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"<Span name={self.name!r} duration={self._duration} attributes={self.attributes}>"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        return None
+
+    def set_attributes(self, **attributes: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class SpanExporter:
+    """
+    Receives spans from a :class:`Tracer`.
+
+    Subclass it to forward spans to another tracing system,
+    see :class:`OpenTelemetryExporter` for an example.
+    """
+
+    def on_start(self, span: Span) -> None:
+        """Called when a span starts."""
+
+    def on_end(self, span: Span) -> None:
+        """Called when a span ends, its duration and attributes are final."""
+
+
+class InMemoryExporter(SpanExporter):
+    """
+    Keep every finished span in a list, useful for tests and ad-hoc profiling.
+    """
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def on_end(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class OpenTelemetryExporter(SpanExporter):
+    """
+    Mirror spans into OpenTelemetry.
+
+    Parameters
+    ----------
+    tracer: Optional[``opentelemetry.trace.Tracer``]
+        The OpenTelemetry tracer to use, defaults to ``trace.get_tracer("tystream")``.
+    """
+
+    def __init__(self, tracer=None) -> None:
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("tystream")
+        self._spans: Dict[str, Any] = {}
+
+    def on_start(self, span: Span) -> None:
+        parent = self._spans.get(span.parent_id) if span.parent else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        self._spans[span.span_id] = self._tracer.start_span(
+            span.name, context=context, start_time=int(span.start_time * 1e9)
+        )
+
+    def on_end(self, span: Span) -> None:
+        otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if value is not None:
+                otel_span.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+        if span.error is not None:
+            otel_span.record_exception(span.error)
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        otel_span.end(end_time=int(span.end_time * 1e9))
+
+
+class Tracer:
+    """
+    Create spans and hand them to a :class:`SpanExporter`.
+
+    The current span is tracked with a context variable,
+    so spans started in tasks and threads keep the right parent.
+
+    Parameters
+    ----------
+    exporter: Optional[:class:`SpanExporter`]
+        Where finished spans are sent, defaults to an :class:`InMemoryExporter`.
+    enabled: :class:`bool`
+        When disabled no span is created.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, enabled: bool = True) -> None:
+        self.exporter = exporter if exporter is not None else InMemoryExporter()
+        self.enabled = enabled
+
+    def __bool__(self) -> bool:
+        return self.enabled
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        Start a span as a child of the current span and end it when the block exits.
+        """
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+
+        span = Span(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        self.exporter.on_start(span)
+        try:
+            yield span
+        except BaseException as e:
+            span._finish(e)
+            raise
+        else:
+            span._finish()
+        finally:
+            _current_span.reset(token)
+            self.exporter.on_end(span)
+
+
+DISABLED_TRACER = Tracer(SpanExporter(), enabled=False)
+
+
+def traced(name: str):
+    """
+    Run a platform method inside a span named ``name``,
+    the first positional argument is recorded as the ``channel`` attribute.
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(self, *args, **kwargs):
+                with self.tracer.span(name, channel=args[0] if args else None):
+                    return await func(self, *args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(self, *args, **kwargs):
+                with self.tracer.span(name, channel=args[0] if args else None):
+                    return func(self, *args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+from typing import Optional, Dict, Any, List, Tuple, Callable
+from urllib.parse import urlsplit, urlunsplit, parse_qsl
+
+
+class TransportResponse:
+    """
+    A transport independent HTTP response.
+
+    Attributes
+    ----------
+    status: :class:`int`
+        The HTTP status code.
+    headers: Dict[:class:`str`, :class:`str`]
+        The response headers.
+    body: :class:`bytes`
+        The raw response body.
+    url: :class:`str`
+        The requested url.
+    """
+
+    __slots__ = ("status", "headers", "body", "url")
+
+    def __init__(self, status: int, headers: Optional[Dict[str, str]] = None, body: bytes = b"", url: str = "") -> None:
+        self.status = status
+        self.headers = dict(headers or {})
+        self.body = body
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+    def json(self, decoder: Optional[Callable[[bytes], Any]] = None) -> Any:
+        if not self.body:
+            return None
+        return decoder(self.body) if decoder is not None else json.loads(self.body)
+
+    def __repr__(self) -> str:
+        return f"<TransportResponse status={self.status} url={self.url!r} bytes={len(self.body)}>"
+
+
+def get_header(headers: Dict[str, str], name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Case-insensitive header lookup.
+    """
+    if name in headers:
+        return headers[name]
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return default
+
+
+def request_key(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                ignore_params: Tuple[str, ...] = ()) -> str:
+    """
+    Build a stable key for a request, merging the query string of ``url`` with ``params``.
+    """
+    parts = urlsplit(url)
+    query = [(k, str(v)) for k, v in parse_qsl(parts.query)]
+    for k, v in (params or {}).items():
+        if isinstance(v, (list, tuple)):
+            query.extend((k, str(i)) for i in v)
+        elif v is not None:
+            query.append((k, str(v)))
+    query = sorted((k, v) for k, v in query if k not in ignore_params)
+    encoded = "&".join(f"{k}={v}" for k, v in query)
+    return f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, encoded, ''))}"
+
+
+class Cassette:
+    """
+    A collection of recorded HTTP exchanges that can be saved to and loaded from a json file.
+
+    Recorded responses are served back in the order they were recorded,
+    the last response for a request is repeated once the others are used up.
+
+    Parameters
+    ----------
+    path: Optional[:class:`str`]
+        The json file used to load and save the recorded exchanges.
+    ignore_params: Tuple[:class:`str`, ...]
+        Query parameters left out of the request key, so secrets such as api keys are never written to disk.
+    redact_fields: Tuple[:class:`str`, ...]
+        Fields of recorded JSON bodies replaced with ``"REDACTED"``, so oauth tokens are never written to disk.
+    """
+
+    def __init__(
+            self,
+            path: Optional[str] = None,
+            ignore_params: Tuple[str, ...] = ("key",),
+            redact_fields: Tuple[str, ...] = ("access_token", "refresh_token")
+    ) -> None:
+        self.path = path
+        self.ignore_params = ignore_params
+        self.redact_fields = redact_fields
+        self._entries: Dict[str, List[TransportResponse]] = {}
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def key(self, method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        return request_key(method, url, params, self.ignore_params)
+
+    def add(self, key: str, response: TransportResponse) -> None:
+        with self._lock:
+            self._entries.setdefault(key, []).append(response)
+
+    def record(self, method: str, url: str, params: Optional[Dict[str, Any]], response: TransportResponse) -> None:
+        """
+        Add the response of a request made through a recording transport, with its secrets redacted.
+        """
+        self.add(self.key(method, url, params), self.redact(response))
+
+    def redact(self, response: TransportResponse) -> TransportResponse:
+        """
+        A copy of ``response`` whose JSON body has its :attr:`redact_fields` replaced.
+        """
+        if not self.redact_fields or not any(field.encode() in response.body for field in self.redact_fields):
+            return response
+        try:
+            data = json.loads(response.body)
+        except ValueError:
+            return response
+        if not isinstance(data, dict):
+            return response
+        data = {k: "REDACTED" if k in self.redact_fields else v for k, v in data.items()}
+        return TransportResponse(response.status, response.headers, json.dumps(data).encode("utf-8"), response.url)
+
+    def get(self, key: str) -> Optional[TransportResponse]:
+        with self._lock:
+            responses = self._entries.get(key)
+            if not responses:
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return responses[min(position, len(responses) - 1)]
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._positions.clear()
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    def load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        for entry in data:
+            self.add(entry["key"], TransportResponse(
+                status=entry["status"],
+                headers=entry.get("headers"),
+                body=entry.get("body", "").encode("utf-8"),
+            ))
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if not path:
+            raise ValueError("No path given to save the cassette to.")
+
+        with self._lock:
+            data = [
+                {
+                    "key": key,
+                    "status": response.status,
+                    "headers": response.headers,
+                    "body": response.body.decode("utf-8", errors="replace"),
+                }
+                for key, responses in self._entries.items()
+                for response in responses
+            ]
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)